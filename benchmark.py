@@ -0,0 +1,188 @@
+# benchmark.py
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from drill import DrillSession
+from llm_client import FakeProvider, ResilientClient
+from storage import open_storage
+from vocab_manager import GermanVocabManager, SCHEMA_VERSION
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+BACKENDS = {'json': 'deck.json', 'sqlite': 'deck.db', 'journal': 'deck.journal'}
+PARTS_OF_SPEECH = ['noun'] * 5 + ['verb'] * 3 + ['adjective'] * 2 + ['adverb', 'preposition', 'phrase']
+GENDERS = ['der (masculine)', 'die (feminine)', 'das (neutral)']
+
+
+def synthetic_word(i, rng, now):
+    """One legacy-shaped entry (as stored before tracking fields existed) with realistic stats.
+
+    About a third of the deck is still new and never asked; the rest has been
+    asked a long-tailed number of times, mostly within the last few weeks, and
+    is roughly two thirds correct.
+    """
+    part_of_speech = rng.choice(PARTS_OF_SPEECH)
+    word = {
+        'word': f"Wort{i}",
+        'part_of_speech': part_of_speech,
+        'definition': f"meaning {i}, sense {rng.randint(1, 9)}",
+        'example': f"Das ist ein Beispielsatz mit Wort{i}.",
+    }
+    if part_of_speech == 'noun':
+        word['gender'] = rng.choice(GENDERS)
+    if rng.random() < 0.35:
+        return word
+
+    times_asked = 1 + int(rng.expovariate(1 / 6))
+    word['category'] = 'correct' if rng.random() < 0.65 else 'incorrect'
+    word['times_asked'] = times_asked
+    word['last_asked'] = int(now - rng.expovariate(1 / (7 * 86400)))
+    word['last_example_refresh'] = times_asked - times_asked % 3
+    word['example_history'] = [f"Altes Beispiel {n} mit Wort{i}." for n in range(min(times_asked // 3, 5))]
+    return word
+
+
+def synthetic_deck(size, seed=0):
+    """Legacy-shaped dicts for size words"""
+    rng = random.Random(seed)
+    now = time.time()
+    return [synthetic_word(i, rng, now) for i in range(size)]
+
+
+def timed(function, repeat):
+    """Run function repeat times and summarize the wall-clock times in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        'repeat': repeat,
+        'min_ms': round(times[0], 3),
+        'median_ms': round(statistics.median(times), 3),
+        'mean_ms': round(statistics.fmean(times), 3),
+        'p95_ms': round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+        'max_ms': round(times[-1], 3),
+    }
+
+
+def fake_manager(filename, llm_latency, write_behind=False):
+    llm = ResilientClient(FakeProvider(latency=llm_latency, token_latency=0.0, seed=0))
+    manager = GermanVocabManager(storage=open_storage(filename), write_behind=write_behind, llm=llm)
+    manager.storage.schema_version = SCHEMA_VERSION
+    return manager
+
+
+def bench_update_vocab_structure(deck, repeat):
+    return timed(lambda: GermanVocabManager.update_vocab_structure(deck), repeat)
+
+
+def bench_storage(vocabulary, directory, backend, repeat, llm_latency):
+    manager = fake_manager(os.path.join(directory, BACKENDS[backend]), llm_latency)
+    results = {
+        f'save_vocabulary[{backend}]': timed(lambda: manager.save_vocabulary(vocabulary), repeat),
+        f'load_vocabulary[{backend}]': timed(manager.load_vocabulary, repeat),
+    }
+    manager.storage.close()
+    return results
+
+
+def bench_scheduler(manager, vocabulary, repeat):
+    schedule_index = manager.create_schedule_index(vocabulary)
+    return {
+        'create_schedule_index': timed(lambda: manager.create_schedule_index(vocabulary), max(1, repeat // 10)),
+        f'get_next_word_index[{type(schedule_index).__name__}]': timed(
+            lambda: manager.get_next_word_index(vocabulary, 0, schedule_index), repeat
+        ),
+        'get_next_word_index[linear]': timed(
+            lambda: manager.get_next_word_index(vocabulary, 0), max(1, repeat // 10)
+        ),
+    }
+
+
+def bench_practice_cycle(vocabulary, directory, cycles, llm_latency):
+    """Time next word -> ask (maybe refreshing the example) -> grade -> save -> log, through a DrillSession"""
+    manager = fake_manager(os.path.join(directory, 'practice.json'), llm_latency, write_behind=True)
+    manager.save_vocabulary(vocabulary)
+    session = DrillSession(manager, vocabulary)
+    state = {'cycle': 0}
+
+    def cycle():
+        session.next_word()
+        state['cycle'] += 1
+        # A fresh wrong-ish answer each time, so neither local grading nor the cache can answer it
+        session.answer_word(f"guess number {state['cycle']}", session.word.gender)
+
+    result = timed(cycle, cycles)
+    result['flush_ms'] = timed(manager.flush, 1)['max_ms']
+    result['token_usage'] = manager.token_usage()
+    session.close()
+    manager.storage.close()
+    manager.grading_cache.close()
+    manager.executor.shutdown(wait=False)
+    return result
+
+
+def run(sizes, repeat, cycles, llm_latency, backends, seed):
+    results = []
+    for size in sizes:
+        print(f"Benchmarking {size} words...", file=sys.stderr)
+        deck = synthetic_deck(size, seed)
+        with tempfile.TemporaryDirectory() as directory:
+            # Keep the grading cache out of the working directory
+            os.environ['DELINGO_GRADING_CACHE'] = os.path.join(directory, 'grading_cache.db')
+            timings = {'update_vocab_structure': bench_update_vocab_structure(deck, repeat)}
+            vocabulary = GermanVocabManager.update_vocab_structure(deck)
+            del deck
+
+            manager = fake_manager(os.path.join(directory, 'scheduler.json'), llm_latency)
+            timings.update(bench_scheduler(manager, vocabulary, repeat * 10))
+            manager.grading_cache.close()
+            for backend in backends:
+                timings.update(bench_storage(vocabulary, directory, backend, repeat, llm_latency))
+            timings['practice_cycle'] = bench_practice_cycle(vocabulary, directory, cycles, llm_latency)
+
+        for name, stats in timings.items():
+            results.append(dict(stats, size=size, benchmark=name))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the scheduler, storage and practice loop on synthetic decks")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated deck sizes (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per storage benchmark; the scheduler gets 10x")
+    parser.add_argument('--cycles', type=int, default=20, help="practice answer cycles per deck size")
+    parser.add_argument('--llm-latency', type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument('--backends', default=','.join(BACKENDS), help="storage backends to time")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'repeat': args.repeat, 'cycles': args.cycles,
+            'llm_latency': args.llm_latency, 'seed': args.seed,
+        },
+        'results': run(
+            [int(size) for size in args.sizes.split(',')], args.repeat, args.cycles,
+            args.llm_latency, args.backends.split(','), args.seed
+        ),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
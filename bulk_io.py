@@ -0,0 +1,223 @@
+# bulk_io.py
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+
+from search_index import normalize_word
+from word_entry import json_default
+
+FORMATS = ['csv', 'tsv', 'jsonl', 'anki']
+FIELDNAMES = ['word', 'part_of_speech', 'gender', 'definition', 'example']
+EXPORT_FIELDNAMES = FIELDNAMES + ['category', 'times_asked', 'last_asked']
+
+GENDERS = {
+    'der': 'der (masculine)', 'm': 'der (masculine)', 'masculine': 'der (masculine)', 'maskulin': 'der (masculine)',
+    'die': 'die (feminine)', 'f': 'die (feminine)', 'feminine': 'die (feminine)', 'feminin': 'die (feminine)',
+    'das': 'das (neutral)', 'n': 'das (neutral)', 'neutral': 'das (neutral)', 'neuter': 'das (neutral)',
+    'neutrum': 'das (neutral)',
+}
+PARTS_OF_SPEECH = {
+    'noun': 'noun', 'n': 'noun', 'substantiv': 'noun', 'nomen': 'noun',
+    'verb': 'verb', 'v': 'verb',
+    'adjective': 'adjective', 'adj': 'adjective', 'adjektiv': 'adjective',
+    'adverb': 'adverb', 'adv': 'adverb',
+    'preposition': 'preposition', 'prep': 'preposition', 'präposition': 'preposition',
+    'conjunction': 'conjunction', 'conj': 'conjunction', 'konjunktion': 'conjunction',
+    'phrase': 'phrase', 'other': 'other',
+}
+
+
+class ImportReport:
+    """Counts of what happened to each imported row"""
+
+    def __init__(self):
+        self.added = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []  # First few validation messages
+
+    def reject(self, message):
+        self.invalid += 1
+        if len(self.errors) < 20:
+            self.errors.append(message)
+
+
+def detect_format(filename):
+    """Guess the format from a file name"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.tsv':
+        return 'tsv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension == '.txt':
+        return 'anki'
+    return 'csv'
+
+
+def read_rows(lines, fmt):
+    """Yield one dict per record from an iterable of text lines"""
+    if fmt == 'jsonl':
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {'_error': f"line {line_number}: {e}"}
+    elif fmt == 'anki':
+        # Anki's "Notes in Plain Text" export: front, back and optional extra fields, no header
+        for line in lines:
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = line.rstrip('\r\n').split('\t')
+            yield {
+                'word': fields[0],
+                'definition': fields[1] if len(fields) > 1 else '',
+                'example': fields[2] if len(fields) > 2 else '',
+            }
+    else:
+        yield from csv.DictReader(lines, delimiter='\t' if fmt == 'tsv' else ',')
+
+
+def clean_field(value):
+    """Strip HTML left over from Anki cards and surrounding whitespace"""
+    return ' '.join(re.sub(r'<[^>]+>', ' ', str(value or '')).split())
+
+
+def normalize_gender(value):
+    match = re.match(r'[^\W\d_]+', clean_field(value).casefold())
+    return GENDERS.get(match.group(0)) if match else None
+
+
+def normalize_row(row):
+    """Turn a raw row into create_new_word_entry arguments, or raise ValueError"""
+    if '_error' in row:
+        raise ValueError(row['_error'])
+
+    word = clean_field(row.get('word'))
+    definition = clean_field(row.get('definition'))
+    if not word or not definition:
+        raise ValueError(f"missing word or definition: {row}")
+
+    raw_pos = clean_field(row.get('part_of_speech')).casefold()
+    part_of_speech = PARTS_OF_SPEECH.get(raw_pos, 'other') if raw_pos else None
+    gender = normalize_gender(row.get('gender'))
+
+    # "der Hund" style entries carry the gender in the word itself
+    article, _, rest = word.partition(' ')
+    if rest and article.casefold() in ('der', 'die', 'das') and part_of_speech in (None, 'noun'):
+        word = rest
+        part_of_speech = 'noun'
+        gender = gender or GENDERS[article.casefold()]
+
+    part_of_speech = part_of_speech or 'other'
+    if part_of_speech == 'noun' and gender is None:
+        raise ValueError(f"noun without a gender: {word}")
+
+    return {
+        'word': word,
+        'part_of_speech': part_of_speech,
+        'definition': definition,
+        'example': clean_field(row.get('example')),
+        'gender': gender if part_of_speech == 'noun' else None,
+    }
+
+
+def dedupe_key(word, definition):
+    return normalize_word(word), ' '.join(definition.casefold().split())
+
+
+def validated(rows, report):
+    for row in rows:
+        try:
+            yield normalize_row(row)
+        except ValueError as e:
+            report.reject(str(e))
+
+
+def deduplicated(entries, seen, report):
+    for fields in entries:
+        key = dedupe_key(fields['word'], fields['definition'])
+        if key in seen:
+            report.duplicates += 1
+            continue
+        seen.add(key)
+        yield fields
+
+
+def import_deck(manager, vocabulary, lines, fmt):
+    """Stream rows through validation and de-duplication into vocabulary.
+
+    Words already in the deck (same word and definition) or repeated in the
+    file are skipped. New entries are appended to vocabulary and saved with a
+    single batched write. Returns (new entries, ImportReport).
+    """
+    report = ImportReport()
+    seen = {dedupe_key(word['word'], word['definition']) for word in vocabulary}
+
+    new_entries = []
+    for fields in deduplicated(validated(read_rows(lines, fmt), report), seen, report):
+        entry = manager.create_new_word_entry(**fields)
+        vocabulary.append(entry)
+        new_entries.append(entry)
+
+    report.added = len(new_entries)
+    if new_entries:
+        manager.save_words(vocabulary, new_entries)
+    return new_entries, report
+
+
+def export_deck(vocabulary, out, fmt):
+    """Write vocabulary to a text stream one entry at a time"""
+    if fmt == 'jsonl':
+        for word in vocabulary:
+            out.write(json.dumps(word, ensure_ascii=False, default=json_default) + '\n')
+    elif fmt == 'anki':
+        for word in vocabulary:
+            front = f"{word['gender'].split()[0]} {word['word']}" if word.get('gender') else word['word']
+            out.write('\t'.join(clean_field(field) for field in (front, word['definition'], word['example'])) + '\n')
+    else:
+        writer = csv.DictWriter(
+            out, EXPORT_FIELDNAMES, extrasaction='ignore', delimiter='\t' if fmt == 'tsv' else ','
+        )
+        writer.writeheader()
+        for word in vocabulary:
+            writer.writerow(word)
+
+
+def export_text(vocabulary, fmt):
+    """Export to a string, e.g. for a download button"""
+    out = io.StringIO()
+    export_deck(vocabulary, out, fmt)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    from storage import DEFAULT_DECK, DEFAULT_USER, open_deck
+    from vocab_manager import GermanVocabManager
+
+    parser = argparse.ArgumentParser(description="Bulk import or export vocabulary")
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('filename')
+    parser.add_argument('--format', choices=FORMATS, help="defaults to a guess from the file extension")
+    parser.add_argument('--user', default=DEFAULT_USER, help="learner whose deck to use")
+    parser.add_argument('--deck', default=DEFAULT_DECK)
+    args = parser.parse_args()
+    fmt = args.format or detect_format(args.filename)
+
+    manager = GermanVocabManager(storage=open_deck(args.user, args.deck), write_behind=False)
+    vocabulary = manager.load_vocabulary()
+    if args.action == 'import':
+        with open(args.filename, 'r', encoding='utf-8-sig', newline='') as f:
+            _, report = import_deck(manager, vocabulary, f, fmt)
+        print(f"Added {report.added} words, skipped {report.duplicates} duplicates and {report.invalid} invalid rows")
+        for message in report.errors:
+            print(f"  {message}")
+    else:
+        with open(args.filename, 'w', encoding='utf-8', newline='') as f:
+            export_deck(vocabulary, f, fmt)
+        print(f"Exported {len(vocabulary)} words to {args.filename}")
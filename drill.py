@@ -0,0 +1,715 @@
+# drill.py
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bulk_io import normalize_gender
+from storage import DEFAULT_DECK, DEFAULT_USER, safe_name
+
+# Stages of a drill session; stage is None until a word has been picked
+ASKING = 'asking'  # Word shown, waiting for an answer
+GRADING = 'grading'  # Answer submitted, verdict not in yet
+GRADED = 'graded'
+GRADING_FAILED = 'grading_failed'  # The LLM couldn't grade; the answer can be retried
+
+
+class DrillError(Exception):
+    """An action that doesn't fit the session's stage, or an empty answer"""
+
+
+class SessionLimitError(DrillError):
+    """The server already has as many sessions open as it allows"""
+
+
+class DrillSession:
+    """One learner's practice loop, independent of any UI.
+
+    next_word picks and presents a word, submit takes the answer and grade
+    grades, records and saves it. The stage moves ASKING -> GRADING -> GRADED
+    (or GRADING_FAILED, which retry sends back to GRADING), and each side effect
+    happens once, on entering a stage. The Streamlit practice card, the command
+    line drill and the HTTP API all drive this class.
+    """
+
+    def __init__(self, manager, vocabulary=None, schedule_index=None):
+        self.manager = manager
+        self.vocabulary = manager.load_vocabulary() if vocabulary is None else vocabulary
+        self.schedule_index = schedule_index or manager.create_schedule_index(self.vocabulary)
+        self.stage = None
+        self.current_index = None
+        self.consecutive_new_incorrect = 0
+        self.lookahead = None  # Next word chosen ahead of time, with its example prefetch
+        self.current_prefetch = None
+        self.answer = None  # The submitted definition, gender and latency
+        self.grading = None  # Verdict stream of the answer being graded
+        self.verdict = None
+        self.question_shown_at = time.time()  # For the answer latency in the review log
+        self.on_example_change = None  # Called with a word whose example was refreshed
+
+    @property
+    def word(self):
+        return None if self.current_index is None else self.vocabulary[self.current_index]
+
+    def next_word(self, on_example_text=None):
+        """Transition to ASKING: pick the next word and count it as asked.
+
+        A refreshed example that wasn't pooled or prefetched is passed to
+        on_example_text as it streams in.
+        """
+        if not self.vocabulary:
+            raise DrillError("No vocabulary available")
+        self.apply_written()
+        self.choose_next_word()
+        self.answer = None
+        self.grading = None
+        self.verdict = None
+        # Set before asking: if the caller is interrupted during the example
+        # refresh, the word must not be asked (and refreshed) a second time
+        self.stage = ASKING
+        self.question_shown_at = time.time()
+
+        word_entry = self.word
+        previous_example = word_entry['example']
+        self.manager.increment_times_asked(
+            word_entry, self.current_prefetch, on_example_text=on_example_text, vocabulary=self.vocabulary
+        )
+        if word_entry['example'] != previous_example and self.on_example_change is not None:
+            self.on_example_change(word_entry)
+        self.current_prefetch = None
+        self.schedule_index.update(self.current_index)
+        if self.lookahead is None:
+            self.start_lookahead()
+        return self.card()
+
+    def submit(self, definition, gender=None):
+        """Transition to GRADING with the learner's answer.
+
+        A noun's gender can be given as der, die or das, or as the deck's
+        "der (masculine)" form; it is required when the word has a gender.
+        """
+        if self.stage != ASKING:
+            raise DrillError(f"Can't answer while {self.stage or 'no word is shown'}")
+        if not definition or not definition.strip():
+            raise DrillError("Please provide an answer.")
+        if self.word['part_of_speech'] == 'noun':
+            gender = self.canonical_gender(gender)
+        else:
+            gender = None
+        self.answer = {
+            'definition': definition,
+            'gender': gender,
+            'latency': time.time() - self.question_shown_at,
+        }
+        self.stage = GRADING
+
+    def canonical_gender(self, gender):
+        """The deck's form of a gender answer, such as das (neutral) for "das"; None if not given"""
+        if gender is None or not str(gender).strip():
+            if self.word.get('gender'):
+                raise DrillError("Please provide the gender (der, die or das).")
+            return None
+        canonical = normalize_gender(gender)
+        if canonical is None:
+            raise DrillError(f"Unknown gender {gender!r}; use der, die or das.")
+        return canonical
+
+    def skip(self):
+        """Leave the current word unanswered; the next call to next_word picks another"""
+        self.stage = None
+
+    def retry(self):
+        """Send an answer that couldn't be graded back to GRADING"""
+        if self.stage != GRADING_FAILED:
+            raise DrillError("There is no failed grading to retry")
+        self.stage = GRADING
+
+    @property
+    def feedback(self):
+        """The feedback streamed so far, or the final feedback once graded"""
+        if self.grading is not None:
+            return self.grading['feedback']
+        return self.verdict.feedback if self.verdict is not None else ''
+
+    def grade(self, on_feedback=None):
+        """Grade the submitted answer, then transition to GRADED or GRADING_FAILED.
+
+        on_feedback is called with the feedback so far as each chunk arrives.
+        The stream is kept on the session, so a caller interrupted in the middle
+        of it carries on with the same request instead of sending a new one.
+        Returns the verdict.
+        """
+        if self.stage != GRADING:
+            raise DrillError("There is no answer to grade")
+        grading = self.grading
+        if grading is None:
+            stream = self.manager.grade_answer_stream(self.word, self.answer['definition'], self.answer['gender'])
+            grading = self.grading = {'stream': stream, 'chunks': iter(stream), 'feedback': ''}
+        for chunk in grading['chunks']:
+            grading['feedback'] += chunk
+            if on_feedback is not None:
+                on_feedback(grading['feedback'])
+        verdict = self.verdict = grading['stream'].verdict
+        self.grading = None
+
+        if verdict.category == 'error':
+            # Leave the word's category alone rather than marking it incorrect
+            self.stage = GRADING_FAILED
+            return verdict
+        self.stage = GRADED
+
+        if verdict.category != "correct":
+            self.consecutive_new_incorrect += 1
+        else:
+            self.consecutive_new_incorrect = 0
+
+        word_entry = self.word
+        word_entry['category'] = verdict.category
+        self.schedule_index.update(self.current_index)
+        self.manager.save_word(self.vocabulary, word_entry)
+        self.manager.record_review(word_entry, verdict, self.answer['latency'])
+        return verdict
+
+    def answer_word(self, definition, gender=None, on_feedback=None):
+        """Submit and grade in one step"""
+        self.submit(definition, gender)
+        return self.grade(on_feedback)
+
+    def delete_word(self, index):
+        """Delete the word at index from the deck and return it.
+
+        Later words move down one position. If the deleted word is the one being
+        practiced, the next call to next_word picks another.
+        """
+        word_entry = self.vocabulary.pop(index)
+        if self.current_index == index:
+            self.current_index = None
+            self.stage = None
+            self.grading = None
+            self.verdict = None
+        elif self.current_index is not None and self.current_index > index:
+            self.current_index -= 1
+        # The look-ahead and the index hold positions from before the deletion
+        self.close()
+        self.schedule_index.rebuild(self.vocabulary)
+        self.manager.delete_word(self.vocabulary, word_entry)
+        return word_entry
+
+    def apply_written(self):
+        """Take in practice stats other sessions saved for words this one saved too"""
+        changed = self.manager.apply_written(self.vocabulary)
+        if not changed:
+            return
+        changed_ids = {id(word) for word in changed}
+        for i, word in enumerate(self.vocabulary):
+            if id(word) in changed_ids:
+                self.schedule_index.update(i)
+                if self.on_example_change is not None:
+                    self.on_example_change(word)
+
+    def choose_next_word(self):
+        """Make the look-ahead word current, or pick a fresh one if it no longer fits"""
+        vocabulary = self.vocabulary
+        lookahead = self.lookahead
+        self.lookahead = None
+
+        if lookahead is not None:
+            index = lookahead['index']
+            still_valid = index < len(vocabulary) and vocabulary[index].id == lookahead['word_id']
+            # The look-ahead was picked before the last answer was graded
+            if still_valid and self.consecutive_new_incorrect >= self.manager.scheduler_params.force_correct_after:
+                still_valid = vocabulary[index]['category'] == 'correct'
+            if still_valid:
+                self.current_index = index
+                self.current_prefetch = lookahead['prefetch']
+                return
+            if lookahead['prefetch'] is not None:
+                lookahead['prefetch'].cancel()
+
+        self.current_index = self.manager.get_next_word_index(
+            vocabulary, self.consecutive_new_incorrect, self.schedule_index
+        )
+        self.current_prefetch = None
+
+    def start_lookahead(self):
+        """Pick the next word now and prefetch its refreshed example while the learner answers"""
+        index = self.manager.get_next_word_index(self.vocabulary, self.consecutive_new_incorrect, self.schedule_index)
+        self.lookahead = {
+            'index': index,
+            'word_id': self.vocabulary[index].id,
+            'prefetch': self.manager.prefetch_example(self.vocabulary[index]),
+        }
+
+    def close(self):
+        if self.lookahead is not None and self.lookahead['prefetch'] is not None:
+            self.lookahead['prefetch'].cancel()
+        self.lookahead = None
+
+    def card(self):
+        """What a client shows: the word and its example, and the verdict once graded"""
+        word_entry = self.word
+        if word_entry is None:
+            return {'stage': self.stage}
+        card = {
+            'stage': self.stage,
+            'word_id': word_entry.id,
+            'word': word_entry['word'],
+            'part_of_speech': word_entry['part_of_speech'],
+            'example': word_entry['example'],
+            'needs_gender': word_entry['part_of_speech'] == 'noun',
+        }
+        if self.stage in (GRADED, GRADING_FAILED):
+            card['verdict'] = self.verdict.to_dict()
+        return card
+
+    def reveal(self):
+        """The answer to the current word"""
+        word_entry = self.word
+        if word_entry is None:
+            raise DrillError("No word is shown")
+        return {
+            'definition': word_entry['definition'],
+            'gender': word_entry['gender'] if word_entry['part_of_speech'] == 'noun' else None,
+            'previous_example': word_entry.get('previous_example'),
+        }
+
+
+class DrillServer(ThreadingHTTPServer):
+    """Local JSON API over drill sessions, one manager per deck shared by all its sessions.
+
+        POST   /sessions               {"user": ..., "deck": ...} -> {"session": id, "card": ...}
+        GET    /sessions/<id>          -> card
+        POST   /sessions/<id>/answer   {"definition": ..., "gender": ...} -> {"verdict": ..., "card": ...}
+        POST   /sessions/<id>/retry    -> {"verdict": ..., "card": ...}
+        POST   /sessions/<id>/next     -> card
+        GET    /sessions/<id>/reveal   -> definition, gender, previous example
+        DELETE /sessions/<id>
+        GET    /metrics                -> metrics snapshot per deck
+
+    Requests to one session are handled one at a time; sessions run concurrently.
+    Each session holds its own copy of the deck, so at most max_sessions are
+    open at once (more answer 503), and sessions not used for session_ttl
+    seconds are closed.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024  # Hundreds of clients connecting at once overflow the default backlog of 5
+    expire_every = 30  # Seconds between checks for idle sessions
+
+    def __init__(self, address, manager_factory, max_sessions=1000, session_ttl=1800):
+        super().__init__(address, DrillRequestHandler)
+        self.manager_factory = manager_factory  # (user, deck) -> GermanVocabManager
+        self.managers = {}
+        self.sessions = {}  # id -> (DrillSession, lock)
+        self.last_used = {}  # id -> time.monotonic() of the session's last request
+        self.opening = 0  # Sessions being opened, counted against max_sessions
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.last_expiry = time.monotonic()
+        self.lock = threading.Lock()
+
+    def get_manager(self, user, deck):
+        with self.lock:
+            manager = self.managers.get((user, deck))
+            if manager is None:
+                manager = self.managers[(user, deck)] = self.manager_factory(user, deck)
+            return manager
+
+    def open_session(self, user, deck):
+        self.expire_sessions()
+        with self.lock:
+            if len(self.sessions) + self.opening >= self.max_sessions:
+                raise SessionLimitError(f"Too many open sessions ({self.max_sessions}); try again later")
+            self.opening += 1
+        try:
+            session = DrillSession(self.get_manager(user, deck))
+        finally:
+            with self.lock:
+                self.opening -= 1
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[session_id] = (session, threading.Lock())
+            self.last_used[session_id] = time.monotonic()
+        return session_id, session
+
+    def use_session(self, session_id):
+        """The (session, lock) of session_id, marked as just used, or None if it is closed"""
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                self.last_used[session_id] = time.monotonic()
+            return entry
+
+    def close_session(self, session_id):
+        with self.lock:
+            session, _ = self.sessions.pop(session_id, (None, None))
+            self.last_used.pop(session_id, None)
+        if session is not None:
+            session.close()
+
+    def expire_sessions(self):
+        """Close the sessions idle for longer than session_ttl, unless a request is in progress"""
+        now = time.monotonic()
+        expired = []
+        with self.lock:
+            self.last_expiry = now
+            for session_id, (session, lock) in list(self.sessions.items()):
+                if now - self.last_used[session_id] > self.session_ttl and lock.acquire(blocking=False):
+                    del self.sessions[session_id], self.last_used[session_id]
+                    expired.append(session)
+                    lock.release()
+        for session in expired:
+            session.close()
+        return len(expired)
+
+    def service_actions(self):
+        # Called by serve_forever between requests
+        if time.monotonic() - self.last_expiry >= self.expire_every:
+            self.expire_sessions()
+
+    def shutdown_managers(self):
+        for manager in self.managers.values():
+            manager.flush()
+            manager.review_log.close()
+
+
+def text_field(body, name, default=None):
+    """body[name], which has to be a string if given; raises ValueError otherwise"""
+    value = body.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+class DrillRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # Keep a load test from flooding the terminal
+
+    def send_json(self, status, data=None):
+        body = json.dumps(data).encode() if data is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        """The request body, which has to be a JSON object; raises ValueError otherwise"""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        if not isinstance(body, dict):
+            raise ValueError("the body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        try:
+            body = self.read_json() if method == 'POST' else {}
+            if parts == ['metrics'] and method == 'GET':
+                self.send_json(200, {
+                    f"{user}/{deck}": manager.metrics.snapshot() for (user, deck), manager in self.server.managers.items()
+                })
+            elif parts == ['sessions'] and method == 'POST':
+                user = safe_name(text_field(body, 'user') or DEFAULT_USER)
+                deck = safe_name(text_field(body, 'deck') or DEFAULT_DECK)
+                session_id, session = self.server.open_session(user, deck)
+                self.send_json(201, {'session': session_id, 'card': session.next_word()})
+            elif len(parts) in (2, 3) and parts[0] == 'sessions':
+                self.session_action(method, parts[1], parts[2] if len(parts) == 3 else None, body)
+            else:
+                self.send_json(404, {'error': f"No such endpoint: {method} {self.path}"})
+        except SessionLimitError as e:
+            self.send_json(503, {'error': str(e)})
+        except DrillError as e:
+            self.send_json(409, {'error': str(e)})
+        except ValueError as e:
+            self.send_json(400, {'error': f"Bad request: {e}"})
+        except Exception as e:
+            print(f"Error handling {method} {self.path}: {e}")
+            self.send_json(500, {'error': str(e)})
+
+    def session_action(self, method, session_id, action, body):
+        entry = self.server.use_session(session_id)
+        if entry is None:
+            self.send_json(404, {'error': f"No such session: {session_id}"})
+            return
+        session, lock = entry
+        with lock:
+            if method == 'GET' and action is None:
+                self.send_json(200, session.card())
+            elif method == 'DELETE' and action is None:
+                self.server.close_session(session_id)
+                self.send_json(204)
+            elif method == 'GET' and action == 'reveal':
+                self.send_json(200, session.reveal())
+            elif method == 'POST' and action == 'next':
+                self.send_json(200, session.next_word())
+            elif method == 'POST' and action == 'answer':
+                verdict = session.answer_word(text_field(body, 'definition', ''), text_field(body, 'gender'))
+                self.send_json(200, {'verdict': verdict.to_dict(), 'card': session.card()})
+            elif method == 'POST' and action == 'retry':
+                session.retry()
+                verdict = session.grade()
+                self.send_json(200, {'verdict': verdict.to_dict(), 'card': session.card()})
+            else:
+                self.send_json(404, {'error': f"No such endpoint: {method} {self.path}"})
+
+
+def drill(session, count=None):
+    """Practice in the terminal: answer each word, '?' shows the answer, 'q' or an empty line stops"""
+    asked = correct = 0
+    printed = ['']
+
+    def print_new(feedback):
+        # Feedback restarts from scratch on a retry
+        new = feedback[len(printed[0]):] if feedback.startswith(printed[0]) else '\n' + feedback
+        print(new, end='', flush=True)
+        printed[0] = feedback
+
+    while count is None or asked < count:
+        print()
+        card = session.next_word(on_example_text=lambda text: print(f"\rExample: {text}", end='', flush=True))
+        print(f"\rWord:    {card['word']} ({card['part_of_speech']})")
+        print(f"Example: {card['example']}")
+        gender = None
+        if card['needs_gender']:
+            gender = input("Gender (der/die/das): ").strip()
+        definition = input("Definition: ").strip()
+        if definition == '?':
+            answer = session.reveal()
+            print(f"Answer:  {answer['definition']}" + (f" ({answer['gender']})" if answer['gender'] else ''))
+            definition = input("Definition: ").strip()
+        if definition.lower() in ('', 'q'):
+            break
+        while True:
+            try:
+                session.submit(definition, gender)
+                break
+            except DrillError as e:
+                print(e)
+                gender = input("Gender (der/die/das): ").strip()
+        printed[0] = ''
+        verdict = session.grade(on_feedback=print_new)
+        while verdict.category == 'error' and input("\nCouldn't grade the answer. Retry? [Y/n] ").lower() != 'n':
+            session.retry()
+            verdict = session.grade(on_feedback=print_new)
+        print()
+        asked += 1
+        correct += verdict.category == 'correct'
+    print(f"\n{correct} of {asked} correct")
+
+
+class InProcessClient:
+    """Drives a DrillSession directly, for the load test"""
+
+    def __init__(self, manager):
+        self.session = DrillSession(manager)
+
+    def start(self):
+        return self.session.next_word()
+
+    def next(self):
+        return self.session.next_word()
+
+    def reveal(self):
+        return self.session.reveal()
+
+    def answer(self, definition, gender):
+        return self.session.answer_word(definition, gender).to_dict()
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPClient:
+    """Drives a session of a running DrillServer, for the load test"""
+
+    def __init__(self, url, user, deck):
+        self.url = url.rstrip('/')
+        self.user = user
+        self.deck = deck
+        self.session_id = None
+
+    def request(self, method, path, data=None):
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(self.url + path, data=body, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=60) as response:
+            text = response.read()
+        return json.loads(text) if text else None
+
+    def start(self):
+        result = self.request('POST', '/sessions', {'user': self.user, 'deck': self.deck})
+        self.session_id = result['session']
+        return result['card']
+
+    def next(self):
+        return self.request('POST', f'/sessions/{self.session_id}/next', {})
+
+    def reveal(self):
+        return self.request('GET', f'/sessions/{self.session_id}/reveal')
+
+    def answer(self, definition, gender):
+        return self.request('POST', f'/sessions/{self.session_id}/answer',
+                            {'definition': definition, 'gender': gender})['verdict']
+
+    def close(self):
+        if self.session_id is not None:
+            self.request('DELETE', f'/sessions/{self.session_id}')
+
+
+def load_test(make_client, sessions, answers, accuracy=0.7, seed=0):
+    """Run sessions simulated learners at once, each answering answers words.
+
+    A learner answers with the right definition with probability accuracy and
+    with a fresh wrong guess otherwise, so wrong answers always need the LLM.
+    Returns the answers per second and the answer latency percentiles in ms.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(sessions)
+
+    def learner(number):
+        rng = random.Random(seed * 100003 + number)
+        client = None
+        try:
+            client = make_client()
+            card = client.start()
+            start_barrier.wait()
+            for answer_number in range(answers):
+                if answer_number:
+                    card = client.next()
+                if rng.random() < accuracy:
+                    solution = client.reveal()
+                    definition, gender = solution['definition'], solution['gender']
+                else:
+                    definition, gender = f"guess {number}-{answer_number}", None
+                if card['needs_gender'] and gender is None:
+                    gender = rng.choice(['der', 'die', 'das'])
+                started = time.perf_counter()
+                verdict = client.answer(definition, gender)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if verdict['category'] == 'error':
+                        errors.append('grading error')
+        except threading.BrokenBarrierError:
+            pass
+        except Exception as e:
+            start_barrier.abort()
+            with lock:
+                errors.append(str(e))
+        finally:
+            if client is not None:
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"Error closing session: {e}")
+
+    threads = [threading.Thread(target=learner, args=(number,)) for number in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(q):
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2) if latencies else None
+
+    return {
+        'sessions': sessions,
+        'answers': len(latencies),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'seconds': round(elapsed, 3),
+        'answers_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+if __name__ == "__main__":
+    from grading_cache import GradingCache
+    from llm_client import create_llm_client
+    from storage import open_deck
+    from vocab_manager import GermanVocabManager
+
+    parser = argparse.ArgumentParser(description="Practice without the browser, serve a JSON API, or load-test it")
+    parser.add_argument('command', choices=['drill', 'serve', 'load'])
+    parser.add_argument('--user', default=DEFAULT_USER, help="learner whose deck to use")
+    parser.add_argument('--deck', default=DEFAULT_DECK)
+    parser.add_argument('--count', type=int, help="drill: stop after this many words")
+    parser.add_argument('--host', default='127.0.0.1', help="serve: address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="serve: port to listen on")
+    parser.add_argument('--max-sessions', type=int, default=1000, help="serve: sessions open at once")
+    parser.add_argument('--session-ttl', type=float, default=1800,
+                        help="serve: seconds after which an unused session is closed")
+    parser.add_argument('--url', help="load: test a running server instead of sessions in this process")
+    parser.add_argument('--sessions', type=int, default=100, help="load: simulated learners at once")
+    parser.add_argument('--answers', type=int, default=20, help="load: answers per learner")
+    parser.add_argument('--accuracy', type=float, default=0.7, help="load: share of correct answers")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    llm = create_llm_client()
+    grading_cache = GradingCache(os.environ.get("DELINGO_GRADING_CACHE", "grading_cache.db"))
+
+    def make_manager(user, deck):
+        return GermanVocabManager(storage=open_deck(user, deck), llm=llm, grading_cache=grading_cache)
+
+    if args.command == 'drill':
+        manager = make_manager(args.user, args.deck)
+        try:
+            drill(DrillSession(manager), args.count)
+        except (KeyboardInterrupt, EOFError):
+            print()
+        finally:
+            manager.flush()
+            manager.review_log.close()
+    elif args.command == 'serve':
+        server = DrillServer((args.host, args.port), make_manager, args.max_sessions, args.session_ttl)
+        print(f"Serving drill sessions on http://{args.host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            server.shutdown_managers()
+    else:
+        if args.url:
+            report = load_test(lambda: HTTPClient(args.url, args.user, args.deck),
+                               args.sessions, args.answers, args.accuracy, args.seed)
+        else:
+            manager = make_manager(args.user, args.deck)
+            report = load_test(lambda: InProcessClient(manager), args.sessions, args.answers, args.accuracy,
+                               args.seed)
+            manager.flush()
+            manager.review_log.close()
+            report['metrics'] = {
+                name: {key: round(stats[key], 2) for key in ('count', 'mean_ms', 'p50_ms', 'p95_ms')}
+                for name, stats in manager.metrics.snapshot()['histograms'].items()
+            }
+        print(json.dumps(report, indent=2))
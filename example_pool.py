@@ -0,0 +1,89 @@
+# example_pool.py
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class PoolBuildReport:
+    """What a pool build did"""
+
+    def __init__(self):
+        self.words = 0  # Words that needed examples
+        self.requests = 0
+        self.added = 0  # Examples added
+        self.failed = 0  # Requests that raised
+
+
+def words_needing_examples(vocabulary, pool_size):
+    return [word for word in vocabulary if len(word.example_pool) < pool_size]
+
+
+def build_example_pools(manager, vocabulary, pool_size=None, batch_size=20, workers=4, limit=None,
+                        progress=None):
+    """Pre-generate examples so every word has pool_size of them queued.
+
+    Words are sent batch_size at a time, with up to workers requests in flight.
+    The workers only fetch sentences; they are added to the words and saved on
+    the calling thread as each batch is done. Only words still short of
+    examples are requested, so an interrupted build picks up where it stopped
+    when run again. progress(done, total) is called after each batch.
+    """
+    pool_size = pool_size or manager.example_pool_size
+    report = PoolBuildReport()
+    words = words_needing_examples(vocabulary, pool_size)[:limit]
+    report.words = len(words)
+    batches = [words[start:start + batch_size] for start in range(0, len(words), batch_size)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(manager.fetch_example_pools, [word.copy() for word in batch], pool_size): batch
+                for batch in batches
+            }
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    report.requests += 1
+                    try:
+                        report.added += manager.fill_example_pools(vocabulary, futures[future], future.result(),
+                                                                   pool_size)
+                    except Exception as e:
+                        print(f"Error building example pool: {e}")
+                        report.failed += 1
+                    if progress is not None:
+                        progress(done, len(batches))
+            except BaseException:
+                # Interrupted: drop the batches not started yet; what was added is saved below
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        manager.flush()
+    return report
+
+
+if __name__ == "__main__":
+    from storage import DEFAULT_DECK, DEFAULT_USER, WriteBehindStorage, open_deck
+    from vocab_manager import GermanVocabManager
+
+    parser = argparse.ArgumentParser(description="Pre-generate example sentences so practice needs no LLM calls")
+    parser.add_argument('--user', default=DEFAULT_USER, help="learner whose deck to use")
+    parser.add_argument('--deck', default=DEFAULT_DECK)
+    parser.add_argument('--pool-size', type=int, default=5, help="examples to keep queued per word")
+    parser.add_argument('--batch-size', type=int, default=20, help="words per LLM request")
+    parser.add_argument('--workers', type=int, default=4, help="LLM requests in flight at once")
+    parser.add_argument('--limit', type=int, help="stop after this many words")
+    parser.add_argument('--save-every', type=float, default=10.0,
+                        help="seconds between deck saves; each save rewrites a JSON deck in full")
+    args = parser.parse_args()
+
+    # Buffer the batches' saves, so a large deck is not rewritten after every batch
+    storage = WriteBehindStorage(open_deck(args.user, args.deck), flush_interval=args.save_every,
+                                 max_pending=float('inf'))
+    manager = GermanVocabManager(storage=storage, write_behind=False)
+    vocabulary = manager.load_vocabulary()
+    report = build_example_pools(
+        manager, vocabulary, args.pool_size, args.batch_size, args.workers, args.limit,
+        progress=lambda done, total: print(f"\r{done}/{total} batches", end='', flush=True)
+    )
+    print(f"\nAdded {report.added} examples for {report.words} words in {report.requests} requests"
+          + (f", {report.failed} failed" if report.failed else ""))
@@ -0,0 +1,129 @@
+# grading.py
+
+import re
+
+# Answers that can be marked wrong without asking the LLM
+GIVE_UP_ANSWERS = {'', '?', '-', 'idk', "i don't know", 'i dont know', 'no idea', 'weiß nicht', 'keine ahnung'}
+LEADING_FILLERS = ('to ', 'a ', 'an ', 'the ')
+
+
+class Verdict:
+    """Result of grading one answer"""
+
+    def __init__(self, category, feedback, source):
+        self.category = category  # 'correct', 'incorrect', or 'error' if it couldn't be graded
+        self.feedback = feedback  # Text shown to the user
+        self.source = source  # 'local' or 'llm'
+
+    def to_dict(self):
+        return {'category': self.category, 'feedback': self.feedback, 'source': self.source}
+
+
+VERDICT_PREFIX = re.compile(r'^\W*your answer is (incorrect|correct)\b')
+NEGATIONS = {'not', 'no', 'never', 'hardly', 'partly', 'partially'}
+
+
+def parse_llm_verdict(llm_response):
+    """Read correct/incorrect from an LLM response.
+
+    The prompt asks for a "Your answer is correct!" or "... incorrect!" opening,
+    which is trusted when present. Otherwise the first verdict word counts, and
+    a "correct" negated or hedged in the words before it ("not correct",
+    "isn't correct", "not quite correct") is incorrect.
+    """
+    text = llm_response.lower()
+    match = VERDICT_PREFIX.match(text)
+    if match:
+        return match.group(1)
+    # Checking for "correct" as a substring would also match "incorrect"
+    match = re.search(r'\b(incorrect|correct)\b', text)
+    if match is None or match.group(1) == 'incorrect':
+        return 'incorrect'
+    before = re.findall(r"[\w']+", text[:match.start()])[-3:]
+    if any(word in NEGATIONS or word.endswith("n't") for word in before):
+        return 'incorrect'
+    return 'correct'
+
+
+def normalize_phrase(text):
+    """Casefold, strip punctuation and leading fillers like "to" or "the" """
+    text = re.sub(r"[^\w\s'-]", ' ', text.casefold())
+    text = ' '.join(text.split())
+    for filler in LEADING_FILLERS:
+        if text.startswith(filler):
+            text = text[len(filler):]
+    return text
+
+
+def split_synonyms(text):
+    """Split a definition like "house, home; building" into normalized synonyms"""
+    synonyms = (normalize_phrase(part) for part in re.split(r'[,;/\n]| or ', text))
+    return [synonym for synonym in synonyms if synonym]
+
+
+def is_typo(answer, expected):
+    """Whether answer is expected with two adjacent letters swapped or a doubled letter dropped or added.
+
+    Other one-letter differences often make a different real word
+    ("complement"/"compliment"), so those are left to the LLM.
+    """
+    if len(answer) == len(expected):
+        diff = [i for i, (a, b) in enumerate(zip(answer, expected)) if a != b]
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and answer[diff[0]] == expected[diff[1]] and answer[diff[1]] == expected[diff[0]])
+    shorter, longer = sorted((answer, expected), key=len)
+    if len(longer) != len(shorter) + 1:
+        return False
+    for i in range(1, len(longer)):
+        if longer[i] == longer[i - 1] and longer[:i] + longer[i + 1:] == shorter:
+            return True
+    return False
+
+
+def synonyms_match(answer, expected):
+    """Exact or typo-level match between two normalized synonyms"""
+    if answer == expected:
+        return True
+    if set(answer.split()) == set(expected.split()):
+        return True
+    # Short words are often one typo away from a different word ("form"/"from")
+    if len(expected) < 8:
+        return False
+    return is_typo(answer, expected)
+
+
+def grade_locally(word_entry, definition_answer, gender_answer=None):
+    """Grade trivially right or wrong answers without the LLM.
+
+    Returns a Verdict, or None when the answer needs the LLM to judge its meaning.
+    """
+    word = word_entry['word']
+
+    if word_entry['part_of_speech'] == 'noun' and gender_answer is not None:
+        expected_gender = word_entry.get('gender')
+        if expected_gender and gender_answer != expected_gender:
+            return Verdict(
+                'incorrect',
+                f"Your answer is incorrect! The gender of \"{word}\" is {expected_gender}, "
+                f"and it means: {word_entry['definition']}",
+                'local'
+            )
+
+    if normalize_phrase(definition_answer) in GIVE_UP_ANSWERS:
+        return Verdict(
+            'incorrect',
+            f"Your answer is incorrect! \"{word}\" means: {word_entry['definition']}",
+            'local'
+        )
+
+    # Every synonym the user gave has to match; partly matching answers go to the LLM
+    expected = split_synonyms(word_entry['definition'])
+    answers = split_synonyms(definition_answer)
+    if answers and all(any(synonyms_match(answer, synonym) for synonym in expected) for answer in answers):
+        return Verdict(
+            'correct',
+            f"Your answer is correct! \"{word}\" means: {word_entry['definition']}",
+            'local'
+        )
+
+    return None
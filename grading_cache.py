@@ -0,0 +1,122 @@
+# grading_cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Casefold and collapse whitespace so trivially different answers share a key"""
+    return ' '.join(str(text or '').casefold().split())
+
+
+def grading_key(word_entry, user_answer, model, prompt_version):
+    """Stable key for one (word, definition, gender, answer, model, prompt version) grading"""
+    parts = [
+        normalize_text(word_entry['word']),
+        normalize_text(word_entry['definition']),
+        normalize_text(word_entry.get('gender')),
+        normalize_text(user_answer),
+        model,
+        prompt_version,
+    ]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class GradingCache:
+    """Two-tier cache of LLM grading responses: an in-memory LRU over a SQLite file.
+
+    Entries older than ttl seconds are ignored and dropped. The disk tier is
+    trimmed back to max_disk_entries by least recent use.
+    """
+
+    def __init__(self, filename='grading_cache.db', memory_size=1024,
+                 max_disk_entries=100000, ttl=30 * 86400):
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.memory = OrderedDict()  # key -> (response, created_at)
+        self.lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self.puts_since_trim = 0
+
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS gradings ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the cached response for key, or None"""
+        now = time.time()
+        with self.lock:
+            if key in self.memory:
+                response, created_at = self.memory[key]
+                if now - created_at < self.ttl:
+                    self.memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return response
+                del self.memory[key]
+
+            row = self.conn.execute(
+                "SELECT response, created_at FROM gradings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                with self.conn:
+                    self.conn.execute("UPDATE gradings SET last_used = ? WHERE key = ?", (now, key))
+                self._remember(key, row[0], row[1])
+                self.stats['disk_hits'] += 1
+                return row[0]
+
+            if row is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM gradings WHERE key = ?", (key,))
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key, response):
+        """Store a response in both tiers"""
+        now = time.time()
+        with self.lock:
+            self._remember(key, response, now)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO gradings (key, response, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, now, now)
+                )
+                # Counting rows is O(n), so only check the size bound every 100 writes
+                self.puts_since_trim += 1
+                if self.puts_since_trim >= 100:
+                    self.puts_since_trim = 0
+                    self._trim_disk(now)
+
+    def _trim_disk(self, now):
+        self.conn.execute("DELETE FROM gradings WHERE created_at <= ?", (now - self.ttl,))
+        count = self.conn.execute("SELECT COUNT(*) FROM gradings").fetchone()[0]
+        if count > self.max_disk_entries:
+            self.conn.execute(
+                "DELETE FROM gradings WHERE key IN "
+                "(SELECT key FROM gradings ORDER BY last_used LIMIT ?)",
+                (count - self.max_disk_entries,)
+            )
+
+    def _remember(self, key, response, created_at):
+        self.memory[key] = (response, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,273 @@
+# llm_client.py
+
+import json
+import os
+import random
+import re
+import threading
+import time
+
+
+class LLMError(Exception):
+    """An LLM call failed after its retries, ran out of time, or the circuit was open"""
+
+
+class LLMResult:
+    """Text and token usage of one completion"""
+
+    def __init__(self, text, prompt_tokens=0, completion_tokens=0):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class GroqProvider:
+    """Groq chat completions. One client is kept so HTTP connections are reused.
+
+    The groq package is only imported when the first request is made, which keeps
+    it off the app's start-up path.
+    """
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from groq import Groq
+                    # Retries are handled by ResilientClient, so the SDK's own are turned off
+                    self._client = Groq(api_key=self.api_key or os.environ.get("GROQ_API_KEY"), max_retries=0)
+        return self._client
+
+    def complete(self, messages, model, timeout, **options):
+        completion = self.client.chat.completions.create(
+            messages=messages, model=model, timeout=timeout, **options
+        )
+        usage = completion.usage
+        return LLMResult(
+            completion.choices[0].message.content,
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0
+        )
+
+    def stream(self, messages, model, timeout, usage=None, **options):
+        stream = self.client.chat.completions.create(
+            messages=messages, model=model, timeout=timeout, stream=True, **options
+        )
+        for chunk in stream:
+            # Groq reports token usage on the last chunk
+            chunk_usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+            if usage is not None and chunk_usage is not None:
+                usage.prompt_tokens = chunk_usage.prompt_tokens
+                usage.completion_tokens = chunk_usage.completion_tokens
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
+
+def fake_response(prompt):
+    """Plausible canned answer for each of the app's prompts"""
+    if '"examples"' in prompt:
+        count = int(re.search(r'Write (\d+) new', prompt).group(1))
+        items = re.findall(r'^\s*(\d+)\. Word: (.+?) \|', prompt, re.MULTILINE)
+        examples = [
+            {'item': int(item), 'sentences': [f"Beispiel {n} mit {word}." for n in range(1, count + 1)]}
+            for item, word in items
+        ]
+        return json.dumps({'examples': examples})
+    if '"results"' in prompt:
+        items = re.findall(r'^\s*(\d+)\. German Word:', prompt, re.MULTILINE)
+        results = ', '.join(
+            f'{{"item": {item}, "verdict": "correct", "feedback": "Fake grading."}}' for item in items
+        )
+        return f'{{"results": [{results}]}}'
+    match = re.search(r'using the word "(.+?)"', prompt)
+    if match:
+        return f"Das ist ein neuer Beispielsatz mit {match.group(1)}."
+    return "Your answer is correct! (fake grading)"
+
+
+class FakeProvider:
+    """In-process stand-in for Groq with configurable latency, for load tests and benchmarks"""
+
+    def __init__(self, latency=0.2, token_latency=0.01, failure_rate=0.0, responder=fake_response, seed=None):
+        self.latency = latency  # Seconds before the first token
+        self.token_latency = token_latency  # Seconds between streamed tokens
+        self.failure_rate = failure_rate
+        self.responder = responder
+        self.random = random.Random(seed)
+
+    def _respond(self, messages, timeout):
+        if self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("fake LLM timed out")
+        time.sleep(self.latency)
+        if self.random.random() < self.failure_rate:
+            raise ConnectionError("fake LLM failure")
+        return self.responder(messages[-1]['content'])
+
+    def complete(self, messages, model, timeout, **options):
+        prompt = messages[-1]['content']
+        text = self._respond(messages, timeout)
+        return LLMResult(text, len(prompt) // 4, len(text) // 4)
+
+    def stream(self, messages, model, timeout, usage=None, **options):
+        text = self._respond(messages, timeout)
+        for token in re.findall(r'\S+\s*', text):
+            time.sleep(self.token_latency)
+            yield token
+        if usage is not None:
+            usage.prompt_tokens = len(messages[-1]['content']) // 4
+            usage.completion_tokens = len(text) // 4
+
+
+class ResilientClient:
+    """Wraps a provider with deadlines, retries, a circuit breaker and a concurrency limit.
+
+    Each call gets timeout seconds in total across all attempts. Failed attempts
+    are retried up to max_retries times with jittered exponential backoff. After
+    failure_threshold consecutive failures, calls fail fast for reset_after
+    seconds. Then a single trial call is let through while the others keep
+    failing fast: its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, provider, timeout=20.0, max_retries=2, backoff=0.5,
+                 max_concurrency=8, failure_threshold=5, reset_after=30.0):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False  # A trial call is in flight on the open circuit
+
+    def _check_circuit(self):
+        """Fail fast while the circuit is open; return True for the one trial call let through"""
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if self.probing or time.monotonic() - self.opened_at < self.reset_after:
+                raise LLMError("LLM circuit is open after repeated failures")
+            self.probing = True
+            return True
+
+    def _end_probe(self):
+        """Let another trial call through if this one ended without an outcome (e.g. it was abandoned)"""
+        with self.lock:
+            self.probing = False
+
+    def _record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def _record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold or self.probing:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def _should_retry(self, error, attempt, deadline):
+        status = getattr(error, 'status_code', None)
+        # Client errors other than rate limits and timeouts won't go away on retry
+        if status is not None and 400 <= status < 500 and status not in (408, 429):
+            return False
+        return attempt < self.max_retries and time.monotonic() < deadline
+
+    def _sleep_before_retry(self, attempt, deadline):
+        delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+
+    def _acquire(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self.slots.acquire(timeout=remaining):
+            raise LLMError(f"LLM request timed out after {self.timeout:g}s")
+
+    def complete(self, messages, model, **options):
+        """Return an LLMResult, or raise LLMError"""
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+        while True:
+            probe = self._check_circuit()
+            try:
+                self._acquire(deadline)
+            except LLMError:
+                if probe:
+                    self._end_probe()
+                raise
+            try:
+                result = self.provider.complete(messages, model, deadline - time.monotonic(), **options)
+            except Exception as e:
+                self._record_failure()
+                if not self._should_retry(e, attempt, deadline):
+                    raise LLMError(str(e)) from e
+            else:
+                self._record_success()
+                return result
+            finally:
+                self.slots.release()
+            self._sleep_before_retry(attempt, deadline)
+            attempt += 1
+
+    def stream(self, messages, model, usage=None, **options):
+        """Yield text chunks, or raise LLMError. Only retried before the first chunk.
+
+        If an LLMResult is passed as usage, its token counts are filled in once the
+        provider reports them.
+        """
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+        while True:
+            probe = self._check_circuit()
+            try:
+                self._acquire(deadline)
+            except LLMError:
+                if probe:
+                    self._end_probe()
+                raise
+            started = False
+            try:
+                for text in self.provider.stream(
+                    messages, model, deadline - time.monotonic(), usage=usage, **options
+                ):
+                    started = True
+                    yield text
+            except Exception as e:
+                self._record_failure()
+                if started or not self._should_retry(e, attempt, deadline):
+                    raise LLMError(str(e)) from e
+            else:
+                self._record_success()
+                return
+            finally:
+                self.slots.release()
+                if probe and self.probing:
+                    # The caller stopped reading the stream before it ended
+                    self._end_probe()
+            self._sleep_before_retry(attempt, deadline)
+            attempt += 1
+
+
+def create_llm_client():
+    """Build the LLM client configured by the environment.
+
+    DELINGO_LLM_BACKEND=fake selects FakeProvider, with DELINGO_FAKE_LLM_LATENCY
+    seconds of latency; anything else uses Groq.
+    """
+    if os.environ.get("DELINGO_LLM_BACKEND") == "fake":
+        provider = FakeProvider(latency=float(os.environ.get("DELINGO_FAKE_LLM_LATENCY", "0.2")))
+    else:
+        provider = GroqProvider()
+    return ResilientClient(provider, timeout=float(os.environ.get("DELINGO_LLM_TIMEOUT", "20")))
@@ -1,10 +1,146 @@
+import io
+import os
+import re
+import time
 import streamlit as st
 from vocab_manager import GermanVocabManager
+from grading_cache import GradingCache
+from llm_client import create_llm_client
+from storage import DEFAULT_USER, list_decks, open_deck, safe_name
+from search_index import VocabSearchIndex
+from bulk_io import FORMATS, detect_format, import_deck, export_text
+from example_pool import build_example_pools
+from drill import ASKING, GRADED, GRADING, GRADING_FAILED, DrillError, DrillSession
+
+POS_OPTIONS = ["noun", "verb", "adjective", "adverb", "preposition", "conjunction", "other", "phrase"]
+CATEGORY_OPTIONS = ['new', 'correct', 'incorrect']
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+NEW_DECK = "➕ New deck…"
+# Session state that belongs to the deck being practiced, dropped when switching decks
+DECK_STATE_KEYS = [
+    'vocabulary', 'schedule_index', 'search_index', 'drill', 'show_answer', 'quiz', 'export_requested',
+]
+
+CUSTOM_CSS = """
+    <style>
+    .main-title {
+        font-size: 48px;
+        color: #2E4053;
+        font-weight: bold;
+        text-align: center;
+        margin-bottom: 30px;
+        font-family: 'Arial', sans-serif;
+    }
+    .stButton > button {
+        width: 100%;
+        background-color: #f4f6f7;
+        color: #2E4053;
+        font-size: 18px;
+        font-weight: bold;
+        padding: 15px 0;
+        border: none;
+        border-radius: 5px;
+        margin-bottom: 10px;
+        transition: all 0.3s ease;
+    }
+    .stButton > button:hover {
+        background-color: #d4efdf;
+        color: #27ae60;
+    }
+    .question-box {
+        background-color: #F4F6F7;
+        padding: 15px;
+        border-radius: 10px;
+        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
+        margin-bottom: 20px;
+    }
+    .answer-box {
+        background-color: #E8F8F5;
+        padding: 15px;
+        border-radius: 10px;
+        margin-top: 10px;
+        margin-bottom: 20px;
+    }
+    .llm-response-box {
+        background-color: #F0F3F4;
+        padding: 15px;
+        border-radius: 10px;
+        margin-top: 20px;
+        border: 1px solid #D5DBDB;
+    }
+    div[data-baseweb="select"] {
+        min-height: 48px;
+    }
+    div[data-baseweb="select"] > div {
+        min-height: 48px;
+        font-size: 16px !important;
+        background-color: #f8f9fa;
+        border-radius: 5px;
+        padding: 5px 10px;
+    }
+    ul[role="listbox"] li {
+        min-height: 40px;
+        padding: 8px 16px;
+        font-size: 16px !important;
+    }
+    .stSelectbox > div {
+        padding: 5px;
+        margin-bottom: 15px;
+    }
+    .stTextArea > div > div > textarea {
+        background-color: #f8f9fa;
+        border-radius: 5px;
+        min-height: 100px;
+        font-size: 16px;
+    }
+    .stSelectbox > div > div[role="listbox"] {
+        height: auto;
+        max-height: 300px;
+    }
+    </style>
+"""
+CUSTOM_CSS = re.sub(r'\s*([{};:,>])\s*', r'\1', ' '.join(CUSTOM_CSS.split()))
+
+
+def set_state(key, value):
+    """Button callback that sets one session state value"""
+    st.session_state[key] = value
+
+
+def submit_answer():
+    """Submit button callback: hand the answer to the drill session, which moves on to grading"""
+    try:
+        st.session_state.drill.submit(st.session_state.user_answer_input, st.session_state.get('gender_answer'))
+    except DrillError:
+        st.session_state.answer_missing = True
+
+
+@st.cache_resource
+def get_llm_client():
+    return create_llm_client()
+
+
+@st.cache_resource
+def get_grading_cache():
+    return GradingCache(os.environ.get("DELINGO_GRADING_CACHE", "grading_cache.db"))
+
+
+@st.cache_resource
+def get_vocab_manager(user, deck):
+    """One manager per deck and process, shared by all sessions and kept across reruns.
+
+    Every deck shares the LLM client and grading cache; each manager adds the
+    deck's write-behind storage and thread pool. All are built on first use only.
+    """
+    return GermanVocabManager(storage=open_deck(user, deck), llm=get_llm_client(),
+                              grading_cache=get_grading_cache())
+
 
 class GermanVocabApp:
     def __init__(self):
-        self.vocab_manager = GermanVocabManager()
         self.setup_page()
+        self.select_deck()
         self.initialize_session_state()
         self.apply_custom_css()
 
@@ -12,117 +148,160 @@ class GermanVocabApp:
         """Configure the Streamlit page"""
         st.set_page_config(page_title="German Vocabulary Review", layout="wide")
 
+    def select_deck(self):
+        """Pick the learner and deck in the sidebar; switching drops the old deck's session state"""
+        user = safe_name(st.sidebar.text_input("Learner", value=DEFAULT_USER, key="learner").strip() or DEFAULT_USER)
+        decks = list_decks(user)
+        deck = st.sidebar.selectbox("Deck", decks + [NEW_DECK], key="deck_choice")
+        if deck == NEW_DECK:
+            name = st.sidebar.text_input("New deck name", key="new_deck_name").strip()
+            deck = safe_name(name) if name else decks[0]
+
+        self.vocab_manager = get_vocab_manager(user, deck)
+        reload = st.sidebar.button("🔄 Reload deck", help="Pick up changes saved by other sessions")
+        if reload:
+            self.vocab_manager.flush()
+        previous = st.session_state.get('deck_key')
+        if previous is not None and previous != (user, deck):
+            # The manager outlives this session, so write the old deck's queued changes now
+            get_vocab_manager(*previous).flush()
+        if reload or previous != (user, deck):
+            for key in DECK_STATE_KEYS:
+                st.session_state.pop(key, None)
+            st.session_state.deck_key = (user, deck)
+
     def initialize_session_state(self):
         """Initialize all session state variables"""
         if 'vocabulary' not in st.session_state:
             st.session_state.vocabulary = self.vocab_manager.load_vocabulary()
-        if 'current_word_index' not in st.session_state:
-            st.session_state.current_word_index = None
-        if 'user_answer' not in st.session_state:
-            st.session_state.user_answer = ''
-        if 'answer_submitted' not in st.session_state:
-            st.session_state.answer_submitted = False
+        if 'schedule_index' not in st.session_state:
+            st.session_state.schedule_index = self.vocab_manager.create_schedule_index(
+                st.session_state.vocabulary
+            )
         if 'show_answer' not in st.session_state:
             st.session_state.show_answer = False
-        if 'llm_response' not in st.session_state:
-            st.session_state.llm_response = ''
-        if 'consecutive_new_incorrect' not in st.session_state:
-            st.session_state.consecutive_new_incorrect = 0
+        if 'search_index' not in st.session_state:
+            st.session_state.search_index = VocabSearchIndex(st.session_state.vocabulary)
+        if 'drill' not in st.session_state:
+            # The practice card's state: current word, stage, answer, verdict and look-ahead
+            st.session_state.drill = DrillSession(
+                self.vocab_manager, st.session_state.vocabulary, st.session_state.schedule_index
+            )
+            st.session_state.drill.on_example_change = st.session_state.search_index.update
+        if 'quiz' not in st.session_state:
+            st.session_state.quiz = None  # Words, answers and verdicts of the current quiz round
 
     def apply_custom_css(self):
         """Apply custom CSS styling"""
-        st.markdown("""
-            <style>
-            .main-title {
-                font-size: 48px;
-                color: #2E4053;
-                font-weight: bold;
-                text-align: center;
-                margin-bottom: 30px;
-                font-family: 'Arial', sans-serif;
-            }
-            .stButton > button {
-                width: 100%;
-                background-color: #f4f6f7;
-                color: #2E4053;
-                font-size: 18px;
-                font-weight: bold;
-                padding: 15px 0;
-                border: none;
-                border-radius: 5px;
-                margin-bottom: 10px;
-                transition: all 0.3s ease;
-            }
-            .stButton > button:hover {
-                background-color: #d4efdf;
-                color: #27ae60;
-            }
-            .question-box {
-                background-color: #F4F6F7;
-                padding: 15px;
-                border-radius: 10px;
-                box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-                margin-bottom: 20px;
-            }
-            .answer-box {
-                background-color: #E8F8F5;
-                padding: 15px;
-                border-radius: 10px;
-                margin-top: 10px;
-                margin-bottom: 20px;
-            }
-            .llm-response-box {
-                background-color: #F0F3F4;
-                padding: 15px;
-                border-radius: 10px;
-                margin-top: 20px;
-                border: 1px solid #D5DBDB;
-            }
-            div[data-baseweb="select"] {
-                min-height: 48px;
-            }
-            div[data-baseweb="select"] > div {
-                min-height: 48px;
-                font-size: 16px !important;
-                background-color: #f8f9fa;
-                border-radius: 5px;
-                padding: 5px 10px;
-            }
-            ul[role="listbox"] li {
-                min-height: 40px;
-                padding: 8px 16px;
-                font-size: 16px !important;
-            }
-            .stSelectbox > div {
-                padding: 5px;
-                margin-bottom: 15px;
-            }
-            .stTextArea > div > div > textarea {
-                background-color: #f8f9fa;
-                border-radius: 5px;
-                min-height: 100px;
-                font-size: 16px;
-            }
-            .stSelectbox > div > div[role="listbox"] {
-                height: auto;
-                max-height: 300px;
-            }
-            </style>
-        """, unsafe_allow_html=True)
+        # Streamlit drops elements a rerun doesn't emit, so the style tag has to be
+        # sent every time; it is minified once at import to keep that cheap
+        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+    def select_page(self, key_prefix):
+        """Show filter and page controls; return the (index, word) pairs on the current page"""
+        vocabulary = st.session_state.vocabulary
+
+        query = st.text_input("🔎 Search words, definitions and examples", key=f"{key_prefix}_search")
+        search_ids = set(st.session_state.search_index.search(query)) if query.strip() else None
+
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            categories = st.multiselect("Category", CATEGORY_OPTIONS, key=f"{key_prefix}_categories")
+        with col2:
+            parts_of_speech = st.multiselect("Part of Speech", POS_OPTIONS, key=f"{key_prefix}_pos")
+        with col3:
+            page_size = st.selectbox(
+                "Words per page", PAGE_SIZE_OPTIONS,
+                index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE), key=f"{key_prefix}_page_size"
+            )
+
+        matches = [
+            i for i, word in enumerate(vocabulary)
+            if (search_ids is None or word['id'] in search_ids)
+            and (not categories or word.category in categories)
+            and (not parts_of_speech or word['part_of_speech'] in parts_of_speech)
+        ]
+        page_count = max(1, -(-len(matches) // page_size))
+
+        # Filters or deletions can leave the stored page number past the end
+        page_key = f"{key_prefix}_page"
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key=page_key)
+
+        start = (page - 1) * page_size
+        page_indices = matches[start:start + page_size]
+        if matches:
+            st.caption(f"Showing {start + 1}–{start + len(page_indices)} of {len(matches)} words")
+        else:
+            st.caption("No words match the filters.")
+        return [(i, vocabulary[i]) for i in page_indices]
 
     def show_all_vocabulary(self):
         """Display all vocabulary"""
         st.header("All Vocabulary")
-        for i, word in enumerate(st.session_state.vocabulary, 1):
-            with st.expander(f"{i}. {word['word']} ({word['part_of_speech']})"):
+        # Only the current page gets widgets, so reruns stay cheap as the deck grows
+        for i, word in self.select_page("review"):
+            with st.expander(f"{i + 1}. {word['word']} ({word['part_of_speech']})"):
                 if word['part_of_speech'] == 'noun':
                     st.write(f"**Gender:** {word['gender']}")
                 st.write(f"**Definition:** {word['definition']}")
                 st.write(f"**Current Example:** {word['example']}")
                 if word.get('previous_example'):
                     st.write(f"**Previous Example:** {word['previous_example']}")
-                st.write(f"**Times Asked:** {word.get('times_asked', 0)}")
-                st.write(f"**Category:** {word.get('category', 'new')}")
+                st.write(f"**Times Asked:** {word.times_asked}")
+                st.write(f"**Category:** {word.category}")
+
+    def statistics_view(self):
+        """Answer history from the review log; every number comes from its running counters"""
+        st.header("Statistics")
+        review_log = self.vocab_manager.review_log
+        totals = review_log.totals()
+        if not totals['reviews']:
+            st.info("No answers logged yet. Practice or play a quiz round to build up statistics.")
+            return
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Answers", totals['reviews'])
+        col2.metric("Accuracy", f"{totals['accuracy']:.0%}")
+        col3.metric("Words reviewed", totals['words_reviewed'])
+        col4.metric("Graded locally", f"{totals['sources']['local'] / totals['reviews']:.0%}")
+
+        daily = review_log.daily_counts(30)
+        st.subheader("Last 30 days")
+        st.bar_chart(
+            {
+                'day': [day for day, _, _ in daily],
+                'correct': [correct for _, _, correct in daily],
+                'incorrect': [reviews - correct for _, reviews, correct in daily],
+            },
+            x='day', y=['correct', 'incorrect'], color=['#27ae60', '#c0392b']
+        )
+
+        words = {word.id: word for word in st.session_state.vocabulary}
+        hardest = review_log.hardest_words(words)
+        if hardest:
+            st.subheader("Hardest words")
+            st.table([
+                {'word': words[word_id]['word'], 'answers': stats['reviews'], 'accuracy': f"{stats['accuracy']:.0%}"}
+                for word_id, stats in hardest
+            ])
+
+        st.subheader("Per word")
+        rows = []
+        for _, word in self.select_page("stats"):
+            stats = self.vocab_manager.get_word_statistics(word)
+            rows.append({
+                'word': word['word'],
+                'category': stats['category'],
+                'answers': stats['reviews'],
+                'accuracy': f"{stats['accuracy']:.0%}" if stats['accuracy'] is not None else "–",
+                'streak': stats['streak'],
+                'best streak': stats['best_streak'],
+                'last asked': stats['last_asked'] if word.last_asked else "never",
+            })
+        if rows:
+            st.table(rows)
 
     def add_vocabulary(self):
         """Add new vocabulary"""
@@ -132,8 +311,7 @@ class GermanVocabApp:
         
         with col1:
             new_word = st.text_input("🔤 German Word:")
-            pos_options = ["noun", "verb", "adjective", "adverb", "preposition", "conjunction", "other", "phrase"]
-            part_of_speech = st.selectbox("📝 Part of Speech:", pos_options)
+            part_of_speech = st.selectbox("📝 Part of Speech:", POS_OPTIONS)
             
             if part_of_speech == "noun":
                 gender = st.selectbox("⚥ Gender:", ["der (masculine)", "die (feminine)", "das (neutral)"])
@@ -144,8 +322,20 @@ class GermanVocabApp:
             definition = st.text_area("📚 Definition:")
             example = st.text_area("✏️ Example sentence:")
 
+        allow_duplicate = True
+        duplicates = st.session_state.search_index.find_duplicates(new_word) if new_word else []
+        if duplicates:
+            entries = st.session_state.search_index.entries
+            similar = ", ".join(
+                f"{entries[word_id]['word']} ({entries[word_id]['definition']})" for word_id, _ in duplicates[:5]
+            )
+            st.info(f"🔎 Similar words already in your deck: {similar}")
+            allow_duplicate = st.checkbox("Add it anyway")
+
         if st.button("➕ Add Word"):
-            if new_word and definition and example:
+            if not allow_duplicate:
+                st.warning("⚠️ This word looks like a duplicate. Tick \"Add it anyway\" to add it.")
+            elif new_word and definition and example:
                 new_entry = self.vocab_manager.create_new_word_entry(
                     word=new_word,
                     part_of_speech=part_of_speech,
@@ -154,119 +344,271 @@ class GermanVocabApp:
                     gender=gender
                 )
                 st.session_state.vocabulary.append(new_entry)
-                self.vocab_manager.save_vocabulary(st.session_state.vocabulary)
+                st.session_state.schedule_index.add(len(st.session_state.vocabulary) - 1)
+                st.session_state.search_index.add(new_entry)
+                self.vocab_manager.save_word(st.session_state.vocabulary, new_entry)
                 st.success("✅ Word added successfully!")
             else:
                 st.warning("⚠️ Please fill in all required fields.")
 
+        self.bulk_import_export()
+
+    def bulk_import_export(self):
+        """Import a whole deck from a file, or download the current one"""
+        with st.expander("📦 Bulk Import / Export"):
+            uploaded = st.file_uploader(
+                "Import CSV/TSV (with a header row), JSON Lines, or an Anki plain text export",
+                type=["csv", "tsv", "jsonl", "ndjson", "txt"]
+            )
+            if uploaded is not None:
+                import_format = st.selectbox(
+                    "Import format", FORMATS, index=FORMATS.index(detect_format(uploaded.name))
+                )
+                if st.button("📥 Import Words"):
+                    vocabulary = st.session_state.vocabulary
+                    first_new = len(vocabulary)
+                    # Decode while reading so rows stream through the pipeline
+                    lines = io.TextIOWrapper(uploaded, encoding='utf-8-sig', newline='')
+                    new_entries, report = import_deck(self.vocab_manager, vocabulary, lines, import_format)
+                    for offset, entry in enumerate(new_entries):
+                        st.session_state.schedule_index.add(first_new + offset)
+                        st.session_state.search_index.add(entry)
+                    st.success(
+                        f"✅ Added {report.added} words, skipped {report.duplicates} duplicates "
+                        f"and {report.invalid} invalid rows."
+                    )
+                    for message in report.errors:
+                        st.caption(message)
+
+            export_format = st.selectbox("Export format", FORMATS, key="export_format")
+            extension = {'anki': 'txt'}.get(export_format, export_format)
+            # The file is as big as the deck, so it is only built once asked for, not on every rerun
+            if st.session_state.get('export_requested') != export_format:
+                st.button("📤 Export Vocabulary", on_click=set_state, args=('export_requested', export_format))
+            else:
+                st.download_button(
+                    f"⬇️ Download german_vocab.{extension}",
+                    data=export_text(st.session_state.vocabulary, export_format),
+                    file_name=f"german_vocab.{extension}",
+                    on_click=set_state, args=('export_requested', None),
+                )
+
     def practice_mode(self):
         """Practice vocabulary"""
         st.header("Practice Vocabulary")
 
         if st.session_state.vocabulary:
-            if st.session_state.current_word_index is None:
-                st.session_state.current_word_index = self.vocab_manager.get_next_word_index(
-                    st.session_state.vocabulary, 
-                    st.session_state.consecutive_new_incorrect
-                )
-                st.session_state.user_answer = ''
-                st.session_state.answer_submitted = False
-                st.session_state.show_answer = False
-                st.session_state.llm_response = ''
+            self.practice_card()
+        else:
+            st.warning("No vocabulary available. Please add some words first.")
+
+    @st.fragment
+    def practice_card(self):
+        """The word being practiced. Its buttons rerun only this card, not the whole page.
+
+        The card is a thin client of the session's DrillSession. Buttons only move
+        the drill along, in their callbacks; each side effect happens once, when the
+        card renders a new stage: asking the word (times_asked, example refresh)
+        when it is picked, and grading and saving when an answer is submitted.
+        """
+        session = st.session_state.drill
+        question_box = st.empty()
+        if session.stage is None:
+            self.ask_next_word(question_box)
+        word_entry = session.word
+        self.show_question(question_box, word_entry, word_entry['example'])
+
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.button("👀 Show Answer", on_click=set_state, args=('show_answer', True))
+        with col2:
+            st.button("Next Word ➡️", on_click=session.skip)
+
+        if st.session_state.show_answer:
+            answer = session.reveal()
+            answer_text = f"**Definition:** {answer['definition']}"
+            if answer['gender']:
+                answer_text = f"**Gender:** {answer['gender']}<br>{answer_text}"
+            st.markdown(f'<div class="answer-box">{answer_text}</div>', unsafe_allow_html=True)
+            if answer['previous_example']:
+                st.info(f"Previous example: {answer['previous_example']}")
+
+        if session.stage == ASKING:
+            with st.form(key='answer_form'):
+                if word_entry['part_of_speech'] == 'noun':
+                    st.selectbox(
+                        "⚥ Gender:",
+                        ["der (masculine)", "die (feminine)", "das (neutral)"],
+                        key="gender_answer"
+                    )
+                st.text_area("✍️ Your Definition:", key="user_answer_input")
+                st.form_submit_button("📤 Submit Answer", on_click=submit_answer)
+                if st.session_state.pop('answer_missing', False):
+                    st.warning("⚠️ Please provide an answer.")
+
+        response_box = st.empty()
+        if session.stage == GRADING:
+            self.grade_current_answer(response_box)
+
+        if session.stage == GRADING_FAILED:
+            response_box.error("⚠️ Your answer couldn't be evaluated right now.")
+            st.button("🔁 Retry Evaluation", on_click=session.retry)
+        elif session.stage == GRADED:
+            response_box.markdown(f'<div class="llm-response-box">{session.verdict.feedback}</div>',
+                                  unsafe_allow_html=True)
+
+    def show_question(self, question_box, word_entry, example):
+        question_box.markdown(
+            f'<div class="question-box"><b>Word:</b> {word_entry["word"]}<br>'
+            f'<b>Example:</b> {example}</div>',
+            unsafe_allow_html=True
+        )
+
+    def ask_next_word(self, question_box):
+        """Pick the next word; a refreshed example that wasn't pooled or prefetched is streamed into question_box"""
+        session = st.session_state.drill
+        st.session_state.show_answer = False
+        session.next_word(on_example_text=lambda text: self.show_question(question_box, session.word, text))
+
+    def grade_current_answer(self, response_box):
+        """Stream the verdict into response_box.
+
+        The drill session keeps the stream, so a rerun in the middle of it carries
+        on with the same request instead of sending a new one.
+        """
+        session = st.session_state.drill
+        if session.feedback:
+            response_box.markdown(f'<div class="llm-response-box">{session.feedback}</div>',
+                                  unsafe_allow_html=True)
+        else:
+            response_box.info("⏳ Evaluating your answer, please wait...")
+        session.grade(on_feedback=lambda feedback: response_box.markdown(
+            f'<div class="llm-response-box">{feedback}</div>', unsafe_allow_html=True
+        ))
+
+    def quiz_mode(self):
+        """Answer a round of words, then grade them together"""
+        st.header("Quiz Round")
+
+        if not st.session_state.vocabulary:
+            st.warning("No vocabulary available. Please add some words first.")
+            return
 
-            word_entry = st.session_state.vocabulary[st.session_state.current_word_index]
+        quiz = st.session_state.quiz
+        if quiz is None:
+            round_size = st.number_input("Words per round:", min_value=1, max_value=20, value=10)
+            if st.button("🧩 Start Round"):
+                indices = self.vocab_manager.get_round_word_indices(
+                    st.session_state.vocabulary, int(round_size), st.session_state.schedule_index
+                )
+                st.session_state.quiz = {
+                    'indices': indices,
+                    'word_ids': [st.session_state.vocabulary[i].id for i in indices],
+                    'answers': [],
+                    'latencies': [],
+                    'verdicts': None,
+                    'shown_at': time.time(),
+                }
+                st.rerun()
+            return
 
-            if not st.session_state.answer_submitted:
-                self.vocab_manager.increment_times_asked(word_entry)
+        vocabulary = st.session_state.vocabulary
+        # Deleting words in the edit view shifts positions: find the round's words by id
+        indices = self.locate_words(vocabulary, quiz['indices'], quiz['word_ids'])
+        if indices is None:
+            # A word deleted since the round started can't be graded
+            st.session_state.quiz = None
+            st.warning("⚠️ The vocabulary changed, please start a new round.")
+            return
+        quiz['indices'] = indices
 
+        position = len(quiz['answers'])
+        if position < len(quiz['indices']):
+            word_entry = vocabulary[quiz['indices'][position]]
+            st.progress(position / len(quiz['indices']), text=f"Word {position + 1} of {len(quiz['indices'])}")
             st.markdown(
                 f'<div class="question-box"><b>Word:</b> {word_entry["word"]}<br>'
-                f'<b>Example:</b> {word_entry["example"]}</div>', 
+                f'<b>Example:</b> {word_entry["example"]}</div>',
                 unsafe_allow_html=True
             )
+            with st.form(key=f'quiz_form_{position}'):
+                gender_answer = None
+                if word_entry['part_of_speech'] == 'noun':
+                    gender_answer = st.selectbox(
+                        "⚥ Gender:",
+                        ["der (masculine)", "die (feminine)", "das (neutral)"],
+                        key=f"quiz_gender_{position}"
+                    )
+                definition_answer = st.text_area("✍️ Your Definition:", key=f"quiz_answer_{position}")
+                if st.form_submit_button("➡️ Next"):
+                    if definition_answer:
+                        previous_example = word_entry['example']
+                        self.vocab_manager.increment_times_asked(word_entry, vocabulary=vocabulary)
+                        if word_entry['example'] != previous_example:
+                            st.session_state.search_index.update(word_entry)
+                        st.session_state.schedule_index.update(quiz['indices'][position])
+                        quiz['answers'].append((definition_answer, gender_answer))
+                        quiz['latencies'].append(time.time() - quiz['shown_at'])
+                        quiz['shown_at'] = time.time()
+                        st.rerun()
+                    else:
+                        st.warning("⚠️ Please provide an answer.")
+            return
 
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                if st.button("👀 Show Answer"):
-                    st.session_state.show_answer = True
+        if quiz['verdicts'] is None:
+            st.info("⏳ Evaluating your answers, please wait...")
+            items = [
+                (vocabulary[i], definition_answer, gender_answer)
+                for i, (definition_answer, gender_answer) in zip(quiz['indices'], quiz['answers'])
+            ]
+            verdicts = self.vocab_manager.check_answers_batch(items)
+            for i, verdict, latency in zip(quiz['indices'], verdicts, quiz['latencies']):
+                if verdict.category == 'error':
+                    continue
+                vocabulary[i]['category'] = verdict.category
+                st.session_state.schedule_index.update(i)
+                self.vocab_manager.save_word(vocabulary, vocabulary[i])
+                self.vocab_manager.record_review(vocabulary[i], verdict, latency)
+            quiz['verdicts'] = [verdict.to_dict() for verdict in verdicts]
 
-            if st.session_state.show_answer:
-                answer_text = f"**Definition:** {word_entry['definition']}"
-                if word_entry['part_of_speech'] == 'noun':
-                    answer_text = f"**Gender:** {word_entry['gender']}<br>{answer_text}"
-                st.markdown(f'<div class="answer-box">{answer_text}</div>', unsafe_allow_html=True)
-                if word_entry.get('previous_example'):
-                    st.info(f"Previous example: {word_entry['previous_example']}")
-
-            if not st.session_state.answer_submitted:
-                with st.form(key='answer_form'):
-                    if word_entry['part_of_speech'] == 'noun':
-                        gender_answer = st.selectbox(
-                            "⚥ Gender:", 
-                            ["der (masculine)", "die (feminine)", "das (neutral)"], 
-                            key="gender_answer"
-                        )
-                    definition_answer = st.text_area("✍️ Your Definition:", key="user_answer_input")
-                    submit_button = st.form_submit_button("📤 Submit Answer")
-                    
-                    if submit_button:
-                        if definition_answer:
-                            if word_entry['part_of_speech'] == 'noun':
-                                st.session_state.user_answer = f"Gender: {gender_answer}\nDefinition: {definition_answer}"
-                            else:
-                                st.session_state.user_answer = definition_answer
-                            st.session_state.answer_submitted = True
-                            st.rerun()
-                        else:
-                            st.warning("⚠️ Please provide an answer.")
-
-            if st.session_state.answer_submitted and not st.session_state.llm_response:
-                st.info("⏳ Evaluating your answer, please wait...")
-                llm_response = self.vocab_manager.check_answer(word_entry, st.session_state.user_answer)
-                st.session_state.llm_response = llm_response
-
-                new_category = self.vocab_manager.categorize_answer(llm_response)
-                if new_category != "correct":
-                    st.session_state.consecutive_new_incorrect += 1
-                else:
-                    st.session_state.consecutive_new_incorrect = 0
-
-                word_entry['category'] = new_category
-                self.vocab_manager.save_vocabulary(st.session_state.vocabulary)
-
-            if st.session_state.llm_response:
-                st.markdown(f'<div class="llm-response-box">{st.session_state.llm_response}</div>', 
-                          unsafe_allow_html=True)
-
-            with col2:
-                if st.button("Next Word ➡️"):
-                    st.session_state.current_word_index = None
-                    st.rerun()
-        else:
-            st.warning("No vocabulary available. Please add some words first.")
+        correct_count = sum(verdict['category'] == 'correct' for verdict in quiz['verdicts'])
+        st.subheader(f"Score: {correct_count} / {len(quiz['verdicts'])}")
+        for i, (definition_answer, _), verdict in zip(quiz['indices'], quiz['answers'], quiz['verdicts']):
+            icon = {"correct": "✅", "incorrect": "❌"}.get(verdict['category'], "⚠️")
+            with st.expander(f"{icon} {vocabulary[i]['word']} — {definition_answer}"):
+                st.markdown(f'<div class="llm-response-box">{verdict["feedback"]}</div>', unsafe_allow_html=True)
+
+        if st.button("🔁 New Round"):
+            st.session_state.quiz = None
+            st.rerun()
+
+    def locate_words(self, vocabulary, indices, word_ids):
+        """Current positions of the words with word_ids, last seen at indices; None if one was deleted"""
+        if all(i < len(vocabulary) and vocabulary[i].id == word_id for i, word_id in zip(indices, word_ids)):
+            return indices
+        positions = {word.id: i for i, word in enumerate(vocabulary)}
+        if any(word_id not in positions for word_id in word_ids):
+            return None
+        return [positions[word_id] for word_id in word_ids]
 
     def edit_vocabulary(self):
         """Edit existing vocabulary"""
         st.header("Edit Vocabulary")
-        
-        # Define part of speech options consistently
-        pos_options = ["noun", "verb", "adjective", "adverb", "preposition", "conjunction", "other", "phrase"]
 
-        for i, word in enumerate(st.session_state.vocabulary):
+        for i, word in self.select_page("edit"):
             with st.expander(f"{word['word']} ({word['part_of_speech']})"):
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     new_word = st.text_input("Edit Word", word['word'], key=f"edit_w_{i}")
                     try:
-                        current_pos_index = pos_options.index(word['part_of_speech'])
+                        current_pos_index = POS_OPTIONS.index(word['part_of_speech'])
                     except ValueError:
                         current_pos_index = 0
                     
                     new_pos = st.selectbox(
                         "Part of Speech", 
-                        pos_options,
+                        POS_OPTIONS,
                         index=current_pos_index,
                         key=f"edit_pos_{i}"
                     )
@@ -291,16 +633,15 @@ class GermanVocabApp:
                     new_definition = st.text_area("Edit Definition", word['definition'], key=f"edit_def_{i}")
                     new_example = st.text_area("Edit Example", word['example'], key=f"edit_ex_{i}")
                     
-                    category_options = ['new', 'correct', 'incorrect']
-                    current_category = word.get('category', 'new')
+                    current_category = word.category
                     try:
-                        current_category_index = category_options.index(current_category)
+                        current_category_index = CATEGORY_OPTIONS.index(current_category)
                     except ValueError:
                         current_category_index = 0
                         
                     new_category = st.selectbox(
                         "Category", 
-                        category_options,
+                        CATEGORY_OPTIONS,
                         index=current_category_index,
                         key=f"edit_cat_{i}"
                     )
@@ -314,15 +655,18 @@ class GermanVocabApp:
                             part_of_speech=new_pos,
                             definition=new_definition,
                             example=new_example,
-                            gender=new_gender
+                            gender=new_gender,
+                            category=new_category
                         )
-                        self.vocab_manager.save_vocabulary(st.session_state.vocabulary)
+                        st.session_state.schedule_index.update(i)
+                        st.session_state.search_index.update(word)
+                        self.vocab_manager.save_word(st.session_state.vocabulary, word)
                         st.success("✅ Changes saved successfully!")
 
                 with col4:
                     if st.button("Delete Word", key=f"delete_{i}"):
-                        st.session_state.vocabulary.pop(i)
-                        self.vocab_manager.save_vocabulary(st.session_state.vocabulary)
+                        st.session_state.drill.delete_word(i)
+                        st.session_state.search_index.remove(word)
                         st.warning("❗ Word deleted.")
                         st.rerun()
 
@@ -332,7 +676,8 @@ class GermanVocabApp:
         
         mode = st.sidebar.radio(
             "Choose Mode",
-            ["Add Vocabulary 📝", "Edit Vocabulary ✏️", "Practice 🎯", "Review All 📖"],
+            ["Add Vocabulary 📝", "Edit Vocabulary ✏️", "Practice 🎯", "Quiz Round 🧩", "Review All 📖",
+             "Statistics 📊"],
             key="mode_selector"
         )
 
@@ -342,8 +687,82 @@ class GermanVocabApp:
             self.edit_vocabulary()
         elif mode == "Practice 🎯":
             self.practice_mode()
+        elif mode == "Quiz Round 🧩":
+            self.quiz_mode()
         elif mode == "Review All 📖":
             self.show_all_vocabulary()
+        elif mode == "Statistics 📊":
+            self.statistics_view()
+
+        self.example_pool_panel()
+
+        # Drawn last so it includes the timings of this run
+        if st.sidebar.checkbox("Show performance ⏱️", key="show_performance"):
+            self.performance_panel()
+
+    def example_pool_panel(self):
+        """Sidebar action that pre-generates examples, so practice never waits for the LLM"""
+        with st.sidebar.expander("Example pools"):
+            pool_size = st.number_input("Examples per word", min_value=1, max_value=20,
+                                        value=self.vocab_manager.example_pool_size, key="pool_size")
+            if st.button("🧱 Build example pools", key="build_pools"):
+                bar = st.progress(0.0, text="Generating examples...")
+                report = build_example_pools(
+                    self.vocab_manager, st.session_state.vocabulary, int(pool_size),
+                    progress=lambda done, total: bar.progress(done / total, text=f"{done}/{total} batches")
+                )
+                st.success(f"✅ Added {report.added} examples for {report.words} words.")
+                if report.failed:
+                    st.warning(f"⚠️ {report.failed} requests failed; build again to retry them.")
+
+    def performance_panel(self):
+        """Sidebar panel with the manager's operation timings and counters (all sessions)"""
+        metrics = self.vocab_manager.metrics
+        snapshot = metrics.snapshot()
+        with st.sidebar.expander("Performance", expanded=True):
+            if snapshot['histograms']:
+                st.table([
+                    {
+                        'operation': operation,
+                        'calls': histogram['count'],
+                        'mean ms': round(histogram['mean_ms'], 1),
+                        'p50 ms ≤': round(histogram['p50_ms'], 1),
+                        'p95 ms ≤': round(histogram['p95_ms'], 1),
+                        'max ms': round(histogram['max_ms'], 1),
+                    }
+                    for operation, histogram in sorted(snapshot['histograms'].items())
+                ])
+            else:
+                st.caption("Nothing timed yet.")
+
+            token_usage = self.vocab_manager.token_usage()
+            if token_usage:
+                st.table([
+                    {
+                        'LLM call': f"{usage['operation']} v{usage['prompt_version']}",
+                        'calls': usage['calls'],
+                        'prompt tokens': round(usage['mean_prompt_tokens']),
+                        'completion tokens': round(usage['mean_completion_tokens']),
+                    }
+                    for usage in token_usage
+                ])
+
+            st.table([
+                {
+                    'counter': counter['name'],
+                    'labels': ', '.join(f"{key}={value}" for key, value in counter['labels'].items()),
+                    'value': counter['value'],
+                }
+                for counter in sorted(snapshot['counters'], key=lambda counter: counter['name'])
+            ])
+
+            st.download_button("Export JSON", metrics.to_json(), file_name="delingo_metrics.json",
+                               mime="application/json")
+            st.download_button("Export Prometheus", metrics.to_prometheus(), file_name="delingo_metrics.prom",
+                               mime="text/plain")
+            if st.button("Reset timings", key="reset_metrics"):
+                metrics.reset()
+                st.rerun()
 
 if __name__ == "__main__":
     app = GermanVocabApp()
@@ -0,0 +1,140 @@
+# metrics.py
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the duration histogram buckets, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds"""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.bounds) and seconds > self.bounds[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the max for the +Inf bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_seconds': self.total,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.quantile(0.5) * 1000,
+            'p95_ms': self.quantile(0.95) * 1000,
+            'max_ms': self.max * 1000,
+            'buckets': {str(bound): count for bound, count in zip(self.bounds + ('+Inf',), self.counts)},
+        }
+
+
+class Metrics:
+    """Per-operation duration histograms and labelled counters, safe to share between threads.
+
+    Collectors are callables read whenever a snapshot is taken, for totals kept
+    elsewhere (e.g. bytes written by the storage backend).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # operation -> Histogram
+        self.counters = {}  # (name, sorted label items) -> value
+        self.collectors = {}  # name -> callable
+
+    def observe(self, operation, seconds):
+        with self.lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, operation):
+        """Time the body of a with block, whether or not it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(operation, time.perf_counter() - start)
+
+    def add(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def collect(self, name, callback):
+        self.collectors[name] = callback
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def snapshot(self):
+        """Histograms and counters as plain data"""
+        with self.lock:
+            histograms = {operation: histogram.to_dict() for operation, histogram in self.histograms.items()}
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in self.counters.items()
+            ]
+        for name, callback in self.collectors.items():
+            try:
+                counters.append({'name': name, 'labels': {}, 'value': callback()})
+            except Exception as e:
+                print(f"Error collecting metric {name}: {e}")
+        return {'histograms': histograms, 'counters': counters}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix='delingo'):
+        """Render a snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        name = f"{prefix}_operation_duration_seconds"
+        if snapshot['histograms']:
+            lines.append(f"# HELP {name} Duration of app operations.")
+            lines.append(f"# TYPE {name} histogram")
+        for operation, histogram in sorted(snapshot['histograms'].items()):
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                lines.append(f'{name}_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{operation="{operation}"}} {histogram["sum_seconds"]}')
+            lines.append(f'{name}_count{{operation="{operation}"}} {histogram["count"]}')
+
+        typed = set()
+        for counter in sorted(snapshot['counters'], key=lambda counter: counter['name']):
+            name = f"{prefix}_{counter['name']}_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            labels = ','.join(f'{key}="{value}"' for key, value in counter['labels'].items())
+            lines.append(f"{name}{{{labels}}} {counter['value']}" if labels else f"{name} {counter['value']}")
+        return '\n'.join(lines) + '\n'
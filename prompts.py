@@ -0,0 +1,229 @@
+# prompts.py
+
+from grading_cache import normalize_text
+
+CHARS_PER_TOKEN = 4  # Rough average for the Llama tokenizer on mixed German/English text
+MIN_FIELD_TOKENS = 4  # Fields are never cut shorter than this to fit a budget
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate(text, max_tokens):
+    """Cut text to about max_tokens, at a word boundary"""
+    text = ' '.join(str(text).split())
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0] + '…'
+
+
+def dedupe(examples, exclude=()):
+    """Drop empty, repeated and excluded examples (compared casefolded), keeping the first of each"""
+    seen = {normalize_text(example) for example in exclude}
+    unique = []
+    for example in examples:
+        key = normalize_text(example)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(example)
+    return unique
+
+
+class PromptTemplate:
+    """A prompt's text, kept here with the version that identifies it.
+
+    Bump the version whenever the text changes: it is part of the grading cache
+    key and of the usage counters, so responses and token counts of old and new
+    prompts are never mixed. Batch templates add one item line per word.
+    """
+
+    def __init__(self, name, version, text, item=None):
+        self.name = name
+        self.version = version
+        self.text = text
+        self.item = item
+
+    def render(self, **fields):
+        return self.text.format(**fields)
+
+
+GRADING = PromptTemplate('grading', '2', (
+    'German word: {word}\n'
+    'Correct definition: {definition}{gender}\n'
+    "User's answer: {answer}\n"
+    'Does the answer convey the meaning of the definition{gender_check}? Different wording is fine. '
+    'Start with "Your answer is correct!" or "Your answer is incorrect!", then explain in one or two sentences.'
+))
+
+GRADING_BATCH = PromptTemplate('grading_batch', '2', (
+    'Grade each answer: correct if it conveys the meaning of the definition (wording may differ); '
+    'for nouns the gender must match too.\n'
+    '{items}\n'
+    'Reply with JSON only, covering every item, with verdict "correct" or "incorrect":\n'
+    '{{"results": [{{"item": 1, "verdict": "correct", "feedback": "one short sentence"}}]}}'
+), item="{number}. German Word: {word} | Definition: {definition}{gender} | Answer: {answer}")
+
+EXAMPLE = PromptTemplate('example', '2', (
+    'Write one new, simple German sentence using the word "{word}" ({part_of_speech}{gender}: {definition}). '
+    'Use common vocabulary and keep it moderately short. It must differ from:\n'
+    '{history}\n'
+    'Reply with the sentence only, no translation or explanation.'
+))
+
+EXAMPLE_POOL = PromptTemplate('example_pool', '2', (
+    'Write {count} new, simple German example sentences for each word below, using common vocabulary, '
+    'moderately short, different from each other and from the current example.\n'
+    '{items}\n'
+    'Reply with JSON only, covering every item:\n'
+    '{{"examples": [{{"item": 1, "sentences": ["first sentence", "second sentence"]}}]}}'
+), item="{number}. Word: {word} | {part_of_speech}{gender} | {definition} | Current: {example}")
+
+
+class Prompt:
+    """A rendered prompt and what the budget did to it"""
+
+    def __init__(self, template, text, positions=None, dropped=0):
+        self.template = template
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.positions = positions  # For batch prompts: the positions of its items in the request
+        self.dropped = dropped  # History examples left out to stay within the budget
+
+
+class PromptBuilder:
+    """Renders the app's prompts within a token budget.
+
+    Free text from the deck and the learner is capped at max_field_tokens.
+    Example prompts list at most max_history earlier examples, newest first,
+    deduplicated and only while they fit in budget tokens. Batch prompts are
+    split into several requests, each within batch_budget tokens. When a
+    single prompt or batch item is still over its budget, its free text
+    fields are cut further, longest first, until it fits.
+    """
+
+    def __init__(self, budget=300, batch_budget=2500, max_field_tokens=80, max_history=3):
+        self.budget = budget
+        self.batch_budget = batch_budget
+        self.max_field_tokens = max_field_tokens
+        self.max_history = max_history
+
+    def field(self, text):
+        return truncate(text or '', self.max_field_tokens)
+
+    def fit(self, render, fields, budget, shrinkable):
+        """Cut the shrinkable fields, longest first, until render(**fields) is within budget tokens.
+
+        Returns the fields as cut. They can't get shorter than MIN_FIELD_TOKENS
+        each, so a prompt whose fixed text is over budget stays over it.
+        """
+        fields = dict(fields)
+        while True:
+            excess = estimate_tokens(render(**fields)) - budget
+            if excess <= 0:
+                return fields
+            name = max(shrinkable, key=lambda name: len(fields[name]))
+            tokens = estimate_tokens(fields[name])
+            cut = truncate(fields[name], max(MIN_FIELD_TOKENS, tokens - excess - 1))
+            if estimate_tokens(cut) >= tokens:
+                return fields
+            fields[name] = cut
+
+    def gender(self, word_entry, prefix):
+        if word_entry['part_of_speech'] != 'noun' or not word_entry.get('gender'):
+            return ''
+        return f"{prefix}{word_entry['gender']}"
+
+    def grading(self, word_entry, user_answer):
+        fields = self.fit(GRADING.render, {
+            'word': self.field(word_entry['word']),
+            'definition': self.field(word_entry['definition']),
+            'gender': self.gender(word_entry, '\nCorrect gender: '),
+            'gender_check': ' and name the correct gender' if word_entry['part_of_speech'] == 'noun' else '',
+            'answer': self.field(user_answer),
+        }, self.budget, ('word', 'definition', 'answer'))
+        return Prompt(GRADING, GRADING.render(**fields))
+
+    def example(self, word_entry):
+        """The example prompt with as much deduplicated history as fits the budget"""
+        history = [word_entry['example'], word_entry.get('previous_example')]
+        history += reversed(word_entry.get('example_history') or [])
+        history = [self.field(example) for example in dedupe(history)]
+
+        fields = {
+            'word': self.field(word_entry['word']),
+            'part_of_speech': word_entry['part_of_speech'],
+            'gender': self.gender(word_entry, ', '),
+            'definition': self.field(word_entry['definition']),
+        }
+        kept = []
+        for example in history[:self.max_history]:
+            text = EXAMPLE.render(history='\n'.join(kept + [example]), **fields)
+            # The current example always goes in, so the new one differs from it
+            if kept and estimate_tokens(text) > self.budget:
+                break
+            kept.append(example)
+        # Only the current example alone can be over budget; then it is cut too
+        fields = self.fit(EXAMPLE.render, dict(fields, history='\n'.join(kept)), self.budget,
+                          ('word', 'definition', 'history'))
+        return Prompt(EXAMPLE, EXAMPLE.render(**fields), dropped=len(history) - len(kept))
+
+    def _pack(self, template, items, shrinkable, **fields):
+        """Split items (the fields of each item line) into as few prompts as fit batch_budget tokens each.
+
+        An item too big for a prompt of its own has its shrinkable fields cut to fit.
+        """
+        overhead = estimate_tokens(template.render(items='', **fields))
+        last = len(items)  # Numbered as the last item, an item line is at its longest
+        items = [
+            self.fit(lambda **item: template.item.format(number=last, **item), item,
+                     self.batch_budget - overhead - 1, shrinkable)
+            for item in items
+        ]
+        batches = []
+        batch = []
+        tokens = overhead
+        for position, item in enumerate(items):
+            item_tokens = estimate_tokens(template.item.format(number=len(batch) + 1, **item)) + 1
+            if batch and tokens + item_tokens > self.batch_budget:
+                batches.append(batch)
+                batch, tokens = [], overhead
+            batch.append(position)
+            tokens += item_tokens
+        if batch:
+            batches.append(batch)
+        # Items are numbered from 1 within each prompt
+        return [
+            Prompt(template, template.render(items='\n'.join(
+                template.item.format(number=number, **items[position]) for number, position in enumerate(batch, 1)
+            ), **fields), positions=batch)
+            for batch in batches
+        ]
+
+    def grading_batch(self, items):
+        """Prompts grading (word_entry, user_answer) items, split to fit the batch budget"""
+        items = [
+            {
+                'word': self.field(word_entry['word']),
+                'definition': self.field(word_entry['definition']),
+                'gender': self.gender(word_entry, ' | Gender: '),
+                'answer': self.field(user_answer),
+            }
+            for word_entry, user_answer in items
+        ]
+        return self._pack(GRADING_BATCH, items, ('word', 'definition', 'answer'))
+
+    def example_pool(self, words, count):
+        """Prompts asking for count examples per word, split to fit the batch budget"""
+        items = [
+            {
+                'word': self.field(word['word']),
+                'part_of_speech': word['part_of_speech'],
+                'gender': self.gender(word, ', '),
+                'definition': self.field(word['definition']),
+                'example': self.field(word['example']),
+            }
+            for word in words
+        ]
+        return self._pack(EXAMPLE_POOL, items, ('word', 'definition', 'example'), count=count)
@@ -0,0 +1,286 @@
+# review_log.py
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import struct
+import threading
+import time
+
+from storage import FileLock, atomic_write_json
+
+MAGIC = b'DLRV'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH')  # Magic, format version, record size
+# Word key, timestamp, answer latency in seconds, verdict, grader source, padding to 32 bytes
+RECORD = struct.Struct('<16sdfBB2x')
+VERDICTS = ('incorrect', 'correct')
+SOURCES = ('local', 'llm')
+
+
+def word_key(word_id):
+    """16 bytes identifying a word: its uuid hex ids as is, a digest of anything else"""
+    try:
+        key = bytes.fromhex(word_id)
+        if len(key) == 16:
+            return key
+    except ValueError:
+        pass
+    return hashlib.md5(word_id.encode()).digest()
+
+
+def review_log_filename(deck_filename):
+    """german_vocab.json (or .db, .journal) -> german_vocab.reviews"""
+    return os.path.splitext(deck_filename)[0] + '.reviews'
+
+
+def review_day(timestamp):
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def day_bounds(timestamp):
+    """(start, end, 'YYYY-MM-DD') of the local day holding timestamp"""
+    local = time.localtime(timestamp)
+    start = time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1))
+    end = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return start, end, time.strftime('%Y-%m-%d', local)
+
+
+class WordReviews:
+    """Running totals of one word's reviews"""
+
+    __slots__ = ('reviews', 'correct', 'streak', 'best_streak', 'last_review', 'latency_total')
+
+    def __init__(self, reviews=0, correct=0, streak=0, best_streak=0, last_review=0.0, latency_total=0.0):
+        self.reviews = reviews
+        self.correct = correct
+        self.streak = streak  # Correct answers in a row, up to the latest one
+        self.best_streak = best_streak
+        self.last_review = last_review
+        self.latency_total = latency_total
+
+    def add(self, timestamp, correct, latency):
+        self.reviews += 1
+        self.latency_total += latency
+        self.last_review = max(self.last_review, timestamp)
+        if correct:
+            self.correct += 1
+            self.streak += 1
+            self.best_streak = max(self.best_streak, self.streak)
+        else:
+            self.streak = 0
+
+    def to_dict(self):
+        return {
+            'reviews': self.reviews,
+            'correct': self.correct,
+            'accuracy': self.correct / self.reviews if self.reviews else None,
+            'streak': self.streak,
+            'best_streak': self.best_streak,
+            'last_review': self.last_review,
+            'mean_latency': self.latency_total / self.reviews if self.reviews else None,
+        }
+
+
+class ReviewLog:
+    """Append-only binary log of graded answers, with counters kept up to date as it grows.
+
+    Every answer is one fixed-size 32 byte record, so millions of reviews stay
+    small and the file is never rewritten. Per-word totals and streaks, per-day
+    counts and per-source counts are updated on each append, so queries don't
+    scan the log. The counters are checkpointed to <log>.stats.json every
+    checkpoint_every records; opening the log loads the checkpoint and replays
+    only the records appended after it, including those of other processes.
+    """
+
+    def __init__(self, filename, checkpoint_every=500):
+        self.filename = filename
+        self.stats_filename = filename + '.stats.json'
+        self.checkpoint_every = checkpoint_every
+        self.lock = FileLock(filename)
+        self.thread_lock = threading.RLock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.records = 0  # Records folded into the counters
+        self.checkpointed = 0
+        self.words = {}  # word key hex -> WordReviews
+        self.days = {}  # 'YYYY-MM-DD' -> [reviews, correct]
+        self.sources = {source: 0 for source in SOURCES}
+        self.total_correct = 0
+        self.current_day = (0, 0, None)  # Records arrive mostly in time order, so the day rarely changes
+
+    def _add(self, key, timestamp, latency, correct, source):
+        stats = self.words.get(key)
+        if stats is None:
+            stats = self.words[key] = WordReviews()
+        stats.add(timestamp, correct, latency)
+        start, end, day = self.current_day
+        if not start <= timestamp < end:
+            self.current_day = start, end, day = day_bounds(timestamp)
+        day = self.days.setdefault(day, [0, 0])
+        day[0] += 1
+        day[1] += correct
+        self.sources[SOURCES[source]] += 1
+        self.total_correct += correct
+        self.records += 1
+
+    def _load_checkpoint(self):
+        self._reset()
+        if not os.path.exists(self.stats_filename):
+            return
+        try:
+            with open(self.stats_filename, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading review statistics, rebuilding them from the log: {e}")
+            return
+        if data.get('format_version') != FORMAT_VERSION:
+            return
+        self.records = self.checkpointed = data['records']
+        self.words = {key: WordReviews(*values) for key, values in data['words'].items()}
+        self.days = data['days']
+        self.sources.update(data['sources'])
+        self.total_correct = data['correct']
+
+    def _write_checkpoint(self):
+        atomic_write_json(self.stats_filename, {
+            'format_version': FORMAT_VERSION,
+            'records': self.records,
+            'correct': self.total_correct,
+            'sources': self.sources,
+            'days': self.days,
+            'words': {
+                key: [stats.reviews, stats.correct, stats.streak, stats.best_streak,
+                      stats.last_review, stats.latency_total]
+                for key, stats in self.words.items()
+            },
+        })
+        self.checkpointed = self.records
+
+    def _record_count(self):
+        """Complete records in the file; a crash mid-append can leave a partial one at the end"""
+        if not os.path.exists(self.filename):
+            return 0
+        return max(0, (os.path.getsize(self.filename) - HEADER.size) // RECORD.size)
+
+    def _catch_up(self):
+        """Fold records appended since the counters were last updated (by any process)"""
+        if not self.loaded:
+            self._load_checkpoint()
+            self.loaded = True
+        count = self._record_count()
+        if count < self.records:
+            # The log was replaced or truncated: the checkpoint no longer describes it
+            self._reset()
+        if count == self.records:
+            return
+        with open(self.filename, 'rb') as f:
+            f.seek(HEADER.size + self.records * RECORD.size)
+            data = f.read((count - self.records) * RECORD.size)
+        for key, timestamp, latency, verdict, source in RECORD.iter_unpack(data):
+            self._add(key.hex(), timestamp, latency, verdict, source)
+
+    def refresh(self):
+        with self.thread_lock:
+            self._catch_up()
+
+    def append(self, word_id, category, latency=0.0, source='llm', timestamp=None):
+        """Log one graded answer; category is 'correct' or 'incorrect'"""
+        record = (word_key(word_id), timestamp or time.time(), latency,
+                  VERDICTS.index(category), SOURCES.index(source))
+        with self.thread_lock, self.lock:
+            self._catch_up()
+            with open(self.filename, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size))
+                else:
+                    # Drop a partial record left by a crash so the next one stays aligned
+                    f.truncate(HEADER.size + self.records * RECORD.size)
+                f.write(RECORD.pack(*record))
+                f.flush()
+                os.fsync(f.fileno())
+            record = (record[0].hex(),) + record[1:]
+            self._add(*record)
+            if self.records - self.checkpointed >= self.checkpoint_every:
+                self._write_checkpoint()
+
+    def close(self):
+        """Checkpoint the counters so the next open doesn't replay this session's records"""
+        with self.thread_lock, self.lock:
+            if self.loaded and self.records != self.checkpointed:
+                self._write_checkpoint()
+
+    def word_stats(self, word_id):
+        with self.thread_lock:
+            self._catch_up()
+            return (self.words.get(word_key(word_id).hex()) or WordReviews()).to_dict()
+
+    def hardest_words(self, word_ids, count=10, min_reviews=3):
+        """[(word_id, stats)] of the count least accurate words with at least min_reviews answers"""
+        with self.thread_lock:
+            self._catch_up()
+            candidates = []
+            for word_id in word_ids:
+                stats = self.words.get(word_key(word_id).hex())
+                if stats is not None and stats.reviews >= min_reviews:
+                    candidates.append((stats.correct / stats.reviews, -stats.reviews, word_id, stats))
+            return [(word_id, stats.to_dict()) for _, _, word_id, stats in heapq.nsmallest(count, candidates)]
+
+    def daily_counts(self, days=30, now=None):
+        """[(day, reviews, correct)] for the last days days, oldest first"""
+        with self.thread_lock:
+            self._catch_up()
+            now = now or time.time()
+            result = []
+            for offset in range(days - 1, -1, -1):
+                day = review_day(now - offset * 86400)
+                reviews, correct = self.days.get(day, (0, 0))
+                result.append((day, reviews, correct))
+            return result
+
+    def totals(self):
+        with self.thread_lock:
+            self._catch_up()
+            return {
+                'reviews': self.records,
+                'correct': self.total_correct,
+                'accuracy': self.total_correct / self.records if self.records else None,
+                'words_reviewed': len(self.words),
+                'sources': dict(self.sources),
+            }
+
+    def iter_records(self):
+        """Yield (word key hex, timestamp, latency, verdict, source) for every logged answer"""
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb') as f:
+            magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or record_size != RECORD.size:
+                raise ValueError(f"{self.filename} is not a review log")
+            while True:
+                chunk = f.read(RECORD.size * 4096)
+                usable = len(chunk) - len(chunk) % RECORD.size
+                for key, timestamp, latency, verdict, source in RECORD.iter_unpack(chunk[:usable]):
+                    yield key.hex(), timestamp, latency, VERDICTS[verdict], SOURCES[source]
+                if len(chunk) < RECORD.size * 4096:
+                    return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize or dump a review log")
+    parser.add_argument('filename', help="review log, e.g. german_vocab.reviews")
+    parser.add_argument('--days', type=int, default=14, help="days of daily counts to show")
+    parser.add_argument('--dump', action='store_true', help="print every record as a JSON line instead")
+    args = parser.parse_args()
+
+    log = ReviewLog(args.filename)
+    if args.dump:
+        for key, timestamp, latency, verdict, source in log.iter_records():
+            print(json.dumps({'word': key, 'timestamp': timestamp, 'latency': round(latency, 3),
+                              'verdict': verdict, 'source': source}))
+    else:
+        print(json.dumps(dict(log.totals(), daily=log.daily_counts(args.days)), indent=2))
@@ -0,0 +1,238 @@
+# scheduler.py
+
+import heapq
+
+import numpy as np
+
+# Default priority weights used by GermanVocabManager.get_next_word_index
+CATEGORY_PRIORITY = {'new': 100, 'incorrect': 80, 'correct': 60}
+TIMES_ASKED_PENALTY = 5  # Priority lost per time a word has been asked
+HOUR_WEIGHT = 1  # Priority gained per hour since a word was last asked
+STALE_AFTER = 86400  # Seconds after which a word gets the staleness bonus
+STALE_BONUS = 20
+PICK_FROM = 5  # The next word is picked at random among this many top-priority words
+FORCE_CORRECT_AFTER = 4  # Consecutive new/incorrect words after which a correct one is preferred
+
+
+class SchedulerParams:
+    """Tunable weights of the priority formula; the defaults are the constants above"""
+
+    def __init__(self, new_priority=CATEGORY_PRIORITY['new'], incorrect_priority=CATEGORY_PRIORITY['incorrect'],
+                 correct_priority=CATEGORY_PRIORITY['correct'], times_asked_penalty=TIMES_ASKED_PENALTY,
+                 hour_weight=HOUR_WEIGHT, stale_after=STALE_AFTER, stale_bonus=STALE_BONUS,
+                 pick_from=PICK_FROM, force_correct_after=FORCE_CORRECT_AFTER):
+        self.category_priority = {'new': new_priority, 'incorrect': incorrect_priority, 'correct': correct_priority}
+        self.times_asked_penalty = times_asked_penalty
+        self.hour_weight = hour_weight
+        self.stale_after = stale_after
+        self.stale_bonus = stale_bonus
+        self.pick_from = pick_from
+        self.force_correct_after = force_correct_after
+
+    def base_priority(self, category):
+        # Unknown categories are ranked like correct words
+        return self.category_priority.get(category, self.category_priority['correct'])
+
+    def to_dict(self):
+        return {
+            'new_priority': self.category_priority['new'],
+            'incorrect_priority': self.category_priority['incorrect'],
+            'correct_priority': self.category_priority['correct'],
+            'times_asked_penalty': self.times_asked_penalty,
+            'hour_weight': self.hour_weight,
+            'stale_after': self.stale_after,
+            'stale_bonus': self.stale_bonus,
+            'pick_from': self.pick_from,
+            'force_correct_after': self.force_correct_after,
+        }
+
+
+DEFAULT_PARAMS = SchedulerParams()
+
+
+def static_priority(word, params=DEFAULT_PARAMS):
+    """Time-independent part of a word's priority.
+
+    The full priority is static_priority + now / 3600 * hour_weight, plus
+    stale_bonus when the word hasn't been asked for stale_after seconds. The
+    now term is the same for every word, so ordering by static priority (plus
+    the bonus) gives the same ranking as the full formula.
+    """
+    priority = params.base_priority(word.category)
+    priority -= word.times_asked * params.times_asked_penalty
+    priority -= word.last_asked / 3600 * params.hour_weight
+    return priority
+
+
+def vector_priorities(base, times_asked, last_asked, current_time, params=DEFAULT_PARAMS):
+    """The full priority formula over NumPy arrays of any (matching) shape"""
+    time_since_last = current_time - last_asked
+    priority = base - times_asked * params.times_asked_penalty
+    priority = priority + time_since_last / 3600 * params.hour_weight
+    priority += np.where(time_since_last > params.stale_after, params.stale_bonus, 0)
+    return priority
+
+
+def top_positions(priority, k):
+    """Positions of the k highest priorities, best first, with ties going to the lower position.
+
+    That is the order of rank_words' stable sort. priority is the priority of
+    every word of a deck, or a 2-D array with one deck per row, in which case
+    the result has one row per deck too.
+    """
+    k = min(k, priority.shape[-1])
+    if k <= 0:
+        return np.zeros(priority.shape[:-1] + (0,), dtype=np.int64)
+    if priority.ndim == 1:
+        if len(priority) == k:
+            candidates = np.arange(len(priority))
+        else:
+            kth = priority[np.argpartition(-priority, k - 1)[k - 1]]
+            # Of the words tied at the cut-off, take the lowest positions that still fit
+            above = np.flatnonzero(priority > kth)
+            ties = np.flatnonzero(priority == kth)[:k - len(above)]
+            candidates = np.concatenate([above, ties])
+        return candidates[np.lexsort((candidates, -priority[candidates]))]
+
+    kth = -np.partition(-priority, k - 1, axis=1)[:, k - 1:k]
+    above = priority > kth
+    ties = priority == kth  # The same tie rule, row by row
+    selected = above | (ties & (np.cumsum(ties, axis=1) <= k - above.sum(axis=1, keepdims=True)))
+    positions = np.nonzero(selected)[1].reshape(len(priority), k)
+    order = np.argsort(-np.take_along_axis(priority, positions, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(positions, order, axis=1)
+
+
+class SchedulingIndex:
+    """Max-heap over vocabulary positions keyed on static priority.
+
+    Updates push a new heap entry and bump the position's version, so stale
+    entries are skipped lazily instead of being removed in O(n).
+    """
+
+    def __init__(self, vocabulary, params=DEFAULT_PARAMS):
+        self.params = params
+        self.rebuild(vocabulary)
+
+    def rebuild(self, vocabulary):
+        """Rebuild the index from scratch (needed after deletions)"""
+        self.vocabulary = vocabulary
+        self.versions = [0] * len(vocabulary)
+        self.heap = [(-static_priority(word, self.params), i, 0) for i, word in enumerate(vocabulary)]
+        heapq.heapify(self.heap)
+
+    def is_current(self, vocabulary):
+        """Check whether the index still describes the given vocabulary list"""
+        return vocabulary is self.vocabulary and len(vocabulary) == len(self.versions)
+
+    def add(self, i):
+        """Register a word appended at position i"""
+        self.versions.append(0)
+        heapq.heappush(self.heap, (-static_priority(self.vocabulary[i], self.params), i, 0))
+
+    def update(self, i):
+        """Re-key the word at position i after its category or ask stats changed"""
+        self.versions[i] += 1
+        heapq.heappush(self.heap, (-static_priority(self.vocabulary[i], self.params), i, self.versions[i]))
+
+        # Drop accumulated stale entries once they outnumber the live ones
+        if len(self.heap) > 2 * len(self.versions) + 64:
+            self.rebuild(self.vocabulary)
+
+    def top(self, k, current_time):
+        """Return up to k positions with the highest priority, best first"""
+        cutoff = current_time - self.params.stale_after
+        stale_bonus = self.params.stale_bonus
+        max_bonus = max(0, stale_bonus)  # The most any word further down can gain
+        best = []  # Min-heap of (priority, -position) holding the current top k
+        popped = []
+
+        while self.heap:
+            neg_priority, i, version = self.heap[0]
+            if version != self.versions[i]:
+                heapq.heappop(self.heap)
+                continue
+
+            priority = -neg_priority
+            # Nothing further down the heap can beat the k-th best, even with the bonus.
+            # Ties go to the lower position, as in rank_words, and equal static
+            # priorities come off the heap in ascending position, so a tie past
+            # the worst kept position can't win either
+            if len(best) == k:
+                bound = priority + max_bonus
+                if bound < best[0][0] or (bound == best[0][0] and i > -best[0][1]):
+                    break
+
+            popped.append(heapq.heappop(self.heap))
+            if self.vocabulary[i].last_asked < cutoff:
+                priority += stale_bonus
+
+            if len(best) < k:
+                heapq.heappush(best, (priority, -i))
+            elif (priority, -i) > best[0]:
+                heapq.heapreplace(best, (priority, -i))
+
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+
+        return [-neg_i for _, neg_i in sorted(best, reverse=True)]
+
+
+class VectorScheduleIndex:
+    """Columnar scheduling index scored with NumPy in one vectorized pass.
+
+    Keeps base priority, times_asked and last_asked in arrays (grown by
+    doubling) and computes the same priority as GermanVocabManager.rank_words,
+    including its tie order, for the whole deck at once.
+    """
+
+    def __init__(self, vocabulary, params=DEFAULT_PARAMS):
+        self.params = params
+        self.rebuild(vocabulary)
+
+    def rebuild(self, vocabulary):
+        """Rebuild the arrays from scratch (needed after deletions)"""
+        self.vocabulary = vocabulary
+        self.size = len(vocabulary)
+        capacity = max(self.size, 16)
+        self.base = np.zeros(capacity, dtype=np.int64)
+        self.times_asked = np.zeros(capacity, dtype=np.int64)
+        self.last_asked = np.zeros(capacity, dtype=np.float64)
+        for i, word in enumerate(vocabulary):
+            self._store(i, word)
+
+    def _store(self, i, word):
+        self.base[i] = self.params.base_priority(word.category)
+        self.times_asked[i] = word.times_asked
+        self.last_asked[i] = word.last_asked
+
+    def is_current(self, vocabulary):
+        """Check whether the index still describes the given vocabulary list"""
+        return vocabulary is self.vocabulary and len(vocabulary) == self.size
+
+    def add(self, i):
+        """Register a word appended at position i"""
+        if i >= len(self.base):
+            capacity = 2 * len(self.base)
+            self.base = np.resize(self.base, capacity)
+            self.times_asked = np.resize(self.times_asked, capacity)
+            self.last_asked = np.resize(self.last_asked, capacity)
+        self.size = i + 1
+        self._store(i, self.vocabulary[i])
+
+    def update(self, i):
+        """Refresh the stored fields of the word at position i"""
+        self._store(i, self.vocabulary[i])
+
+    def priorities(self, current_time):
+        """Priority of every word, computed exactly like rank_words"""
+        return vector_priorities(
+            self.base[:self.size], self.times_asked[:self.size], self.last_asked[:self.size],
+            current_time, self.params
+        )
+
+    def top(self, k, current_time):
+        """Return up to k positions with the highest priority, best first"""
+        if self.size == 0:
+            return []
+        return top_positions(self.priorities(current_time), k).tolist()
@@ -0,0 +1,163 @@
+# search_index.py
+
+import re
+from collections import defaultdict
+
+ARTICLES = ('der ', 'die ', 'das ')
+
+
+def normalize_word(word):
+    """Casefold, collapse whitespace and drop a leading article, so "Das Haus" matches "haus" """
+    word = ' '.join(word.casefold().split())
+    for article in ARTICLES:
+        if word.startswith(article):
+            return word[len(article):]
+    return word
+
+
+def tokenize(text):
+    return set(re.findall(r'\w+', (text or '').casefold()))
+
+
+def trigrams(word):
+    padded = f"#{word}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = None  # Set of ids of words ending here, created on first use
+
+
+class VocabSearchIndex:
+    """Incrementally maintained search index over a vocabulary, keyed on entry ids.
+
+    Words are indexed in a prefix trie and by character trigrams (for near
+    duplicates); definitions and examples are indexed by token.
+    """
+
+    def __init__(self, vocabulary=()):
+        self.root = TrieNode()
+        self.trigram_index = defaultdict(set)
+        self.token_index = defaultdict(set)
+        self.entries = {}  # id -> entry
+        self.indexed = {}  # id -> (normalized word, trigrams, tokens) as last indexed
+        for word in vocabulary:
+            self.add(word)
+
+    def add(self, word):
+        word_id = word['id']
+        normalized = normalize_word(word['word'])
+        word_trigrams = trigrams(normalized)
+        tokens = tokenize(word.get('definition')) | tokenize(word.get('example'))
+
+        node = self.root
+        for char in normalized:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if node.ids is None:
+            node.ids = set()
+        node.ids.add(word_id)
+        for trigram in word_trigrams:
+            self.trigram_index[trigram].add(word_id)
+        for token in tokens:
+            self.token_index[token].add(word_id)
+
+        self.entries[word_id] = word
+        self.indexed[word_id] = (normalized, word_trigrams, tokens)
+
+    def remove(self, word):
+        word_id = word['id']
+        if word_id not in self.indexed:
+            return
+        normalized, word_trigrams, tokens = self.indexed.pop(word_id)
+        del self.entries[word_id]
+
+        node = self.root
+        for char in normalized:
+            node = node.children[char]
+        node.ids.discard(word_id)
+        for trigram in word_trigrams:
+            self._discard(self.trigram_index, trigram, word_id)
+        for token in tokens:
+            self._discard(self.token_index, token, word_id)
+
+    @staticmethod
+    def _discard(index, key, word_id):
+        ids = index[key]
+        ids.discard(word_id)
+        if not ids:
+            del index[key]
+
+    def update(self, word):
+        """Re-index an entry after its word, definition or example changed"""
+        self.remove(word)
+        self.add(word)
+
+    def prefix_search(self, prefix, limit=None):
+        """Ids of words starting with prefix, shortest words first"""
+        node = self.root
+        for char in normalize_word(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        results = []
+        level = [node]
+        while level and (limit is None or len(results) < limit):
+            next_level = []
+            for current in level:
+                if current.ids:
+                    results.extend(current.ids)
+                next_level.extend(current.children.values())
+            level = next_level
+        return results if limit is None else results[:limit]
+
+    def token_search(self, query):
+        """Ids whose definition or example contains every token of query"""
+        tokens = tokenize(query)
+        if not tokens:
+            return set()
+        # Intersect starting from the rarest token
+        postings = sorted((self.token_index.get(token, set()) for token in tokens), key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+        return result
+
+    def search(self, query, limit=None):
+        """Ids matching query by word prefix, then by definition/example tokens"""
+        results = self.prefix_search(query)
+        seen = set(results)
+        results.extend(word_id for word_id in self.token_search(query) if word_id not in seen)
+        return results if limit is None else results[:limit]
+
+    def find_duplicates(self, word, exclude_id=None, threshold=0.5):
+        """(id, similarity) of words equal or similar to word, most similar first"""
+        normalized = normalize_word(word)
+        if not normalized:
+            return []
+        query_trigrams = trigrams(normalized)
+
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for word_id in self.trigram_index.get(trigram, ()):
+                shared[word_id] += 1
+
+        matches = []
+        for word_id, count in shared.items():
+            if word_id == exclude_id:
+                continue
+            candidate, candidate_trigrams, _ = self.indexed[word_id]
+            if candidate == normalized:
+                similarity = 1.0
+            else:
+                similarity = count / (len(query_trigrams) + len(candidate_trigrams) - count)
+            if similarity >= threshold:
+                matches.append((word_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
@@ -0,0 +1,317 @@
+# simulation.py
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from scheduler import SchedulerParams, top_positions, vector_priorities
+
+DAY = 86400
+START_TIME = 1.7e9  # Virtual clock start; new words keep last_asked = 0 as in the app
+NEW, INCORRECT, CORRECT = 0, 1, 2  # Category codes
+SCHEDULERS = ['delingo', 'sm2']
+
+
+class LearnerModel:
+    """Forgetting-curve model of simulated learners.
+
+    A seen word is recalled with probability exp(-elapsed / stability). The first
+    review teaches the word with initial_stability days. A successful review
+    multiplies stability by up to growth, and by less the more certain the recall
+    already was, so drilling well-known words adds little. A lapse multiplies it
+    by lapse_factor. Learner ability and word difficulty vary log-normally, and
+    each day a learner skips their session with probability skip_day.
+    """
+
+    def __init__(self, initial_stability=2.0, growth=3.0, lapse_factor=0.5, min_stability=0.25,
+                 prior_knowledge=0.1, ability_spread=0.3, difficulty_spread=0.4, skip_day=0.15):
+        self.initial_stability = initial_stability
+        self.growth = growth
+        self.lapse_factor = lapse_factor
+        self.min_stability = min_stability
+        self.prior_knowledge = prior_knowledge
+        self.ability_spread = ability_spread
+        self.difficulty_spread = difficulty_spread
+        self.skip_day = skip_day
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class Population:
+    """Memory state of learners x words, plus the app-side fields the scheduler sees"""
+
+    def __init__(self, learners, words, model, rng):
+        shape = (learners, words)
+        self.model = model
+        self.ability = rng.lognormal(0, model.ability_spread, (learners, 1))
+        self.difficulty = rng.lognormal(0, model.difficulty_spread, shape)
+        self.seen = np.zeros(shape, dtype=bool)
+        self.stability = np.zeros(shape)  # Days
+        self.last_review = np.zeros(shape)
+
+        self.category = np.full(shape, NEW, dtype=np.int8)
+        self.times_asked = np.zeros(shape, dtype=np.int64)
+        self.last_asked = np.zeros(shape)
+        self.consecutive_new_incorrect = np.zeros(learners, dtype=np.int64)
+
+        # SM-2 state
+        self.easiness = np.full(shape, 2.5)
+        self.interval = np.zeros(shape)  # Days
+        self.repetitions = np.zeros(shape, dtype=np.int64)
+        self.due = np.zeros(shape)
+
+    def recall_probability(self, now):
+        elapsed = (now - self.last_review) / DAY
+        recall = np.exp(-elapsed / np.maximum(self.stability, 1e-9))
+        return np.where(self.seen, recall, self.model.prior_knowledge)
+
+    def review(self, rows, cols, now, rng):
+        """Simulate answering word cols[i] for learner rows[i]; returns the correct mask"""
+        model = self.model
+        seen = self.seen[rows, cols]
+        elapsed = (now - self.last_review[rows, cols]) / DAY
+        stability = self.stability[rows, cols]
+        recall = np.where(seen, np.exp(-elapsed / np.maximum(stability, 1e-9)), model.prior_knowledge)
+        correct = rng.random(len(rows)) < recall
+
+        strength = self.ability[rows, 0] / self.difficulty[rows, cols]
+        grown = stability * (1 + (model.growth - 1) * strength * np.sqrt(1 - recall))
+        lapsed = np.maximum(model.min_stability, stability * model.lapse_factor)
+        learned = model.initial_stability * strength
+        self.stability[rows, cols] = np.where(~seen, learned, np.where(correct, grown, lapsed))
+        self.seen[rows, cols] = True
+        self.last_review[rows, cols] = now
+        return correct, recall
+
+
+def delingo_candidates(population, rows, now, params):
+    """The words GermanVocabManager.get_next_word_index picks from, one row per learner.
+
+    Returns the top pick_from words, selected exactly like the app's scheduling
+    indexes, and which of them may be picked: after force_correct_after
+    new/incorrect words in a row only the correct ones, if there are any.
+    """
+    base = np.array([
+        params.base_priority('new'), params.base_priority('incorrect'), params.base_priority('correct')
+    ])[population.category[rows]]
+    priority = vector_priorities(
+        base, population.times_asked[rows], population.last_asked[rows], now, params
+    )
+    top = top_positions(priority, params.pick_from)
+
+    force = population.consecutive_new_incorrect[rows] >= params.force_correct_after
+    allowed = np.take_along_axis(population.category[rows], top, axis=1) == CORRECT
+    allowed &= force[:, None]
+    allowed |= ~allowed.any(axis=1, keepdims=True)  # No forced candidate: any of the top words
+    return top, allowed
+
+
+def pick_delingo(population, rows, now, params, rng):
+    """The app's scheduler: random pick among delingo_candidates"""
+    top, allowed = delingo_candidates(population, rows, now, params)
+    choice = np.argmax(rng.random(top.shape) * allowed, axis=1)
+    return top[np.arange(len(rows)), choice]
+
+
+def record_delingo(population, rows, cols, correct, now):
+    population.category[rows, cols] = np.where(correct, CORRECT, INCORRECT)
+    population.times_asked[rows, cols] += 1
+    population.last_asked[rows, cols] = now
+    population.consecutive_new_incorrect[rows] = np.where(
+        correct, 0, population.consecutive_new_incorrect[rows] + 1
+    )
+
+
+def pick_sm2(population, rows, now, params, rng):
+    """SuperMemo-2: the most overdue word, else the next new word, else the next one due"""
+    words = population.seen.shape[1]
+    seen = population.seen[rows]
+    # New words rank after every due word but before words due in the future
+    score = np.where(seen, population.due[rows], now + np.arange(words) * 1e-6)
+    return np.argmin(score, axis=1)
+
+
+def record_sm2(population, rows, cols, correct, now):
+    quality = np.where(correct, 4, 1)
+    easiness = population.easiness[rows, cols] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    easiness = np.maximum(1.3, easiness)
+    repetitions = np.where(correct, population.repetitions[rows, cols] + 1, 0)
+    interval = np.where(
+        repetitions <= 1, 1.0,
+        np.where(repetitions == 2, 6.0, population.interval[rows, cols] * easiness)
+    )
+    population.easiness[rows, cols] = easiness
+    population.repetitions[rows, cols] = repetitions
+    population.interval[rows, cols] = interval
+    population.due[rows, cols] = now + interval * DAY
+    population.times_asked[rows, cols] += 1
+
+
+PICKERS = {'delingo': (pick_delingo, record_delingo), 'sm2': (pick_sm2, record_sm2)}
+
+
+def simulate(scheduler, learners, words, days, reviews_per_day, params=None, model=None,
+             review_spacing=20, seed=0):
+    """Run one group of learners through days of daily sessions.
+
+    Returns summed totals and per-learner final values, so results of several
+    groups (e.g. from a process pool) can be combined with combine().
+    """
+    params = params or SchedulerParams()
+    model = model or LearnerModel()
+    # Same population for every scheduler with the same seed
+    population = Population(learners, words, model, np.random.default_rng(seed))
+    rng = np.random.default_rng(seed + 1)
+    pick, record = PICKERS[scheduler]
+
+    totals = {'reviews': 0, 'correct': 0, 'lapses': 0, 'overlearned': 0, 'first_exposures': 0}
+    daily = {'retention': [], 'reviews': [], 'accuracy': []}
+    for day in range(days):
+        session_start = START_TIME + day * DAY + 18 * 3600
+        rows = np.flatnonzero(rng.random(learners) >= model.skip_day)
+        day_correct = 0
+        for step in range(reviews_per_day if len(rows) else 0):
+            now = session_start + step * review_spacing
+            cols = pick(population, rows, now, params, rng)
+            seen = population.seen[rows, cols]
+            correct, recall = population.review(rows, cols, now, rng)
+            record(population, rows, cols, correct, now)
+
+            day_correct += int(correct.sum())
+            totals['lapses'] += int((seen & ~correct).sum())
+            totals['overlearned'] += int((seen & (recall > 0.95)).sum())
+            totals['first_exposures'] += int((~seen).sum())
+
+        day_reviews = len(rows) * reviews_per_day
+        totals['reviews'] += day_reviews
+        totals['correct'] += day_correct
+        end_of_day = START_TIME + (day + 1) * DAY
+        daily['retention'].append(float(population.recall_probability(end_of_day).sum()))
+        daily['reviews'].append(day_reviews)
+        daily['accuracy'].append(day_correct)
+
+    final_recall = population.recall_probability(START_TIME + days * DAY)
+    return {
+        'learners': learners,
+        'words': words,
+        'totals': totals,
+        'daily': daily,
+        'retention': final_recall.mean(axis=1).tolist(),
+        'known_words': (final_recall > 0.9).sum(axis=1).tolist(),
+        'coverage': population.seen.mean(axis=1).tolist(),
+    }
+
+
+def combine(parts):
+    """Merge simulate() results of several learner groups into a report"""
+    learners = sum(part['learners'] for part in parts)
+    words = parts[0]['words']
+    totals = {key: sum(part['totals'][key] for part in parts) for key in parts[0]['totals']}
+    days = len(parts[0]['daily']['retention'])
+    daily_reviews = [sum(part['daily']['reviews'][day] for part in parts) for day in range(days)]
+    retention = np.concatenate([part['retention'] for part in parts])
+    known_words = np.concatenate([part['known_words'] for part in parts])
+    reviews = max(totals['reviews'], 1)
+    return {
+        'learners': learners,
+        'final_retention': {
+            'mean': float(retention.mean()),
+            'p10': float(np.percentile(retention, 10)),
+            'p90': float(np.percentile(retention, 90)),
+        },
+        'known_words_mean': float(known_words.mean()),  # Words recalled with > 90% probability at the end
+        'coverage_mean': float(np.concatenate([part['coverage'] for part in parts]).mean()),
+        'accuracy': totals['correct'] / reviews,
+        'lapse_rate': totals['lapses'] / reviews,  # Seen words answered wrongly
+        'overlearned_rate': totals['overlearned'] / reviews,  # Reviews of words recalled > 95% anyway
+        'reviews_per_learner_day': totals['reviews'] / max(1, sum(len(part['retention']) for part in parts) * days),
+        'daily_retention': [
+            sum(part['daily']['retention'][day] for part in parts) / (learners * words) for day in range(days)
+        ],
+        'daily_accuracy': [
+            sum(part['daily']['accuracy'][day] for part in parts) / max(1, daily_reviews[day])
+            for day in range(days)
+        ],
+    }
+
+
+def _simulate_chunk(args):
+    return simulate(*args[:-2], **args[-2], seed=args[-1])
+
+
+def run(schedulers, learners, words, days, reviews_per_day, params=None, model=None,
+        processes=1, chunk_size=500, seed=0):
+    """Simulate each scheduler on the same learners, split into chunks across processes"""
+    chunks = [min(chunk_size, learners - start) for start in range(0, learners, chunk_size)]
+    results = {}
+    with ProcessPoolExecutor(processes) if processes > 1 else _InlineExecutor() as executor:
+        for scheduler in schedulers:
+            start = time.perf_counter()
+            jobs = [
+                (scheduler, size, words, days, reviews_per_day, {'params': params, 'model': model}, seed + 1000 * i)
+                for i, size in enumerate(chunks)
+            ]
+            report = combine(list(executor.map(_simulate_chunk, jobs)))
+            report['seconds'] = time.perf_counter() - start
+            results[scheduler] = report
+    return results
+
+
+class _InlineExecutor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def map(self, function, iterable):
+        return map(function, iterable)
+
+
+def parse_overrides(pairs, defaults):
+    """Turn ["stale_bonus=30", ...] into keyword arguments typed like the defaults"""
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition('=')
+        if name not in defaults:
+            raise SystemExit(f"Unknown parameter {name}; choose from {', '.join(defaults)}")
+        overrides[name] = type(defaults[name])(float(value)) if not isinstance(defaults[name], bool) else value
+    return overrides
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate learners practicing with the scheduler over virtual weeks")
+    parser.add_argument('--schedulers', default=','.join(SCHEDULERS), help="comma-separated, from: %(default)s")
+    parser.add_argument('--learners', type=int, default=1000)
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--reviews-per-day', type=int, default=30)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help="override a scheduler parameter, e.g. --set stale_bonus=30")
+    parser.add_argument('--model', action='append', default=[], metavar='NAME=VALUE',
+                        help="override a learner model parameter, e.g. --model growth=2.5")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    params = SchedulerParams(**parse_overrides(args.set, SchedulerParams().to_dict()))
+    model = LearnerModel(**parse_overrides(args.model, LearnerModel().to_dict()))
+    report = {
+        'learners': args.learners, 'words': args.words, 'days': args.days,
+        'reviews_per_day': args.reviews_per_day, 'seed': args.seed,
+        'scheduler_params': params.to_dict(),
+        'learner_model': model.to_dict(),
+        'results': run(args.schedulers.split(','), args.learners, args.words, args.days,
+                       args.reviews_per_day, params, model, args.processes, seed=args.seed),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
@@ -0,0 +1,698 @@
+# storage.py
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+
+from word_entry import WordEntry, json_default
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are kept apart
+    fcntl = None
+
+DEFAULT_USER = 'default'
+DEFAULT_DECK = 'german_vocab'
+STATS_FIELDS = ('times_asked', 'last_asked', 'category', 'previous_example', 'last_example_refresh',
+                'example_history', 'example_pool')
+RESULTS_TTL = 600  # Seconds a written snapshot waits for its session to pick up the merged stats
+
+
+def atomic_write_json(filename, data):
+    """Write JSON to a temporary file and atomically replace the target. Returns the size written."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=json_default)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp_path, filename)
+        return size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class FileLock:
+    """Exclusive lock on <filename>.lock, held against other threads and other processes"""
+
+    def __init__(self, filename):
+        self.lock_filename = filename + '.lock'
+        self.thread_lock = threading.Lock()
+        self.file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            self.file = open(self.lock_filename, 'a')
+            if fcntl is not None:
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+        finally:
+            self.thread_lock.release()
+
+
+def merge_word(stored, incoming):
+    """Combine a stored entry with a concurrent update of it (both dicts).
+
+    The edited fields (word, definition, ...) come from the update being saved.
+    Practice stats are combined instead of overwritten: the higher times_asked
+    and last_example_refresh, the category of whichever was asked last, and the
+    union of both example histories. The example is the update's too, unless
+    the stored entry has already replaced it (it is the stored previous example
+    or in the stored history), so neither a refresh nor a hand edit is undone
+    by a session still holding the old example. Pooled examples from either
+    side stay pooled unless one of them has already been shown.
+    """
+    merged = dict(stored)
+    merged.update(incoming)
+    merged['times_asked'] = max(stored.get('times_asked', 0), incoming['times_asked'])
+    merged['last_example_refresh'] = max(stored.get('last_example_refresh', 0), incoming['last_example_refresh'])
+    if stored.get('last_asked', 0) > incoming['last_asked']:
+        for field in ('last_asked', 'category'):
+            if field in stored:
+                merged[field] = stored[field]
+    history = list(stored.get('example_history', []))
+    if 'example' in stored and incoming['example'] in set(history) | {stored.get('previous_example')}:
+        merged['example'] = stored['example']
+        merged['previous_example'] = stored.get('previous_example')
+    if stored.get('example') not in (None, merged['example']) and stored['example'] not in history:
+        # The stored example lost to the update's; keep it in the history
+        history.append(stored['example'])
+    history += [example for example in incoming['example_history'] if example not in history]
+    merged['example_history'] = [example for example in history if example != merged['example']][-5:]
+    used = set(history) | {merged['example']}
+    pool = []
+    for example in stored.get('example_pool', []) + incoming.get('example_pool', []):
+        if example not in used and example not in pool:
+            pool.append(example)
+    merged['example_pool'] = pool
+    return merged
+
+
+def resolve_update(stored, word):
+    """The dict to write for word, given the stored version of it (or None).
+
+    Each write bumps the entry's rev. A stored rev newer than the one word was
+    loaded with means another session saved it meanwhile; the two are merged and
+    word is updated to match, so the session carries on from the merged state.
+    Under WriteBehindStorage, word is the copy queued for writing, never the
+    session's own entry.
+    """
+    data = word.to_dict()
+    stored_rev = -1 if stored is None else stored.get('rev', 0)
+    if stored_rev > word.rev:
+        data = merge_word(stored, data)
+        word.update({field: data[field] for field in STATS_FIELDS})
+    data['rev'] = word.rev = max(stored_rev, word.rev) + 1
+    return data
+
+
+class JSONStorage:
+    """Whole-file JSON storage, written atomically.
+
+    Files hold {"schema_version": N, "words": [...]}; a bare list of words (the
+    original format) is read as schema version 0. Word updates are merged into
+    the file as it is on disk, under a file lock, so sessions and processes
+    sharing the file don't overwrite each other's changes.
+    """
+
+    def __init__(self, filename='german_vocab.json'):
+        self.filename = filename
+        self.schema_version = 0
+        self.bytes_written = 0
+        self.lock = FileLock(filename)
+
+    def create_empty_json(self):
+        """Creates an empty JSON file if it doesn't exist."""
+        atomic_write_json(self.filename, [])
+        return f"{self.filename} created as an empty file."
+
+    def load(self):
+        """Load all entries, creating the file if it doesn't exist"""
+        with self.lock:
+            if not os.path.exists(self.filename):
+                self.create_empty_json()
+                return []
+            try:
+                schema_version, words = self._read()
+            except json.JSONDecodeError as e:
+                # Keep the damaged file around instead of overwriting it on the next save
+                backup = f"{self.filename}.corrupt-{int(time.time())}"
+                os.replace(self.filename, backup)
+                print(f"Error loading vocabulary, moved damaged file to {backup}: {e}")
+                return []
+        self.schema_version = schema_version
+        return [WordEntry.from_dict(word) for word in words]
+
+    def _read(self):
+        """(schema version, entries as dicts) of the file on disk"""
+        if not os.path.exists(self.filename):
+            return self.schema_version, []
+        with open(self.filename, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            return 0, data
+        return data.get('schema_version', 0), data['words']
+
+    def _write(self, words):
+        self.bytes_written += atomic_write_json(
+            self.filename, {'schema_version': self.schema_version, 'words': words}
+        )
+
+    def save_all(self, vocabulary):
+        with self.lock:
+            self._write(vocabulary)
+
+    def save_word(self, vocabulary, word):
+        self.save_batch(vocabulary, [word], [])
+
+    def delete_word(self, vocabulary, word):
+        self.save_batch(vocabulary, [], [word])
+
+    def save_batch(self, vocabulary, saved, deleted):
+        # JSON has no per-record updates, so re-read the file and apply the changed entries to it
+        with self.lock:
+            try:
+                _, stored = self._read()
+            except json.JSONDecodeError as e:
+                print(f"Error reading vocabulary before saving, rewriting it from this session: {e}")
+                self._write(vocabulary)
+                return
+            words = {word['id']: word for word in stored}
+            for word in deleted:
+                words.pop(word['id'], None)
+            for word in saved:
+                words[word.id] = resolve_update(words.get(word.id), word)
+            self._write(list(words.values()))
+
+    def close(self):
+        pass
+
+
+class SQLiteStorage:
+    """One row per word, so single-word updates touch a single row"""
+
+    def __init__(self, filename='german_vocab.db'):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS words (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self.conn.commit()
+        self.schema_version = 0
+        self.bytes_written = 0  # Size of the serialized entries written
+
+    def load(self):
+        with self.lock:
+            self.schema_version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            rows = self.conn.execute("SELECT data FROM words ORDER BY rowid").fetchall()
+        return [WordEntry.from_dict(json.loads(data)) for (data,) in rows]
+
+    def save_all(self, vocabulary):
+        with self.lock, self.conn:
+            self.conn.execute(f"PRAGMA user_version = {int(self.schema_version)}")
+            self.conn.execute("DELETE FROM words")
+            rows = [(word['id'], json.dumps(word, default=json_default)) for word in vocabulary]
+            self.conn.executemany("INSERT INTO words (id, data) VALUES (?, ?)", rows)
+            self.bytes_written += sum(len(data) for _, data in rows)
+
+    def save_word(self, vocabulary, word):
+        self.save_batch(vocabulary, [word], [])
+
+    def delete_word(self, vocabulary, word):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM words WHERE id = ?", (word['id'],))
+
+    def save_batch(self, vocabulary, saved, deleted):
+        with self.lock, self.conn:
+            # Take the write lock before reading, so no other process can save in between
+            self.conn.execute("BEGIN IMMEDIATE")
+            stored = {}
+            ids = [word.id for word in saved]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                stored.update(self.conn.execute(
+                    f"SELECT id, data FROM words WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            rows = []
+            for word in saved:
+                data = json.dumps(resolve_update(json.loads(stored[word.id]) if word.id in stored else None, word),
+                                  default=json_default)
+                # Later updates of the same word in this batch merge with this one
+                stored[word.id] = data
+                rows.append((word.id, data))
+            self.conn.executemany(
+                "INSERT INTO words (id, data) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                rows
+            )
+            self.bytes_written += sum(len(data) for _, data in rows)
+            self.conn.executemany("DELETE FROM words WHERE id = ?", [(word['id'],) for word in deleted])
+
+    def close(self):
+        self.conn.close()
+
+
+class JournalStorage:
+    """Append-only journal of word updates on top of a JSON snapshot.
+
+    Each update appends one JSON line to the journal. Once the journal holds
+    compact_every records, it is folded into a fresh snapshot and truncated.
+    Before appending, records other processes added since the last read are
+    replayed under the file lock, and each update is merged with the entry as
+    they left it (resolve_update), like the other backends do.
+    """
+
+    def __init__(self, filename='german_vocab.journal', compact_every=500):
+        self.filename = self.journal_filename = filename
+        self.snapshot_filename = os.path.splitext(filename)[0] + '.snapshot.json'
+        self.compact_every = compact_every
+        self.journal_records = 0
+        self.journal_offset = 0  # Bytes of the journal replayed into words
+        self.snapshot_stat = None  # Identifies the snapshot words was built from
+        self.words = {}  # id -> entry as a dict, in deck order
+        self.schema_version = 0
+        self.bytes_written = 0
+        self.lock = FileLock(filename)
+
+    def load(self):
+        with self.lock:
+            self._load_locked()
+        return [WordEntry.from_dict(data) for data in self.words.values()]
+
+    def _stat_snapshot(self):
+        if not os.path.exists(self.snapshot_filename):
+            return None
+        stat = os.stat(self.snapshot_filename)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load_locked(self):
+        self.words = {}
+        self.schema_version = 0
+        self.snapshot_stat = self._stat_snapshot()
+        if self.snapshot_stat is not None:
+            with open(self.snapshot_filename, 'r') as f:
+                snapshot = json.load(f)
+            if isinstance(snapshot, dict):
+                self.schema_version = snapshot.get('schema_version', 0)
+                snapshot = snapshot['words']
+            for data in snapshot:
+                self.words[data['id']] = data
+        self.journal_records = 0
+        self.journal_offset = 0
+        self._replay_locked()
+
+    def _replay_locked(self):
+        """Apply the journal records after journal_offset"""
+        if not os.path.exists(self.journal_filename):
+            return
+        with open(self.journal_filename, 'rb') as f:
+            f.seek(self.journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # An append still in progress, or cut short by a crash
+                self.journal_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping damaged journal record in {self.journal_filename}")
+                    continue
+                self._apply(record)
+                self.journal_records += 1
+
+    def _catch_up_locked(self):
+        """Bring words up to date with what other processes wrote since it was read"""
+        journal_size = os.path.getsize(self.journal_filename) if os.path.exists(self.journal_filename) else 0
+        if self._stat_snapshot() != self.snapshot_stat or journal_size < self.journal_offset:
+            # Another process compacted the journal into a new snapshot
+            self._load_locked()
+        else:
+            self._replay_locked()
+
+    def _apply(self, record):
+        if record['op'] == 'put':
+            self.words[record['word']['id']] = record['word']
+        elif record['op'] == 'delete':
+            self.words.pop(record['id'], None)
+
+    def _append_locked(self, records):
+        text = ''.join(json.dumps(record, default=json_default) + '\n' for record in records)
+        with open(self.journal_filename, 'a') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            self._apply(record)
+        self.bytes_written += len(text)
+        self.journal_offset += len(text.encode())
+        self.journal_records += len(records)
+        if self.journal_records >= self.compact_every:
+            self._compact_locked()
+
+    def compact(self):
+        """Fold the journal into a new snapshot and start an empty journal"""
+        with self.lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        # Pick up records other processes appended since this one loaded
+        self._load_locked()
+        self._write_snapshot_locked()
+
+    def _write_snapshot_locked(self):
+        self.bytes_written += atomic_write_json(
+            self.snapshot_filename,
+            {'schema_version': self.schema_version, 'words': list(self.words.values())}
+        )
+        with open(self.journal_filename, 'w'):
+            pass
+        self.journal_records = 0
+        self.journal_offset = 0
+        self.snapshot_stat = self._stat_snapshot()
+
+    def save_all(self, vocabulary):
+        with self.lock:
+            self.words = {word['id']: dict(word.items()) for word in vocabulary}
+            self._write_snapshot_locked()
+
+    def save_word(self, vocabulary, word):
+        self.save_batch(vocabulary, [word], [])
+
+    def delete_word(self, vocabulary, word):
+        self.save_batch(vocabulary, [], [word])
+
+    def save_batch(self, vocabulary, saved, deleted):
+        if not saved and not deleted:
+            return
+        with self.lock:
+            self._catch_up_locked()
+            records = []
+            for word in saved:
+                data = resolve_update(self.words.get(word.id), word)
+                # Later updates of the same word in this batch merge with this one
+                self.words[word.id] = data
+                records.append({'op': 'put', 'word': data})
+            records += [{'op': 'delete', 'id': word['id']} for word in deleted]
+            self._append_locked(records)
+
+    def close(self):
+        pass
+
+
+class _PendingWrites:
+    """Dirty entries waiting to be written by a WriteBehindStorage"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()  # Keeps batches in order
+        self.vocabulary = None
+        self.saved = {}  # (id, id(entry)) -> (snapshot, entry, id(vocabulary)), one per session's entry
+        self.deleted = {}  # id -> entry
+        self.first_dirty = None
+        self.closed = False
+        self.metrics = None  # Times each batch written, if set
+        self.results = {}  # id(vocabulary) -> {id(entry): (entry, written snapshot)}, for the owner to apply
+        self.results_at = {}  # id(vocabulary) -> when its results were last added
+
+    def count(self):
+        return len(self.saved) + len(self.deleted)
+
+    def add_results(self, entries):
+        """Hand the written snapshots back to their sessions, dropping ones nobody collected"""
+        now = time.monotonic()
+        for vocabulary_id, added in list(self.results_at.items()):
+            if now - added > RESULTS_TTL:
+                del self.results[vocabulary_id], self.results_at[vocabulary_id]
+        for snapshot, word, vocabulary_id in entries:
+            self.results.setdefault(vocabulary_id, {})[id(word)] = (word, snapshot)
+            self.results_at[vocabulary_id] = now
+
+
+def apply_written(word, snapshot):
+    """Bring a session's entry up to date with the snapshot of it that was written.
+
+    The snapshot has the new rev, and the stats of any concurrent update merged
+    in by resolve_update. The entry may have changed again since it was
+    snapshotted, so the stats are merged rather than copied. Returns whether
+    the entry's stats changed.
+    """
+    if snapshot.rev <= word.rev:
+        return False
+    merged = merge_word(snapshot.to_dict(), word.to_dict())
+    stats = {field: merged[field] for field in STATS_FIELDS}
+    changed = any(getattr(word, field) != value for field, value in stats.items())
+    word.update(stats)
+    word.rev = snapshot.rev
+    return changed
+
+
+def _flush_pending(storage, pending):
+    with pending.flush_lock:
+        with pending.condition:
+            if not pending.count():
+                return
+            vocabulary = pending.vocabulary
+            entries = list(pending.saved.values())
+            deleted = list(pending.deleted.values())
+            pending.saved, pending.deleted, pending.first_dirty = {}, {}, None
+
+        start = time.perf_counter()
+        try:
+            # Only the snapshots are written (and merged into by resolve_update);
+            # the sessions' own entries are never touched from this thread
+            storage.save_batch(vocabulary, [snapshot for snapshot, _, _ in entries], deleted)
+            if pending.metrics is not None:
+                pending.metrics.observe('storage.flush', time.perf_counter() - start)
+        except Exception as e:
+            print(f"Error flushing vocabulary: {e}")
+            # Put the batch back unless newer changes replaced it meanwhile
+            with pending.condition:
+                for snapshot, word, vocabulary_id in entries:
+                    if snapshot.id not in pending.deleted:
+                        pending.saved.setdefault((snapshot.id, id(word)), (snapshot, word, vocabulary_id))
+                for word in deleted:
+                    if not any(word_id == word['id'] for word_id, _ in pending.saved):
+                        pending.deleted.setdefault(word['id'], word)
+                pending.first_dirty = pending.first_dirty or time.monotonic()
+            return
+        with pending.condition:
+            pending.add_results(entries)
+
+
+def _write_behind_loop(storage, pending, flush_interval, max_pending):
+    while True:
+        with pending.condition:
+            while not pending.closed:
+                count = pending.count()
+                if count >= max_pending:
+                    break
+                if count:
+                    remaining = flush_interval - (time.monotonic() - pending.first_dirty)
+                    if remaining <= 0:
+                        break
+                    pending.condition.wait(remaining)
+                else:
+                    pending.condition.wait()
+            closed = pending.closed
+        _flush_pending(storage, pending)
+        if closed:
+            return
+
+
+def _shutdown(storage, pending):
+    with pending.condition:
+        pending.closed = True
+        pending.condition.notify()
+    _flush_pending(storage, pending)
+
+
+class WriteBehindStorage:
+    """Coalesces word updates and writes them in batches on a background thread.
+
+    A batch is written once flush_interval seconds have passed since the first
+    unsaved change, or as soon as max_pending entries are dirty. Pending writes
+    are also flushed by flush(), close(), when the object is garbage collected
+    and at interpreter exit. The app keeps one instance per deck for the whole
+    process, so a crash loses at most the last flush_interval seconds of changes.
+
+    Entries are copied when they are queued, and the background thread only
+    writes the copies. What the write changed on them (the new rev and stats
+    merged from concurrent updates) is applied to the session's own entries by
+    apply_written, on the session's thread. Until then the session's next save
+    of an entry is simply merged with its previous one.
+    """
+
+    def __init__(self, storage, flush_interval=2.0, max_pending=50, metrics=None):
+        self.storage = storage
+        self.pending = _PendingWrites()
+        self.pending.metrics = metrics
+        # The thread and finalizer only reference the storage and pending writes,
+        # so dropping this object is what ends the session
+        self.thread = threading.Thread(
+            target=_write_behind_loop,
+            args=(storage, self.pending, flush_interval, max_pending),
+            daemon=True
+        )
+        self.thread.start()
+        self._finalizer = weakref.finalize(self, _shutdown, storage, self.pending)
+
+    @property
+    def schema_version(self):
+        return self.storage.schema_version
+
+    @schema_version.setter
+    def schema_version(self, version):
+        self.storage.schema_version = version
+
+    @property
+    def bytes_written(self):
+        return self.storage.bytes_written
+
+    @property
+    def filename(self):
+        return self.storage.filename
+
+    def apply_written(self, vocabulary):
+        """Apply finished writes to the entries of vocabulary, on its session's thread.
+
+        Returns the entries whose practice stats changed because another
+        session's update of them was merged in.
+        """
+        with self.pending.condition:
+            results = self.pending.results.pop(id(vocabulary), None)
+            self.pending.results_at.pop(id(vocabulary), None)
+        return [word for word, snapshot in (results or {}).values() if apply_written(word, snapshot)]
+
+    def _mark(self, vocabulary, word, deleted):
+        with self.pending.condition:
+            self.pending.vocabulary = vocabulary
+            if deleted:
+                for key in [key for key in self.pending.saved if key[0] == word['id']]:
+                    del self.pending.saved[key]
+                self.pending.deleted[word['id']] = word
+            else:
+                self.pending.deleted.pop(word['id'], None)
+                self.pending.saved[(word.id, id(word))] = (word.copy(), word, id(vocabulary))
+            if self.pending.first_dirty is None:
+                self.pending.first_dirty = time.monotonic()
+            self.pending.condition.notify()
+
+    def load(self):
+        self.flush()
+        return self.storage.load()
+
+    def save_all(self, vocabulary):
+        # Other sessions' queued writes (and the results they wait for) go out first
+        self.flush()
+        self.storage.save_all(vocabulary)
+
+    def save_word(self, vocabulary, word):
+        self._mark(vocabulary, word, deleted=False)
+
+    def delete_word(self, vocabulary, word):
+        self._mark(vocabulary, word, deleted=True)
+
+    def save_batch(self, vocabulary, saved, deleted):
+        for word in saved:
+            self._mark(vocabulary, word, deleted=False)
+        for word in deleted:
+            self._mark(vocabulary, word, deleted=True)
+
+    def flush(self):
+        """Write all pending changes now"""
+        _flush_pending(self.storage, self.pending)
+
+    def close(self):
+        self._finalizer()
+        self.thread.join()
+        self.storage.close()
+
+
+def open_storage(filename):
+    """Pick a storage backend from the file extension"""
+    extension = os.path.splitext(filename)[1]
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteStorage(filename)
+    if extension == '.journal':
+        return JournalStorage(filename)
+    return JSONStorage(filename)
+
+
+def safe_name(name):
+    return re.sub(r'[^\w-]+', '_', name.strip()) or '_'
+
+
+def deck_filename(user=DEFAULT_USER, deck=DEFAULT_DECK):
+    """Storage file for one learner's deck.
+
+    The default learner's default deck is DELINGO_STORAGE (german_vocab.json), so
+    existing setups keep their file. Other decks live in
+    DELINGO_DATA_DIR/<user>/<deck>, with DELINGO_STORAGE's extension picking the backend.
+    """
+    default = os.environ.get("DELINGO_STORAGE", "german_vocab.json")
+    if user == DEFAULT_USER and deck == DEFAULT_DECK:
+        return default
+    extension = os.path.splitext(default)[1] or '.json'
+    directory = os.path.join(os.environ.get("DELINGO_DATA_DIR", "decks"), safe_name(user))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, safe_name(deck) + extension)
+
+
+def list_decks(user=DEFAULT_USER):
+    """Names of the decks a learner has, starting with the default deck"""
+    extension = os.path.splitext(os.environ.get("DELINGO_STORAGE", "german_vocab.json"))[1] or '.json'
+    directory = os.path.join(os.environ.get("DELINGO_DATA_DIR", "decks"), safe_name(user))
+    decks = [DEFAULT_DECK]
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            name, file_extension = os.path.splitext(filename)
+            if file_extension == extension and name != DEFAULT_DECK:
+                decks.append(name)
+    return decks
+
+
+def open_deck(user=DEFAULT_USER, deck=DEFAULT_DECK):
+    return open_storage(deck_filename(user, deck))
+
+
+def migrate_json(json_filename, target_filename):
+    """Copy a german_vocab.json file into another storage backend"""
+    from vocab_manager import GermanVocabManager, SCHEMA_VERSION
+
+    vocabulary = JSONStorage(json_filename).load()
+    vocabulary = GermanVocabManager.update_vocab_structure(vocabulary)
+
+    storage = open_storage(target_filename)
+    storage.schema_version = SCHEMA_VERSION
+    storage.save_all(vocabulary)
+    storage.close()
+    return len(vocabulary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a JSON vocabulary file to another storage backend")
+    parser.add_argument('source', help="existing JSON file, e.g. german_vocab.json")
+    parser.add_argument('target', help="new storage file (.db/.sqlite for SQLite, .journal for journal)")
+    args = parser.parse_args()
+    count = migrate_json(args.source, args.target)
+    print(f"Migrated {count} words from {args.source} to {args.target}")
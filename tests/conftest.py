@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from grading_cache import GradingCache
+from llm_client import FakeProvider, ResilientClient
+from storage import open_storage
+from vocab_manager import GermanVocabManager, SCHEMA_VERSION
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """A manager over an empty JSON deck in tmp_path, with an instant fake LLM"""
+    llm = ResilientClient(FakeProvider(latency=0.0, token_latency=0.0, seed=0))
+    manager = GermanVocabManager(
+        storage=open_storage(os.path.join(tmp_path, 'deck.json')), write_behind=False, llm=llm,
+        grading_cache=GradingCache(os.path.join(tmp_path, 'grading_cache.db'))
+    )
+    manager.storage.schema_version = SCHEMA_VERSION
+    yield manager
+    manager.executor.shutdown(wait=True)
+    manager.grading_cache.close()
@@ -0,0 +1,19 @@
+from benchmark import BACKENDS, run, synthetic_deck
+from vocab_manager import GermanVocabManager
+
+
+def test_synthetic_decks_load_like_legacy_files():
+    vocabulary = GermanVocabManager.update_vocab_structure(synthetic_deck(200, seed=1))
+    assert len({word.id for word in vocabulary}) == 200
+    assert all(word.gender for word in vocabulary if word.part_of_speech == 'noun')
+    assert any(word.category == 'new' for word in vocabulary)
+
+
+def test_run_times_every_benchmark(monkeypatch):
+    monkeypatch.setenv('DELINGO_GRADING_CACHE', '')
+    results = run([60], repeat=1, cycles=2, llm_latency=0.0, backends=list(BACKENDS), seed=0)
+    names = {result['benchmark'] for result in results}
+    for backend in BACKENDS:
+        assert {f'save_vocabulary[{backend}]', f'load_vocabulary[{backend}]'} <= names
+    assert {'update_vocab_structure', 'create_schedule_index', 'practice_cycle'} <= names
+    assert all(result['size'] == 60 and result['min_ms'] <= result['max_ms'] for result in results)
@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+from bulk_io import FORMATS, detect_format, export_text, import_deck, normalize_row
+from word_entry import WordEntry
+
+
+def make_deck():
+    return [
+        WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)'),
+        WordEntry('gehen', 'verb', 'to go', 'Wir gehen, "schnell".'),
+    ]
+
+
+def test_detect_format_from_extension():
+    assert [detect_format(name) for name in ('a.tsv', 'a.jsonl', 'a.ndjson', 'a.txt', 'a.csv', 'a')] == [
+        'tsv', 'jsonl', 'jsonl', 'anki', 'csv', 'csv'
+    ]
+
+
+def test_rows_are_cleaned_and_articles_become_genders():
+    fields = normalize_row({'word': 'der <b>Hund</b>', 'definition': ' dog ', 'example': 'Der Hund bellt.'})
+    assert fields == {'word': 'Hund', 'part_of_speech': 'noun', 'definition': 'dog',
+                      'example': 'Der Hund bellt.', 'gender': 'der (masculine)'}
+    assert normalize_row({'word': 'Katze', 'part_of_speech': 'Substantiv', 'gender': 'f',
+                          'definition': 'cat'})['gender'] == 'die (feminine)'
+    assert normalize_row({'word': 'schnell', 'part_of_speech': 'adj', 'gender': 'm',
+                          'definition': 'fast'})['gender'] is None
+    for row in ({'word': 'Katze', 'part_of_speech': 'noun', 'definition': 'cat'},
+                {'word': 'Katze', 'definition': ''}, {'_error': 'line 3: bad JSON'}):
+        with pytest.raises(ValueError):
+            normalize_row(row)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_export_then_import_round_trips(manager, fmt):
+    text = export_text(make_deck(), fmt)
+    vocabulary = []
+    added, report = import_deck(manager, vocabulary, io.StringIO(text), fmt)
+    assert report.added == 2 and not report.invalid
+    expected = [('Haus', 'noun', 'das (neutral)', 'house'), ('gehen', 'verb', None, 'to go')]
+    if fmt == 'anki':
+        # Anki cards carry no part of speech: the article marks nouns, the rest become 'other'
+        expected[1] = ('gehen', 'other', None, 'to go')
+    assert [(word.word, word.part_of_speech, word.gender, word.definition) for word in added] == expected
+    assert added[1].example == 'Wir gehen, "schnell".'
+    assert [word.id for word in manager.load_vocabulary()] == [word.id for word in added]
+
+
+def test_import_skips_duplicates_and_reports_invalid_rows(manager):
+    vocabulary = make_deck()
+    manager.save_vocabulary(vocabulary)
+    lines = [
+        'word,part_of_speech,gender,definition,example\n',
+        'das Haus,,,House,\n',  # Already in the deck
+        'laufen,verb,,to run,\n',
+        'Laufen,verb,,to  run,\n',  # Repeated in the file
+        'Baum,noun,,tree,\n',  # No gender
+    ]
+    added, report = import_deck(manager, vocabulary, lines, 'csv')
+    assert [word.word for word in added] == ['laufen']
+    assert (report.added, report.duplicates, report.invalid) == (1, 2, 1)
+    assert 'Baum' in report.errors[0]
+    assert len(manager.load_vocabulary()) == 3
@@ -0,0 +1,142 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from drill import ASKING, GRADING, DrillError, DrillServer, DrillSession, SessionLimitError
+from word_entry import WordEntry
+
+
+def make_session(manager, size=5):
+    vocabulary = [WordEntry(f'Wort{n}', 'verb', f'word {n}', f'Ich sage Wort{n}.') for n in range(size)]
+    manager.save_vocabulary(vocabulary)
+    return DrillSession(manager)
+
+
+def make_noun_session(manager):
+    manager.save_vocabulary([WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)')])
+    session = DrillSession(manager)
+    session.next_word()
+    return session
+
+
+@pytest.mark.parametrize('gender', ['das', 'Das', 'das (neutral)', 'n', 'neutral'])
+def test_gender_answers_are_canonical(manager, gender):
+    session = make_noun_session(manager)
+    session.submit('house', gender)
+    assert session.answer['gender'] == 'das (neutral)'
+    assert session.grade().category == 'correct'
+
+
+def test_wrong_short_gender_is_graded_incorrect(manager):
+    session = make_noun_session(manager)
+    assert session.answer_word('house', 'der').category == 'incorrect'
+
+
+@pytest.mark.parametrize('gender', ['dass', 'x', None, ''])
+def test_unknown_or_missing_gender_is_rejected(manager, gender):
+    session = make_noun_session(manager)
+    with pytest.raises(DrillError):
+        session.submit('house', gender)
+    assert session.stage == ASKING
+    session.submit('house', 'das')
+    assert session.stage == GRADING
+
+
+def test_deleting_the_current_word_moves_on(manager):
+    session = make_session(manager)
+    session.next_word()
+    deleted = session.word
+    session.delete_word(session.current_index)
+
+    assert session.stage is None and session.word is None
+    assert session.lookahead is None
+    card = session.next_word()
+    assert card['stage'] == ASKING and card['word_id'] != deleted.id
+    assert deleted.id not in [word.id for word in manager.load_vocabulary()]
+
+
+@pytest.mark.parametrize('offset', [-1, 1])
+def test_deleting_another_word_keeps_the_current_one(manager, offset):
+    session = make_session(manager)
+    session.next_word()
+    while session.current_index + offset not in range(len(session.vocabulary)):
+        session.skip()
+        session.next_word()
+    current = session.word
+    session.delete_word(session.current_index + offset)
+
+    assert session.word is current and session.stage == ASKING
+    session.answer_word(current['definition'])
+    assert manager.load_vocabulary()[session.current_index].id == current.id
+
+
+@pytest.fixture
+def server(manager):
+    make_session(manager)
+    server = DrillServer(('127.0.0.1', 0), lambda user, deck: manager, max_sessions=2, session_ttl=60)
+    yield server
+    server.server_close()
+
+
+def test_server_caps_open_sessions(server):
+    first, _ = server.open_session('default', 'german_vocab')
+    server.open_session('default', 'german_vocab')
+    with pytest.raises(SessionLimitError):
+        server.open_session('default', 'german_vocab')
+    server.close_session(first)
+    server.open_session('default', 'german_vocab')
+
+
+def test_server_expires_idle_sessions(server):
+    idle, idle_session = server.open_session('default', 'german_vocab')
+    busy, _ = server.open_session('default', 'german_vocab')
+    idle_session.next_word()
+    assert idle_session.lookahead is not None
+    server.last_used[idle] -= 61
+    assert server.use_session(busy) is not None
+    assert server.expire_sessions() == 1
+    assert server.use_session(idle) is None and server.use_session(busy) is not None
+    assert idle_session.lookahead is None
+
+    # A session with a request in progress is left alone
+    server.last_used[busy] -= 61
+    _, lock = server.sessions[busy]
+    with lock:
+        assert server.expire_sessions() == 0
+    assert server.expire_sessions() == 1
+
+
+def request(server, method, path, body):
+    data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+    req = urllib.request.Request(f"http://127.0.0.1:{server.server_port}{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'null')
+
+
+def test_server_rejects_malformed_bodies_and_reports_engine_errors(server, monkeypatch, capsys):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert request(server, 'POST', '/sessions', '[1, 2]')[0] == 400
+        assert request(server, 'POST', '/sessions', '{not json')[0] == 400
+        assert request(server, 'POST', '/sessions', {'user': 5})[0] == 400
+        status, body = request(server, 'POST', '/sessions', {})
+        assert status == 201
+        path = f"/sessions/{body['session']}/answer"
+        assert request(server, 'POST', path, {'definition': ['word']})[0] == 400
+
+        # A bug in the engine is a server error, and is logged
+        def broken(self, definition, gender=None, on_feedback=None):
+            raise AttributeError("'NoneType' object has no attribute 'id'")
+        monkeypatch.setattr(DrillSession, 'answer_word', broken)
+        assert request(server, 'POST', path, {'definition': 'word'})[0] == 500
+        assert 'no attribute' in capsys.readouterr().out
+    finally:
+        server.shutdown()
+        thread.join()
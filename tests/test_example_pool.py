@@ -0,0 +1,37 @@
+from example_pool import build_example_pools
+from word_entry import WordEntry
+
+
+def make_deck(manager, size):
+    vocabulary = [WordEntry(f'Wort{n}', 'noun', f'word {n}', f'Das Wort{n} ist hier.', gender='das (neutral)')
+                  for n in range(size)]
+    manager.save_vocabulary(vocabulary)
+    return manager.load_vocabulary()
+
+
+def test_background_refill_is_added_by_the_owning_session(manager):
+    vocabulary = make_deck(manager, 1)
+    word = vocabulary[0]
+    word.example_pool = ['Das Wort0 ist neu.']
+    word.times_asked = manager.example_refresh_threshold
+
+    # Taking the last pooled example starts a background fetch...
+    manager.increment_times_asked(word, vocabulary=vocabulary)
+    assert word.example == 'Das Wort0 ist neu.'
+    [(_, future, _)] = manager.pool_refills[id(vocabulary)].values()
+    future.result()
+    # ...which leaves the live entry alone until the session collects it
+    assert word.example_pool == []
+
+    manager.increment_times_asked(word, vocabulary=vocabulary)
+    assert len(word.example_pool) == manager.example_pool_size
+    assert not manager.pool_refills[id(vocabulary)]
+    assert len(manager.load_vocabulary()[0].example_pool) == manager.example_pool_size
+
+
+def test_build_fills_every_pool_and_saves(manager):
+    vocabulary = make_deck(manager, 7)
+    report = build_example_pools(manager, vocabulary, pool_size=3, batch_size=2, workers=3)
+    assert report.requests == 4 and not report.failed
+    assert report.added == 21
+    assert all(len(word.example_pool) == 3 for word in manager.load_vocabulary())
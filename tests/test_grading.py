@@ -0,0 +1,36 @@
+import pytest
+
+from grading import grade_locally, parse_llm_verdict, synonyms_match
+from word_entry import WordEntry
+
+
+@pytest.mark.parametrize('response, category', [
+    ("Your answer is correct! It means house.", 'correct'),
+    ("Your answer is incorrect! It is correct that it is a noun, though.", 'incorrect'),
+    ("Your answer is not correct.", 'incorrect'),
+    ("That's not correct!", 'incorrect'),
+    ("Not quite correct… it means house.", 'incorrect'),
+    ("Your answer isn't correct.", 'incorrect'),
+    ("Partially correct, but the gender is wrong.", 'incorrect'),
+    ("Correct! Well done.", 'correct'),
+    ("I can't tell.", 'incorrect'),
+])
+def test_parse_llm_verdict(response, category):
+    assert parse_llm_verdict(response) == category
+
+
+@pytest.mark.parametrize('answer, expected, match', [
+    ('house', 'house', True),
+    ('recieving', 'receiving', True),  # Swapped letters
+    ('accomodation', 'accommodation', True),  # Dropped doubled letter
+    ('complement', 'compliment', False),  # A different word, one letter away
+    ('horse', 'house', False),
+])
+def test_synonyms_match(answer, expected, match):
+    assert synonyms_match(answer, expected) is match
+
+
+def test_near_miss_goes_to_the_llm():
+    word = WordEntry('Kompliment', 'noun', 'compliment', 'Danke für das Kompliment.', gender='das (neutral)')
+    assert grade_locally(word, 'complement', 'das (neutral)') is None
+    assert grade_locally(word, 'Compliment', 'das (neutral)').category == 'correct'
@@ -0,0 +1,73 @@
+import os
+import time
+
+from grading_cache import GradingCache, grading_key
+from word_entry import WordEntry
+
+
+def make_word():
+    return WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)')
+
+
+def test_keys_ignore_case_and_spacing_but_not_the_prompt():
+    key = grading_key(make_word(), 'a  House', 'model', '2')
+    assert grading_key(make_word(), 'A house ', 'model', '2') == key
+    assert grading_key(make_word(), 'a home', 'model', '2') != key
+    assert grading_key(make_word(), 'a house', 'model', '3') != key
+    assert grading_key(make_word(), 'a house', 'other-model', '2') != key
+
+
+def test_responses_survive_in_the_disk_tier(tmp_path):
+    filename = os.path.join(tmp_path, 'cache.db')
+    cache = GradingCache(filename)
+    cache.put('key', 'Your answer is correct!')
+    assert cache.get('key') == 'Your answer is correct!'
+    assert cache.get('missing') is None
+    cache.close()
+
+    cache = GradingCache(filename)
+    assert cache.get('key') == 'Your answer is correct!'
+    assert cache.get('key') == 'Your answer is correct!'
+    assert cache.stats == {'memory_hits': 1, 'disk_hits': 1, 'misses': 0}
+    assert cache.hit_rate() == 1.0
+    cache.close()
+
+
+def test_memory_tier_evicts_the_least_recently_used(tmp_path):
+    cache = GradingCache(os.path.join(tmp_path, 'cache.db'), memory_size=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    cache.get('a')
+    cache.put('c', 'C')
+    assert list(cache.memory) == ['a', 'c']
+    assert cache.get('b') == 'B'  # Still on disk
+    cache.close()
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = GradingCache(os.path.join(tmp_path, 'cache.db'), ttl=60)
+    cache.put('key', 'old')
+    cache.memory['key'] = ('old', time.time() - 120)
+    with cache.conn:
+        cache.conn.execute("UPDATE gradings SET created_at = ?", (time.time() - 120,))
+    assert cache.get('key') is None
+    assert cache.conn.execute("SELECT COUNT(*) FROM gradings").fetchone()[0] == 0
+    cache.close()
+
+
+def test_disk_tier_is_trimmed_by_last_use(tmp_path):
+    cache = GradingCache(os.path.join(tmp_path, 'cache.db'), memory_size=1, max_disk_entries=50)
+    for n in range(100):
+        cache.put(f'key{n}', f'response {n}')
+    keys = {key for (key,) in cache.conn.execute("SELECT key FROM gradings")}
+    assert len(keys) == 50 and 'key99' in keys and 'key0' not in keys
+    cache.close()
+
+
+def test_manager_grades_a_repeated_answer_from_the_cache(manager):
+    word = make_word()
+    first = manager.request_grading(word, 'a building to live in')
+    calls = manager.token_usage()
+    assert manager.request_grading(word, 'A building to  live in') == first
+    assert manager.token_usage() == calls
+    assert manager.grading_cache.stats['memory_hits'] == 1
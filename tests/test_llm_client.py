@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from llm_client import LLMError, LLMResult, ResilientClient
+
+
+class ScriptedProvider:
+    """Fails while failing is set; complete() waits for release when gate is set"""
+
+    def __init__(self):
+        self.failing = True
+        self.calls = 0
+        self.gate = None
+        self.release = threading.Event()
+
+    def complete(self, messages, model, timeout, **options):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.set()
+            self.release.wait(5)
+        if self.failing:
+            raise ConnectionError("down")
+        return LLMResult("ok", 1, 1)
+
+
+MESSAGES = [{'role': 'user', 'content': 'hi'}]
+
+
+def open_circuit(provider, reset_after=0.05):
+    client = ResilientClient(provider, timeout=1.0, max_retries=0, failure_threshold=2, reset_after=reset_after)
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            client.complete(MESSAGES, 'model')
+    with pytest.raises(LLMError, match="circuit is open"):
+        client.complete(MESSAGES, 'model')
+    assert provider.calls == 2
+    return client
+
+
+def test_single_trial_call_after_reset():
+    provider = ScriptedProvider()
+    client = open_circuit(provider)
+    time.sleep(0.06)
+
+    provider.failing = False
+    provider.gate = threading.Event()
+    results = []
+    probe = threading.Thread(target=lambda: results.append(client.complete(MESSAGES, 'model').text))
+    probe.start()
+    assert provider.gate.wait(5)
+    # Other calls fail fast while the trial call is in flight
+    with pytest.raises(LLMError, match="circuit is open"):
+        client.complete(MESSAGES, 'model')
+    provider.release.set()
+    probe.join()
+
+    assert results == ['ok']
+    assert provider.calls == 3
+    provider.gate = None
+    assert client.complete(MESSAGES, 'model').text == 'ok'
+
+
+def test_failed_trial_call_reopens_the_circuit():
+    provider = ScriptedProvider()
+    client = open_circuit(provider)
+    time.sleep(0.06)
+    with pytest.raises(LLMError, match="down"):
+        client.complete(MESSAGES, 'model')
+    with pytest.raises(LLMError, match="circuit is open"):
+        client.complete(MESSAGES, 'model')
+    assert provider.calls == 3
+
+
+def test_deadline_spent_in_backoff_is_a_timeout():
+    provider = ScriptedProvider()
+    client = ResilientClient(provider, timeout=0.05, max_retries=5, backoff=1.0, failure_threshold=100)
+    with pytest.raises(LLMError, match="timed out"):
+        client.complete(MESSAGES, 'model')
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from metrics import Histogram, Metrics
+from word_entry import WordEntry
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(bounds=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.05, 0.05, 0.5, 3.0):
+        histogram.observe(seconds)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1.0) == 3.0  # The +Inf bucket reports the max
+    assert Histogram().quantile(0.5) == 0.0
+    data = histogram.to_dict()
+    assert data['count'] == 5 and data['max_ms'] == 3000.0
+    assert data['buckets'] == {'0.01': 1, '0.1': 2, '1.0': 1, '+Inf': 1}
+
+
+def test_timer_records_failures_too_and_counters_are_labelled():
+    metrics = Metrics()
+    with metrics.timer('work'):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.timer('work'):
+            raise RuntimeError
+    metrics.add('hits', source='pool')
+    metrics.add('hits', 2, source='pool')
+    metrics.add('hits', source='llm')
+    metrics.collect('bytes', lambda: 42)
+    metrics.collect('broken', lambda: 1 / 0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot['histograms']['work']['count'] == 2
+    assert {(counter['name'], tuple(counter['labels'].items()), counter['value'])
+            for counter in snapshot['counters']} == {
+        ('hits', (('source', 'pool'),), 3), ('hits', (('source', 'llm'),), 1), ('bytes', (), 42)
+    }
+    assert json.loads(metrics.to_json()) == snapshot
+    metrics.reset()
+    assert metrics.snapshot()['histograms'] == {}
+
+
+def test_prometheus_buckets_are_cumulative():
+    metrics = Metrics()
+    metrics.observe('save', 0.002)
+    metrics.observe('save', 0.2)
+    metrics.add('refreshes', source='pool')
+    text = metrics.to_prometheus()
+    assert 'delingo_operation_duration_seconds_bucket{operation="save",le="0.0025"} 1' in text
+    assert 'delingo_operation_duration_seconds_bucket{operation="save",le="+Inf"} 2' in text
+    assert 'delingo_operation_duration_seconds_count{operation="save"} 2' in text
+    assert '# TYPE delingo_refreshes_total counter\ndelingo_refreshes_total{source="pool"} 1' in text
+
+
+def test_manager_times_saves_and_grading(manager):
+    vocabulary = [WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)')]
+    manager.save_vocabulary(vocabulary)
+    manager.save_word(vocabulary, vocabulary[0])
+    manager.request_grading(vocabulary[0], 'a building')
+    snapshot = manager.metrics.snapshot()
+    assert snapshot['histograms']['storage.save']['count'] == 1
+    assert snapshot['histograms']['llm.grading']['count'] == 1
+    assert any(counter['name'] == 'storage_bytes_written' and counter['value'] > 0
+               for counter in snapshot['counters'])
@@ -0,0 +1,62 @@
+import pytest
+
+from prompts import PromptBuilder, estimate_tokens
+from word_entry import WordEntry
+
+LONG = ' '.join(f"wort{n}" for n in range(200))
+
+
+def make_noun(definition='house', example='Das Haus ist alt.'):
+    return WordEntry('Haus', 'noun', definition, example, gender='das (neutral)')
+
+
+@pytest.mark.parametrize('word', ['Haus', LONG])
+def test_grading_prompt_with_long_fields_fits_the_budget(word):
+    builder = PromptBuilder()
+    noun = make_noun(definition=LONG)
+    noun['word'] = word
+    assert builder.grading(noun, LONG).tokens <= builder.budget
+
+    builder = PromptBuilder(budget=200)
+    prompt = builder.grading(make_noun(definition=LONG), LONG)
+    assert prompt.tokens <= builder.budget
+    # The longest fields are cut, the word is kept
+    assert 'German word: Haus\n' in prompt.text
+    assert 'wort0' in prompt.text
+
+
+def test_short_prompts_are_left_alone():
+    builder = PromptBuilder()
+    assert 'Correct definition: house\n' in builder.grading(make_noun(), 'a house').text
+    assert builder.grading(make_noun(), 'a house').text == PromptBuilder(budget=10_000).grading(
+        make_noun(), 'a house').text
+
+
+def test_example_prompt_with_a_long_current_example_fits_the_budget():
+    builder = PromptBuilder(budget=150)
+    prompt = builder.example(make_noun(definition=LONG, example=LONG))
+    assert prompt.tokens <= builder.budget
+
+
+@pytest.mark.parametrize('batch_budget', [120, 200])
+def test_oversized_batch_items_are_cut_to_fit(batch_budget):
+    builder = PromptBuilder(batch_budget=batch_budget)
+    items = [(make_noun(definition=LONG), LONG), (make_noun(), 'house')]
+    prompts = builder.grading_batch(items)
+    assert sorted(position for prompt in prompts for position in prompt.positions) == [0, 1]
+    assert all(prompt.tokens <= batch_budget for prompt in prompts)
+
+    prompts = builder.example_pool([make_noun(definition=LONG, example=LONG)] * 3, 5)
+    assert all(prompt.tokens <= batch_budget for prompt in prompts)
+    assert all(estimate_tokens(prompt.text) == prompt.tokens for prompt in prompts)
+
+
+def test_nouns_without_a_gender_get_no_gender_line():
+    builder = PromptBuilder()
+    noun = WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.')
+    assert 'None' not in builder.grading(noun, 'house').text
+    assert 'Correct gender' not in builder.grading(noun, 'house').text
+    [prompt] = builder.grading_batch([(noun, 'house')])
+    assert '| Gender' not in prompt.text
+    assert 'None' not in builder.example(noun).text
+    assert 'Correct gender: das (neutral)' in builder.grading(make_noun(), 'house').text
@@ -0,0 +1,124 @@
+import json
+import os
+import time
+
+from grading import Verdict
+from review_log import HEADER, RECORD, ReviewLog, review_log_filename, word_key
+from word_entry import WordEntry
+
+NOW = time.mktime((2026, 10, 17, 12, 0, 0, 0, 0, -1))
+WORD = 'a' * 32  # A uuid hex id, stored as is
+
+
+def fill(log, answers):
+    for n, (word_id, category) in enumerate(answers):
+        log.append(word_id, category, latency=1.5, source='llm' if n % 2 else 'local', timestamp=NOW + n)
+
+
+def test_round_trip(tmp_path):
+    filename = os.path.join(tmp_path, 'deck.reviews')
+    log = ReviewLog(filename, checkpoint_every=1000)
+    fill(log, [(WORD, 'correct'), (WORD, 'correct'), (WORD, 'incorrect'), ('Haus', 'correct')])
+
+    assert os.path.getsize(filename) == HEADER.size + 4 * RECORD.size
+    records = list(log.iter_records())
+    assert [record[0] for record in records] == [WORD, WORD, WORD, word_key('Haus').hex()]
+    assert records[0] == (WORD, NOW, 1.5, 'correct', 'local')
+    assert records[2][3:] == ('incorrect', 'local')
+
+    stats = log.word_stats(WORD)
+    assert (stats['reviews'], stats['correct'], stats['streak'], stats['best_streak']) == (3, 2, 0, 2)
+    assert stats['last_review'] == NOW + 2 and stats['mean_latency'] == 1.5
+    assert log.word_stats('unknown')['reviews'] == 0
+    assert log.totals() == {'reviews': 4, 'correct': 3, 'accuracy': 0.75, 'words_reviewed': 2,
+                            'sources': {'local': 2, 'llm': 2}}
+
+    # A second reader replays the same file to the same counters
+    assert ReviewLog(filename).totals() == log.totals()
+
+
+def test_checkpoint_catch_up(tmp_path):
+    filename = os.path.join(tmp_path, 'deck.reviews')
+    log = ReviewLog(filename, checkpoint_every=3)
+    fill(log, [(WORD, 'correct')] * 4)
+    with open(filename + '.stats.json') as f:
+        assert json.load(f)['records'] == 3  # The 4th record is after the checkpoint
+
+    # Another process appends past the checkpoint; a reader loads it and replays only the rest
+    fill(ReviewLog(filename, checkpoint_every=1000), [(WORD, 'incorrect')])
+    reader = ReviewLog(filename)
+    assert reader.totals()['reviews'] == 5
+    assert reader.word_stats(WORD)['best_streak'] == 4
+    assert reader.word_stats(WORD)['streak'] == 0
+
+    # The writer that already loaded the log picks up the other process's record too
+    assert log.totals()['reviews'] == 5
+    log.close()
+    with open(filename + '.stats.json') as f:
+        assert json.load(f)['records'] == 5
+
+
+def test_partial_record_is_ignored_then_overwritten(tmp_path):
+    filename = os.path.join(tmp_path, 'deck.reviews')
+    log = ReviewLog(filename)
+    fill(log, [(WORD, 'correct')] * 2)
+    with open(filename, 'ab') as f:
+        f.write(b'\xff' * (RECORD.size // 2))  # A crash mid-append
+
+    reader = ReviewLog(filename)
+    assert reader.totals()['reviews'] == 2
+    assert len(list(reader.iter_records())) == 2
+
+    reader.append(WORD, 'incorrect', timestamp=NOW + 10)
+    assert os.path.getsize(filename) == HEADER.size + 3 * RECORD.size
+    assert [record[3] for record in reader.iter_records()] == ['correct', 'correct', 'incorrect']
+    assert ReviewLog(filename).word_stats(WORD)['reviews'] == 3
+
+
+def test_stale_checkpoint_is_rebuilt_from_the_log(tmp_path):
+    filename = os.path.join(tmp_path, 'deck.reviews')
+    log = ReviewLog(filename, checkpoint_every=1)
+    fill(log, [(WORD, 'correct')] * 4)
+
+    # The log shrank below the checkpoint, e.g. restored from a backup
+    with open(filename, 'r+b') as f:
+        f.truncate(HEADER.size + 2 * RECORD.size)
+    reader = ReviewLog(filename)
+    assert reader.totals()['reviews'] == 2
+    assert reader.word_stats(WORD)['streak'] == 2
+
+    # A checkpoint that can't be read is ignored rather than trusted
+    with open(filename + '.stats.json', 'w') as f:
+        f.write('{not json')
+    assert ReviewLog(filename).totals()['reviews'] == 2
+
+
+def test_daily_counts_and_hardest_words(tmp_path):
+    log = ReviewLog(os.path.join(tmp_path, 'deck.reviews'))
+    for word_id, correct in (('easy', 3), ('hard', 0), ('middling', 2), ('rare', 0)):
+        reviews = 1 if word_id == 'rare' else 3
+        for n in range(reviews):
+            log.append(word_id, 'correct' if n < correct else 'incorrect', timestamp=NOW - 86400)
+    log.append('easy', 'correct', timestamp=NOW)
+
+    assert log.daily_counts(days=3, now=NOW) == [
+        (time.strftime('%Y-%m-%d', time.localtime(NOW - 2 * 86400)), 0, 0),
+        (time.strftime('%Y-%m-%d', time.localtime(NOW - 86400)), 10, 5),
+        (time.strftime('%Y-%m-%d', time.localtime(NOW)), 1, 1),
+    ]
+    hardest = log.hardest_words(['easy', 'hard', 'middling', 'rare', 'never'], count=2)
+    assert [word_id for word_id, _ in hardest] == ['hard', 'middling']
+    assert hardest[0][1]['accuracy'] == 0.0
+
+
+def test_manager_records_graded_answers(manager):
+    word = WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)')
+    manager.save_vocabulary([word])
+    manager.record_review(word, Verdict('correct', 'Richtig', 'local'), latency=2.0)
+    manager.record_review(word, Verdict('error', 'Grading failed', 'llm'))  # Not an answer
+    manager.record_review(word, Verdict('incorrect', 'Falsch', 'llm'), latency=4.0)
+
+    assert manager.review_log.filename == review_log_filename(manager.storage.filename)
+    assert manager.review_log.totals()['sources'] == {'local': 1, 'llm': 1}
+    statistics = manager.get_word_statistics(word)
+    assert (statistics['reviews'], statistics['accuracy'], statistics['streak']) == (2, 0.5, 0)
@@ -0,0 +1,99 @@
+import heapq
+import random
+
+import numpy as np
+import pytest
+
+from scheduler import SchedulerParams, SchedulingIndex, VectorScheduleIndex
+from simulation import LearnerModel, Population, delingo_candidates, pick_delingo, record_delingo
+from word_entry import WordEntry
+
+NOW = 1_700_000_000 // 3600 * 3600
+
+
+def random_deck(rng, size):
+    """Words with few distinct categories, ask counts and whole-hour ages, so priorities tie often.
+
+    Ages straddle the one-day stale cut-off, so some words get the stale bonus.
+    """
+    deck = []
+    for i in range(size):
+        word = WordEntry(f"Wort{i}", 'noun', f"meaning {i}", f"Beispiel {i}.", gender='das (neutral)')
+        word.category = rng.choice(['new', 'correct', 'incorrect'])
+        word.times_asked = rng.randrange(4)
+        word.last_asked = 0 if rng.random() < 0.05 else NOW - rng.randrange(48) * 3600
+        deck.append(word)
+    return deck
+
+
+@pytest.mark.parametrize('index_class', [SchedulingIndex, VectorScheduleIndex])
+@pytest.mark.parametrize('seed', range(200))
+def test_index_top_matches_rank_words(manager, index_class, seed):
+    rng = random.Random(seed)
+    vocabulary = random_deck(rng, rng.randrange(1, 40))
+    index = index_class(vocabulary, manager.scheduler_params)
+
+    for _ in range(5):
+        k = rng.randrange(1, 8)
+        assert index.top(k, NOW) == manager.rank_words(vocabulary, NOW)[:k]
+        # Answer a word, as practice does, and check again
+        i = rng.randrange(len(vocabulary))
+        vocabulary[i].times_asked += 1
+        vocabulary[i].last_asked = NOW - rng.randrange(3) * 3600
+        vocabulary[i].category = rng.choice(['correct', 'incorrect'])
+        index.update(i)
+
+
+@pytest.mark.parametrize('index_class', [SchedulingIndex, VectorScheduleIndex])
+@pytest.mark.parametrize('stale_bonus', [35, 0, -30])
+@pytest.mark.parametrize('seed', range(20))
+def test_index_top_with_custom_params(manager, index_class, stale_bonus, seed):
+    manager.scheduler_params = SchedulerParams(stale_bonus=stale_bonus, times_asked_penalty=2, pick_from=3)
+    rng = random.Random(seed)
+    vocabulary = random_deck(rng, 60)
+    index = index_class(vocabulary, manager.scheduler_params)
+    assert index.top(10, NOW) == manager.rank_words(vocabulary, NOW)[:10]
+
+
+def test_heap_top_stops_early_on_a_tied_deck(manager, monkeypatch):
+    # A freshly imported deck: every word is new, never asked, and has the same priority
+    vocabulary = [WordEntry(f"Wort{i}", 'verb', f"meaning {i}", f"Beispiel {i}.") for i in range(2000)]
+    index = SchedulingIndex(vocabulary, manager.scheduler_params)
+    pops = []
+    heappop = heapq.heappop
+    monkeypatch.setattr(heapq, 'heappop', lambda heap: pops.append(1) or heappop(heap))
+
+    assert index.top(5, NOW) == list(range(5))
+    assert len(pops) <= 5
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_simulation_picks_like_the_app(manager, seed):
+    rng = np.random.default_rng(seed)
+    population = Population(30, 25, LearnerModel(), rng)
+    params = manager.scheduler_params
+    rows = np.arange(30)
+    categories = ['new', 'incorrect', 'correct']
+
+    for hour in range(30):
+        now = NOW + hour * 3600
+        top, allowed = delingo_candidates(population, rows, now, params)
+        for learner in rows:
+            deck = []
+            for word in range(25):
+                entry = WordEntry(f"Wort{word}", 'verb', f"meaning {word}", f"Beispiel {word}.")
+                entry.category = categories[population.category[learner, word]]
+                entry.times_asked = int(population.times_asked[learner, word])
+                entry.last_asked = int(population.last_asked[learner, word])
+                deck.append(entry)
+            expected = manager.rank_words(deck, now)[:params.pick_from]
+            assert top[learner].tolist() == expected
+            correct = [i for i in expected if deck[i].category == 'correct']
+            if population.consecutive_new_incorrect[learner] >= params.force_correct_after and correct:
+                assert top[learner][allowed[learner]].tolist() == correct
+            else:
+                assert allowed[learner].all()
+
+        cols = pick_delingo(population, rows, now, params, rng)
+        correct, _ = population.review(rows, cols, now, rng)
+        record_delingo(population, rows, cols, correct, now)
@@ -0,0 +1,63 @@
+from search_index import VocabSearchIndex, normalize_word
+from word_entry import WordEntry
+
+
+def make_deck():
+    return [
+        WordEntry('das Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)'),
+        WordEntry('Haustür', 'noun', 'front door', 'Die Haustür ist offen.', gender='die (feminine)'),
+        WordEntry('gehen', 'verb', 'to go, to walk', 'Wir gehen nach Hause.'),
+    ]
+
+
+def test_normalize_word_drops_articles_case_and_spacing():
+    assert normalize_word('  Das   Haus ') == 'haus'
+    assert normalize_word('Dieb') == 'dieb'
+
+
+def test_prefix_search_returns_shortest_words_first():
+    deck = make_deck()
+    index = VocabSearchIndex(deck)
+    assert index.prefix_search('hau') == [deck[0].id, deck[1].id]
+    assert index.prefix_search('Der Haus', limit=1) == [deck[0].id]
+    assert index.prefix_search('xyz') == []
+
+
+def test_search_falls_back_to_definitions_and_examples():
+    deck = make_deck()
+    index = VocabSearchIndex(deck)
+    assert index.search('walk') == [deck[2].id]
+    assert index.token_search('ist alt') == {deck[0].id}
+    assert index.search('haus') == [deck[0].id, deck[1].id]
+
+
+def test_updates_and_removals_are_reindexed():
+    deck = make_deck()
+    index = VocabSearchIndex(deck)
+    deck[2].update(word='laufen', definition='to run')
+    index.update(deck[2])
+    assert index.prefix_search('geh') == []
+    assert index.search('run') == [deck[2].id]
+    assert index.token_search('walk') == set()
+
+    index.remove(deck[0])
+    index.remove(deck[0])  # Removing twice is harmless
+    assert index.prefix_search('haus') == [deck[1].id]
+    assert 'alt' not in index.token_index
+
+
+def test_find_duplicates_ranks_exact_then_near_matches():
+    deck = make_deck()
+    index = VocabSearchIndex(deck)
+    matches = index.find_duplicates('Haus')
+    assert matches[0] == (deck[0].id, 1.0)
+    assert index.find_duplicates('Haus', exclude_id=deck[0].id, threshold=0.9) == []
+    assert [word_id for word_id, _ in index.find_duplicates('Hauss')] == [deck[0].id]
+    assert index.find_duplicates('') == []
+
+
+def test_manager_decks_are_searchable_after_reload(manager):
+    manager.save_vocabulary(make_deck())
+    vocabulary = manager.load_vocabulary()
+    index = VocabSearchIndex(vocabulary)
+    assert [index.entries[word_id]['word'] for word_id in index.search('geh')] == ['gehen']
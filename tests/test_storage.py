@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from storage import WriteBehindStorage, open_storage
+from word_entry import WordEntry
+
+BACKENDS = ['deck.json', 'deck.db', 'deck.journal']
+
+
+def make_word():
+    return WordEntry('Haus', 'noun', 'house', 'Das Haus ist alt.', gender='das (neutral)')
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_concurrent_updates_of_a_word_are_merged(tmp_path, name):
+    filename = os.path.join(tmp_path, name)
+    # Two sessions (or processes) with their own storage objects on one deck
+    first, second = open_storage(filename), open_storage(filename)
+    first.save_all([make_word()])
+    ours, theirs = first.load(), second.load()
+
+    ours[0].update(times_asked=3, last_asked=100, category='correct')
+    first.save_word(ours, ours[0])
+    theirs[0].update(times_asked=5, last_asked=200, category='incorrect',
+                     example='Ein neues Haus.', example_history=['Das Haus ist alt.'])
+    second.save_word(theirs, theirs[0])
+    # The first session carries on from its stale copy
+    ours[0].update(times_asked=4, last_asked=150, definition='house, home')
+    first.save_word(ours, ours[0])
+
+    [word] = open_storage(filename).load()
+    assert word.times_asked == 5
+    assert word.category == 'incorrect'  # From the session that asked it last
+    assert word.example == 'Ein neues Haus.'
+    assert word.definition == 'house, home'  # Edits come from the latest save
+    assert word.rev == 3
+    for storage in (first, second):
+        storage.close()
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_deleted_word_stays_deleted(tmp_path, name):
+    filename = os.path.join(tmp_path, name)
+    first, second = open_storage(filename), open_storage(filename)
+    first.save_all([make_word(), WordEntry('gehen', 'verb', 'to go', 'Wir gehen.')])
+    ours, theirs = first.load(), second.load()
+    first.delete_word(ours, ours.pop(0))
+    theirs[1].times_asked = 1
+    second.save_word(theirs, theirs[1])
+    assert [word.word for word in open_storage(filename).load()] == ['gehen']
+    for storage in (first, second):
+        storage.close()
+
+
+def test_write_behind_writes_copies_and_hands_merges_back(tmp_path):
+    filename = os.path.join(tmp_path, 'deck.json')
+    open_storage(filename).save_all([make_word()])
+    # One storage shared by two sessions, as the app's per-deck manager does
+    storage = WriteBehindStorage(open_storage(filename), flush_interval=60)
+    ours, theirs = storage.load(), storage.load()
+
+    theirs[0].update(times_asked=5, last_asked=200, category='incorrect')
+    storage.save_word(theirs, theirs[0])
+    storage.flush()
+    ours[0].update(times_asked=3, last_asked=100, category='correct')
+    storage.save_word(ours, ours[0])
+    ours[0].times_asked = 4  # Changed again while queued: the queued copy is what gets written
+    storage.flush()
+
+    # The background write merged into its copy, not into the session's entry
+    assert (ours[0].times_asked, ours[0].category, ours[0].rev) == (4, 'correct', 0)
+    assert storage.apply_written(ours) == [ours[0]]
+    assert (ours[0].times_asked, ours[0].category, ours[0].rev) == (5, 'incorrect', 2)
+    assert storage.apply_written(ours) == []
+    assert storage.apply_written(theirs) == []  # Nothing of theirs was merged
+    assert theirs[0].rev == 1
+
+    [word] = open_storage(filename).load()
+    assert (word.times_asked, word.category, word.rev) == (5, 'incorrect', 2)
+    storage.close()
+
+
+def test_write_behind_save_all_writes_queued_changes_first(tmp_path):
+    filename = os.path.join(tmp_path, 'deck.json')
+    open_storage(filename).save_all([make_word()])
+    storage = WriteBehindStorage(open_storage(filename), flush_interval=60)
+    ours, theirs = storage.load(), storage.load()
+
+    theirs[0].update(times_asked=2, last_asked=100)
+    storage.save_word(theirs, theirs[0])
+    storage.save_all(ours)
+
+    # Their queued write went out instead of being dropped, and its result waits for them
+    assert not storage.pending.count()
+    storage.apply_written(theirs)
+    assert theirs[0].rev == 1
+    storage.close()
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_hand_edited_example_survives_a_later_practice_save(tmp_path, name):
+    filename = os.path.join(tmp_path, name)
+    first, second = open_storage(filename), open_storage(filename)
+    first.save_all([make_word()])
+    practice, editor = first.load(), second.load()
+
+    # A practice session asks the word and refreshes its example...
+    practice[0].update(times_asked=1, last_asked=200, example='Ein neues Haus.',
+                       previous_example='Das Haus ist alt.', example_history=['Das Haus ist alt.'])
+    first.save_word(practice, practice[0])
+    # ...while the example is edited by hand in a session that hasn't seen that
+    editor[0].update(example='Das Haus ist groß.', definition='house, building')
+    second.save_word(editor, editor[0])
+
+    [word] = open_storage(filename).load()
+    assert word.example == 'Das Haus ist groß.'
+    assert word.definition == 'house, building'
+    assert word.times_asked == 1 and word.last_asked == 200
+    assert 'Ein neues Haus.' in word.example_history
+
+    # A session still showing an example the deck has since replaced doesn't bring it back
+    practice[0].update(times_asked=2)
+    first.save_word(practice, practice[0])
+    [word] = open_storage(filename).load()
+    assert word.example == 'Das Haus ist groß.'
+    for storage in (first, second):
+        storage.close()
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_entries_nested_in_extra_fields_are_saved(tmp_path, name):
+    filename = os.path.join(tmp_path, name)
+    storage = open_storage(filename)
+    word = make_word()
+    storage.save_all([word])
+    word['related'] = WordEntry('gehen', 'verb', 'to go', 'Wir gehen.')
+    storage.save_word([word], word)
+    storage.close()
+    [saved] = open_storage(filename).load()
+    assert saved['related']['word'] == 'gehen'
@@ -0,0 +1,61 @@
+import json
+import sys
+
+import pytest
+
+from vocab_manager import SCHEMA_VERSION
+from word_entry import WordEntry
+
+
+def test_legacy_dicts_get_tracking_fields_and_keep_unknown_keys():
+    word = WordEntry.from_dict({'word': 'Haus', 'part_of_speech': 'noun', 'definition': 'house',
+                                'example': 'Das Haus ist alt.', 'gender': 'das (neutral)', 'tags': ['home']})
+    assert word.id and word.category == 'new'
+    assert (word.times_asked, word.last_asked, word.example_history, word.example_pool, word.rev) == (0, 0, [], [], 0)
+    assert word['tags'] == ['home']
+    data = word.to_dict()
+    assert data['tags'] == ['home'] and data['gender'] == 'das (neutral)'
+    assert WordEntry.from_dict(json.loads(json.dumps(data))) == word
+
+
+def test_dict_style_access():
+    word = WordEntry('gehen', 'verb', 'to go', 'Wir gehen.')
+    assert word['definition'] == 'to go' and word.get('missing', 'x') == 'x'
+    assert 'gender' not in word and 'gender' not in word.to_dict()
+    assert word.get('gender', 'none') == 'none'
+    with pytest.raises(KeyError):
+        word['missing']
+    word['note'] = 'irregular'
+    word.update(category='correct', times_asked=2)
+    assert (word['note'], word.category, word.times_asked) == ('irregular', 'correct', 2)
+    assert set(word.keys()) >= {'id', 'word', 'note'} and len(word) == len(word.to_dict())
+    del word['note']
+    assert 'note' not in word
+
+
+def test_repeating_values_are_interned_and_copies_are_independent():
+    first = WordEntry('Haus', ''.join(['no', 'un']), 'house', 'e', gender='das (neutral)')
+    second = WordEntry('Baum', 'noun', 'tree', 'e', gender=''.join(['der', ' (masculine)']))
+    second['category'] = ''.join(['cor', 'rect'])
+    assert first.part_of_speech is second.part_of_speech
+    assert second.category is sys.intern('correct')
+
+    copy = first.copy()
+    copy.example_history.append('old')
+    copy.example_pool.append('next')
+    assert first.example_history == [] and first.example_pool == []
+    assert copy.id == first.id
+
+
+def test_manager_migrates_a_legacy_deck_once(manager):
+    with open(manager.storage.filename, 'w') as f:
+        json.dump([{'word': 'Haus', 'part_of_speech': 'noun', 'definition': 'house', 'example': 'e',
+                    'gender': 'das (neutral)'}], f)
+    manager.storage.schema_version = 0
+    [word] = manager.load_vocabulary()
+    assert isinstance(word, WordEntry)
+    with open(manager.storage.filename) as f:
+        saved = json.load(f)
+    assert saved['schema_version'] == SCHEMA_VERSION
+    assert saved['words'][0]['id'] == word.id
+    assert [entry.id for entry in manager.load_vocabulary()] == [word.id]
@@ -3,262 +3,672 @@
 import json
 import time
 import random
-from groq import Groq
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from storage import open_deck, WriteBehindStorage
+from grading_cache import GradingCache, grading_key
+from grading import Verdict, grade_locally, parse_llm_verdict
+from llm_client import LLMError, LLMResult, create_llm_client
+from metrics import Metrics
+from prompts import GRADING, PromptBuilder
+from review_log import ReviewLog, review_log_filename
+from scheduler import SchedulerParams, SchedulingIndex, VectorScheduleIndex
+from word_entry import WordEntry
 
-class GermanVocabManager:
-    def __init__(self):
-        self.client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-        self.example_refresh_threshold = 3  # Number of times a word is asked before refreshing example
+GRADING_MODEL = "llama3-8b-8192"
+EXAMPLE_MODEL = "llama3-8b-8192"
+GRADING_ERROR_MESSAGE = "Error evaluating answer. Please try again."
+POOL_REFILL_TTL = 600  # Seconds a finished background pool refill waits to be collected
+SCHEMA_VERSION = 1  # Bump when update_vocab_structure learns a new fix-up
 
-    def create_empty_json(self, filename='german_vocab.json'):
-        """Creates an empty JSON file if it doesn't exist."""
-        with open(filename, 'w') as f:
-            json.dump([], f)
-        return f"{filename} created as an empty file."
 
-    def load_vocabulary(self, filename='german_vocab.json'):
-        """Loads vocabulary from a JSON file or creates the file if it doesn't exist."""
-        if not os.path.exists(filename):
-            self.create_empty_json(filename)
-            return []
+class VerdictStream:
+    """Yields feedback text as it arrives; verdict is set once iteration finishes"""
 
+    def __init__(self, chunks, source, categorize):
+        self.chunks = chunks
+        self.source = source
+        self.categorize = categorize
+        self.verdict = None
+
+    def __iter__(self):
+        parts = []
         try:
-            with open(filename, 'r') as f:
-                vocabulary = json.load(f)
-            return self.update_vocab_structure(vocabulary)
-        except json.JSONDecodeError:
-            return []
+            for chunk in self.chunks:
+                parts.append(chunk)
+                yield chunk
+        except LLMError as e:
+            print(f"Error checking answer: {e}")
+            message = ("\n\n" if parts else "") + GRADING_ERROR_MESSAGE
+            yield message
+            self.verdict = Verdict('error', ''.join(parts) + message, self.source)
+            return
+        text = ''.join(parts)
+        self.verdict = Verdict(self.categorize(text), text, self.source)
+
+
+class ExamplePrefetch:
+    """A refreshed example being generated in the background for an upcoming word"""
+
+    def __init__(self, word, future):
+        self.word_id = word['id']
+        self.example = word['example']
+        self.future = future
+
+    def result(self, word):
+        """Return the new example if it is ready and still applies to word, otherwise None"""
+        # The word was deleted, replaced or edited since the prefetch started
+        if word.id != self.word_id or word['example'] != self.example:
+            self.cancel()
+            return None
+        if not self.future.done():
+            self.cancel()
+            return None
+        try:
+            return self.future.result()
+        except Exception as e:
+            print(f"Error prefetching example: {e}")
+            return None
+
+    def cancel(self):
+        self.future.cancel()
+
 
-    def update_vocab_structure(self, vocabulary):
-        """Update the structure of vocabulary entries"""
-        for word in vocabulary:
-            if 'category' not in word:
-                word['category'] = 'new'
-            if 'times_asked' not in word:
-                word['times_asked'] = 0
-            if 'last_asked' not in word:
-                word['last_asked'] = 0
-            if 'previous_example' not in word:
-                word['previous_example'] = None
-            if 'last_example_refresh' not in word:
-                word['last_example_refresh'] = 0
-            if 'example_history' not in word:
-                word['example_history'] = []
+class GermanVocabManager:
+    def __init__(self, storage=None, write_behind=True, llm=None, grading_cache=None, review_log=None):
+        """storage defaults to the default learner's default deck, and review_log to a
+        .reviews file next to it. The LLM client and grading cache can be shared
+        between the managers of several decks."""
+        self.llm = llm or create_llm_client()
+        self.example_refresh_threshold = 3  # Number of times a word is asked before refreshing example
+        self.example_pool_size = 5  # Examples pre-generated per word by the pool builder and refills
+        self.pool_refill_below = 2  # Refill a word's pool in the background once it has fewer left
+        self.pool_refills = {}  # id(vocabulary) -> {id(word): (word, future, started)}, awaiting collection
+        self.refilling_lock = threading.Lock()
+        self.vectorize_above = 20000  # Deck size from which scheduling uses NumPy batch scoring
+        self.scheduler_params = SchedulerParams()
+        self.prompts = PromptBuilder()  # Token budgets of the LLM prompts
+        self.executor = ThreadPoolExecutor(max_workers=2)  # Background example generation
+        self.grading_cache = grading_cache or GradingCache(os.environ.get("DELINGO_GRADING_CACHE", "grading_cache.db"))
+        self.metrics = Metrics()
+        storage = storage or open_deck()
+        # Batch word updates on a background thread instead of writing on every answer
+        self.storage = WriteBehindStorage(storage, metrics=self.metrics) if write_behind else storage
+        self.review_log = review_log or ReviewLog(review_log_filename(storage.filename))
+
+        self.metrics.collect('storage_bytes_written', lambda storage=self.storage: storage.bytes_written)
+        for stat in self.grading_cache.stats:
+            self.metrics.collect(f'grading_cache_{stat}', lambda stat=stat, cache=self.grading_cache: cache.stats[stat])
+
+    def load_vocabulary(self):
+        """Loads vocabulary from the configured storage backend.
+
+        Entries are brought up to date with update_vocab_structure only when the
+        stored schema version is older than SCHEMA_VERSION, and the result is
+        saved so later loads skip it.
+        """
+        with self.metrics.timer('storage.load'):
+            vocabulary = self.storage.load()
+        if self.storage.schema_version < SCHEMA_VERSION:
+            vocabulary = self.update_vocab_structure(vocabulary)
+            self.storage.schema_version = SCHEMA_VERSION
+            self.save_vocabulary(vocabulary)
         return vocabulary
 
-    def save_vocabulary(self, vocabulary, filename='german_vocab.json'):
-        """Save vocabulary to JSON file"""
-        with open(filename, 'w') as f:
-            json.dump(vocabulary, f)
+    @staticmethod
+    def update_vocab_structure(vocabulary):
+        """Update the structure of vocabulary entries
 
-    def check_answer(self, word_entry, user_answer):
-        """Check answer using LLM"""
-        base_prompt = f"""
-        German Word: {word_entry['word']}
-        Correct Definition: {word_entry['definition']}
-        User's Answer: {user_answer}
+        Entries come back as WordEntry objects; WordEntry.from_dict fills in an
+        id, category, ask stats and example history where older files lack them.
         """
-        
-        if word_entry['part_of_speech'] == 'noun':
-            base_prompt += f"\nCorrect Gender: {word_entry['gender']}"
-        
-        prompt = base_prompt + """
-        Evaluate if the user's answer matches the correct definition. For nouns, also check if they correctly identified the gender.
-        The answer should be considered correct if the meaning is accurately conveyed, even if the exact wording is different.
-        Start the response like this:
-        Your answer is correct/incorrect!
+        return [word if isinstance(word, WordEntry) else WordEntry.from_dict(word) for word in vocabulary]
+
+    def save_vocabulary(self, vocabulary):
+        """Save the whole vocabulary"""
+        with self.metrics.timer('storage.save_all'):
+            self.storage.save_all(vocabulary)
+
+    def save_word(self, vocabulary, word):
+        """Persist a single added or changed entry"""
+        with self.metrics.timer('storage.save'):
+            self.storage.save_word(vocabulary, word)
+
+    def save_words(self, vocabulary, words):
+        """Persist several added or changed entries as one batch"""
+        with self.metrics.timer('storage.save'):
+            self.storage.save_batch(vocabulary, words, [])
+
+    def delete_word(self, vocabulary, word):
+        """Persist the removal of an entry already popped from vocabulary"""
+        with self.metrics.timer('storage.save'):
+            self.storage.delete_word(vocabulary, word)
+
+    def flush(self):
+        """Write any changes still queued by the write-behind storage"""
+        if hasattr(self.storage, 'flush'):
+            self.storage.flush()
+
+    def apply_written(self, vocabulary):
+        """Pick up stats that background writes merged from other sessions into vocabulary's entries.
+
+        Call from the thread that owns vocabulary. Returns the entries that
+        changed, so indexes over them can be updated.
         """
+        if hasattr(self.storage, 'apply_written'):
+            return self.storage.apply_written(vocabulary)
+        return []
 
+    def _record_usage(self, operation, prompt, result):
+        labels = {'operation': operation, 'prompt_version': prompt.template.version}
+        self.metrics.add('llm_calls', **labels)
+        self.metrics.add('llm_prompt_tokens', result.prompt_tokens, **labels)
+        self.metrics.add('llm_completion_tokens', result.completion_tokens, **labels)
+        if prompt.dropped:
+            self.metrics.add('llm_history_dropped', prompt.dropped, operation=operation)
+
+    def token_usage(self):
+        """Calls and mean prompt/completion tokens per operation and prompt version"""
+        usage = {}
+        for counter in self.metrics.snapshot()['counters']:
+            field = {'llm_calls': 'calls', 'llm_prompt_tokens': 'prompt_tokens',
+                     'llm_completion_tokens': 'completion_tokens'}.get(counter['name'])
+            if field is None:
+                continue
+            key = (counter['labels']['operation'], counter['labels']['prompt_version'])
+            usage.setdefault(key, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})[field] = counter['value']
+        return [
+            {
+                'operation': operation,
+                'prompt_version': version,
+                'calls': totals['calls'],
+                'mean_prompt_tokens': totals['prompt_tokens'] / max(1, totals['calls']),
+                'mean_completion_tokens': totals['completion_tokens'] / max(1, totals['calls']),
+            }
+            for (operation, version), totals in sorted(usage.items())
+        ]
+
+    def _complete(self, operation, prompt, model, **options):
+        """One LLM completion of a Prompt, timed and with its token usage recorded under operation"""
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama3-8b-8192",
+            with self.metrics.timer(operation):
+                result = self.llm.complete([{"role": "user", "content": prompt.text}], model, **options)
+        except LLMError:
+            self.metrics.add('llm_errors', operation=operation)
+            raise
+        self._record_usage(operation, prompt, result)
+        return result
+
+    def _stream(self, operation, prompt, model):
+        """Like _complete, but yields the text as it arrives"""
+        usage = LLMResult('')
+        start = time.perf_counter()
+        try:
+            yield from self.llm.stream([{"role": "user", "content": prompt.text}], model, usage=usage)
+        except LLMError:
+            self.metrics.add('llm_errors', operation=operation)
+            raise
+        finally:
+            self.metrics.observe(operation, time.perf_counter() - start)
+        self._record_usage(operation, prompt, usage)
+
+    def format_user_answer(self, word_entry, definition_answer, gender_answer=None):
+        """Combine the answer fields into the text sent to the LLM"""
+        if word_entry['part_of_speech'] == 'noun':
+            return f"Gender: {gender_answer}\nDefinition: {definition_answer}"
+        return definition_answer
+
+    def grade_answer(self, word_entry, definition_answer, gender_answer=None):
+        """Grade an answer locally when it is clear-cut, otherwise with the LLM"""
+        verdict = grade_locally(word_entry, definition_answer, gender_answer)
+        if verdict is not None:
+            return verdict
+        try:
+            llm_response = self.request_grading(
+                word_entry, self.format_user_answer(word_entry, definition_answer, gender_answer)
             )
-            return chat_completion.choices[0].message.content
-        except Exception as e:
+        except LLMError as e:
+            # Not knowing the verdict is different from the answer being wrong
             print(f"Error checking answer: {e}")
-            return "Error evaluating answer. Please try again."
+            return Verdict('error', GRADING_ERROR_MESSAGE, 'llm')
+        return Verdict(self.categorize_answer(llm_response), llm_response, 'llm')
 
-    def generate_new_example(self, word_entry):
-        """Generate a new example sentence using LLM"""
-        # Create a context that includes previous examples to ensure variety
-        previous_examples = [word_entry['example']]
-        if word_entry.get('previous_example'):
-            previous_examples.append(word_entry['previous_example'])
-        if word_entry.get('example_history'):
-            previous_examples.extend(word_entry['example_history'])
-        
-        previous_examples_str = "\n".join(previous_examples)
-        
-        context = f"""
-        Create a new, simple example sentence in German using the word "{word_entry['word']}".
-        
-        Word information:
-        - Type: {word_entry['part_of_speech']}
-        - {"Gender: " + word_entry['gender'] if word_entry['part_of_speech'] == 'noun' else ""}
-        - Definition: {word_entry['definition']}
-        
-        Previous examples (create something different):
-        {previous_examples_str}
-
-        Rules:
-        - Provide only the new example sentence in German
-        - Make it simple and practical for learning
-        - Use common vocabulary
-        - Keep the sentence length moderate
-        - Do not explain or translate, just provide the sentence
-        """
+    def grade_answer_stream(self, word_entry, definition_answer, gender_answer=None):
+        """Like grade_answer, but returns a VerdictStream that yields the feedback as it arrives"""
+        verdict = grade_locally(word_entry, definition_answer, gender_answer)
+        if verdict is not None:
+            return VerdictStream([verdict.feedback], verdict.source, lambda text: verdict.category)
+        chunks = self.check_answer_stream(
+            word_entry, self.format_user_answer(word_entry, definition_answer, gender_answer)
+        )
+        return VerdictStream(chunks, 'llm', self.categorize_answer)
+
+    def build_check_prompt(self, word_entry, user_answer):
+        """Build the grading prompt for check_answer"""
+        return self.prompts.grading(word_entry, user_answer)
 
+    def request_grading(self, word_entry, user_answer):
+        """Grade with the LLM, reusing a cached grading of the same answer. Raises LLMError."""
+        cache_key = grading_key(word_entry, user_answer, GRADING_MODEL, GRADING.version)
+        cached = self.grading_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = self.build_check_prompt(word_entry, user_answer)
+        response = self._complete('llm.grading', prompt, GRADING_MODEL).text
+        self.grading_cache.put(cache_key, response)
+        return response
+
+    def check_answer(self, word_entry, user_answer):
+        """Check answer using LLM"""
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": context}],
-                model="llama3-8b-8192",
+            return self.request_grading(word_entry, user_answer)
+        except LLMError as e:
+            print(f"Error checking answer: {e}")
+            return GRADING_ERROR_MESSAGE
+
+    def check_answer_stream(self, word_entry, user_answer):
+        """Like request_grading, but yields the response text as the tokens arrive. Raises LLMError."""
+        cache_key = grading_key(word_entry, user_answer, GRADING_MODEL, GRADING.version)
+        cached = self.grading_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        prompt = self.build_check_prompt(word_entry, user_answer)
+        parts = []
+        for text in self._stream('llm.grading_stream', prompt, GRADING_MODEL):
+            parts.append(text)
+            yield text
+        self.grading_cache.put(cache_key, ''.join(parts))
+
+    def check_answers_batch(self, items):
+        """Grade several (word_entry, definition_answer, gender_answer) items with one LLM request
+
+        Clear-cut and cached answers are graded without the LLM. Items missing from
+        the batch response, or with an unreadable result, are graded one by one.
+        Returns a Verdict per item, in order; items the LLM couldn't grade get an
+        'error' verdict.
+        """
+        verdicts = [None] * len(items)
+        pending = []  # (position, cache_key, user_answer) still needing the LLM
+
+        for position, (word_entry, definition_answer, gender_answer) in enumerate(items):
+            verdict = grade_locally(word_entry, definition_answer, gender_answer)
+            if verdict is not None:
+                verdicts[position] = verdict
+                continue
+            user_answer = self.format_user_answer(word_entry, definition_answer, gender_answer)
+            cache_key = grading_key(word_entry, user_answer, GRADING_MODEL, GRADING.version)
+            cached = self.grading_cache.get(cache_key)
+            if cached is not None:
+                verdicts[position] = Verdict(self.categorize_answer(cached), cached, 'llm')
+                continue
+            pending.append((position, cache_key, user_answer))
+
+        if pending:
+            responses = self.request_batch_grading(
+                [(items[position][0], user_answer) for position, _, user_answer in pending]
             )
-            return chat_completion.choices[0].message.content.strip()
-        except Exception as e:
+            for batch_position, (position, cache_key, user_answer) in enumerate(pending):
+                response = responses.get(batch_position)
+                if response is None:
+                    try:
+                        response = self.request_grading(items[position][0], user_answer)
+                    except LLMError as e:
+                        print(f"Error checking answer: {e}")
+                        verdicts[position] = Verdict('error', GRADING_ERROR_MESSAGE, 'llm')
+                        continue
+                else:
+                    self.grading_cache.put(cache_key, response)
+                verdicts[position] = Verdict(self.categorize_answer(response), response, 'llm')
+
+        return verdicts
+
+    def request_batch_grading(self, items):
+        """Ask the LLM to grade (word_entry, user_answer) items, in as few requests as the budget allows
+
+        Returns {item position: response text} for the items it could parse.
+        """
+        responses = {}
+        for prompt in self.prompts.grading_batch(items):
+            try:
+                result = self._complete(
+                    'llm.grading_batch', prompt, GRADING_MODEL, response_format={"type": "json_object"}
+                )
+                results = json.loads(result.text)['results']
+            except (LLMError, ValueError, KeyError, TypeError) as e:
+                print(f"Error checking answers in batch: {e}")
+                continue
+
+            for result in results:
+                try:
+                    number = int(result['item']) - 1
+                    verdict = str(result['verdict']).strip().lower()
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if 0 <= number < len(prompt.positions) and verdict in ('correct', 'incorrect'):
+                    responses[prompt.positions[number]] = (
+                        f"Your answer is {verdict}! {result.get('feedback', '')}".strip()
+                    )
+        return responses
+
+    def build_example_prompt(self, word_entry):
+        """Build the prompt for generate_new_example, with as much earlier history as fits its budget"""
+        return self.prompts.example(word_entry)
+
+    def generate_new_example(self, word_entry):
+        """Generate a new example sentence using LLM"""
+        prompt = self.build_example_prompt(word_entry)
+        try:
+            return self._complete('llm.example', prompt, EXAMPLE_MODEL).text.strip()
+        except LLMError as e:
             print(f"Error generating new example: {e}")
             return word_entry['example']  # Return the current example if generation fails
 
-    def should_refresh_example(self, word_entry):
-        """Check if the example should be refreshed based on times_asked"""
-        times_asked = word_entry.get('times_asked', 0)
-        last_example_refresh = word_entry.get('last_example_refresh', 0)
-        times_since_refresh = times_asked - last_example_refresh
+    def generate_new_example_stream(self, word_entry):
+        """Like generate_new_example, but yields the sentence as the tokens arrive"""
+        prompt = self.build_example_prompt(word_entry)
+        started = False
+        try:
+            for text in self._stream('llm.example_stream', prompt, EXAMPLE_MODEL):
+                started = True
+                yield text
+        except LLMError as e:
+            if started:
+                raise  # A half-streamed sentence can't be completed with the old example
+            print(f"Error generating new example: {e}")
+            yield word_entry['example']  # Fall back to the current example if generation fails
+
+    def request_example_pools(self, words, count):
+        """Ask the LLM for count new example sentences per word, in as few requests as the budget allows
+
+        Returns {word position: [sentences]} for the words it could parse.
+        """
+        pools = {}
+        for prompt in self.prompts.example_pool(words, count):
+            try:
+                result = self._complete(
+                    'llm.example_pool', prompt, EXAMPLE_MODEL, response_format={"type": "json_object"}
+                )
+                results = json.loads(result.text)['examples']
+            except (LLMError, ValueError, KeyError, TypeError) as e:
+                print(f"Error generating example pools: {e}")
+                continue
+
+            for result in results:
+                try:
+                    number = int(result['item']) - 1
+                    sentences = [str(sentence).strip() for sentence in result['sentences']]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if 0 <= number < len(prompt.positions):
+                    pools[prompt.positions[number]] = [sentence for sentence in sentences if sentence]
+        return pools
+
+    def add_to_pool(self, word, sentences, pool_size=None):
+        """Queue new examples for word, skipping ones it has already shown; returns how many were added"""
+        pool_size = pool_size or self.example_pool_size
+        seen = set(word.example_history) | set(word.example_pool) | {word.example, word.previous_example}
+        added = 0
+        for sentence in sentences:
+            if len(word.example_pool) >= pool_size:
+                break
+            if sentence not in seen:
+                word.example_pool.append(sentence)
+                seen.add(sentence)
+                added += 1
+        return added
+
+    def fetch_example_pools(self, snapshots, pool_size=None):
+        """Request enough examples to top up the pools of snapshots, copies of the words.
+
+        Returns {position: sentences}. Safe to run on any thread: it only reads
+        the copies. fill_example_pools then adds the sentences to the words.
+        """
+        pool_size = pool_size or self.example_pool_size
+        count = pool_size - min(len(word.example_pool) for word in snapshots)
+        if count <= 0:
+            return {}
+        return self.request_example_pools(snapshots, count)
+
+    def fill_example_pools(self, vocabulary, words, pools, pool_size=None):
+        """Add fetched sentences to the pools of words and save them; returns the number added.
+
+        Call from the thread that owns the words, since practice takes examples
+        from the same pools.
+        """
+        changed = []
+        added = 0
+        for position, word in enumerate(words):
+            word_added = self.add_to_pool(word, pools.get(position, []), pool_size)
+            if word_added:
+                changed.append(word)
+                added += word_added
+        if changed:
+            self.save_words(vocabulary, changed)
+        return added
+
+    def refill_example_pools(self, vocabulary, words, pool_size=None):
+        """Top up the example pools of words and save them, on the calling thread.
+
+        Returns the number of examples added.
+        """
+        pools = self.fetch_example_pools([word.copy() for word in words], pool_size)
+        return self.fill_example_pools(vocabulary, words, pools, pool_size) if pools else 0
+
+    def refill_pool_later(self, vocabulary, word):
+        """Fetch examples for word's pool on the background thread, unless a refill is already pending.
+
+        The sentences are added by collect_pool_refills, on the thread that owns vocabulary.
+        """
+        with self.refilling_lock:
+            refills = self.pool_refills.setdefault(id(vocabulary), {})
+            if id(word) in refills:
+                return
+            # Drop refills of sessions that ended without collecting them
+            now = time.monotonic()
+            for vocabulary_id, pending in list(self.pool_refills.items()):
+                for key, (_, future, started) in list(pending.items()):
+                    if future.done() and now - started > POOL_REFILL_TTL:
+                        del pending[key]
+                if not pending and vocabulary_id != id(vocabulary):
+                    del self.pool_refills[vocabulary_id]
+            refills[id(word)] = (word, self.executor.submit(self.fetch_example_pools, [word.copy()]), now)
+
+    def collect_pool_refills(self, vocabulary):
+        """Add the examples of finished background refills to vocabulary's words, and save them"""
+        with self.refilling_lock:
+            refills = self.pool_refills.get(id(vocabulary))
+            if not refills:
+                return
+            finished = [key for key, (_, future, _) in refills.items() if future.done()]
+            done = [refills.pop(key) for key in finished]
+        for word, future, _ in done:
+            try:
+                self.fill_example_pools(vocabulary, [word], future.result())
+            except Exception as e:
+                print(f"Error refilling example pool: {e}")
+
+    def should_refresh_example(self, word_entry, upcoming=False):
+        """Check if the example should be refreshed based on times_asked
+
+        With upcoming=True, check whether it will need a refresh the next time it is asked.
+        """
+        times_asked = word_entry.times_asked + (1 if upcoming else 0)
+        times_since_refresh = times_asked - word_entry.last_example_refresh
         return times_since_refresh >= self.example_refresh_threshold
 
+    def prefetch_example(self, word):
+        """Start generating a new example for a word that will need one when next asked"""
+        if not self.should_refresh_example(word, upcoming=True) or word.example_pool:
+            return None
+        # Work on a copy so the background thread never sees a half-updated entry
+        snapshot = word.copy()
+        return ExamplePrefetch(word, self.executor.submit(self.generate_new_example, snapshot))
+
     def categorize_answer(self, llm_response):
         """Determine category based on LLM response"""
-        return "correct" if "correct" in llm_response.lower() else "incorrect"
-
-    def increment_times_asked(self, word):
-        """Increment the times a word has been asked and update example if needed"""
-        word['times_asked'] = word.get('times_asked', 0) + 1
-        word['last_asked'] = int(time.time())
-        
-        # Initialize tracking fields if they don't exist
-        if 'last_example_refresh' not in word:
-            word['last_example_refresh'] = 0
-        if 'example_history' not in word:
-            word['example_history'] = []
-            
+        return parse_llm_verdict(llm_response)
+
+    def increment_times_asked(self, word, prefetch=None, on_example_text=None, vocabulary=None):
+        """Increment the times a word has been asked and update example if needed
+
+        A refresh takes the next example from the word's pool when it has one, without
+        calling the LLM. Once the pool runs low, if vocabulary is given, new examples are
+        fetched in the background and added by a later call for the same vocabulary.
+        Without a pooled example, a prefetch for this word is used if given. When it
+        isn't ready yet the refresh is left due for the next time. Otherwise, if
+        on_example_text is given, the new example is streamed and the callback is
+        called with the text received so far.
+        """
+        if vocabulary is not None:
+            self.collect_pool_refills(vocabulary)
+        word.times_asked += 1
+        word.last_asked = int(time.time())
+
         # Check if we should refresh the example
         if self.should_refresh_example(word):
-            try:
-                new_example = self.generate_new_example(word)
-                if new_example and new_example != word['example']:
-                    # Store the current example in history
-                    if word['example'] not in word['example_history']:
-                        word['example_history'].append(word['example'])
-                    # Keep only the last 5 examples in history
-                    word['example_history'] = word['example_history'][-5:]
-                    # Update the current and previous examples
-                    word['previous_example'] = word['example']
-                    word['example'] = new_example
-                    word['last_example_refresh'] = word['times_asked']
-            except Exception as e:
-                print(f"Error updating example: {e}")
+            with self.metrics.timer('example.refresh'):
+                try:
+                    pooled = bool(word.example_pool)
+                    if pooled:
+                        new_example = word.example_pool.pop(0)
+                    elif prefetch is not None and prefetch.word_id == word.id:
+                        new_example = prefetch.result(word)
+                    elif on_example_text is not None:
+                        text = ''
+                        for chunk in self.generate_new_example_stream(word):
+                            text += chunk
+                            on_example_text(text)
+                        new_example = text.strip()
+                    else:
+                        new_example = self.generate_new_example(word)
+                    if new_example and new_example != word.example:
+                        # Store the current example in history
+                        if word.example not in word.example_history:
+                            word.example_history.append(word.example)
+                        # Keep only the last 5 examples in history
+                        word.example_history = word.example_history[-5:]
+                        # Update the current and previous examples
+                        word.previous_example = word.example
+                        word.example = new_example
+                        word.last_example_refresh = word.times_asked
+                    self.metrics.add('example_refreshes', source='pool' if pooled else 'llm')
+                    if pooled and vocabulary is not None and len(word.example_pool) < self.pool_refill_below:
+                        self.refill_pool_later(vocabulary, word)
+                except Exception as e:
+                    print(f"Error updating example: {e}")
 
-    def get_next_word_index(self, vocabulary, consecutive_new_incorrect):
+    def create_schedule_index(self, vocabulary):
+        """Create the scheduling index best suited to the deck size"""
+        with self.metrics.timer('scheduler.build_index'):
+            if len(vocabulary) >= self.vectorize_above:
+                return VectorScheduleIndex(vocabulary, self.scheduler_params)
+            return SchedulingIndex(vocabulary, self.scheduler_params)
+
+    def get_next_word_index(self, vocabulary, consecutive_new_incorrect, schedule_index=None):
         """Get the index of the next word to practice"""
         if not vocabulary:
             return None
 
-        priorities = []
         current_time = int(time.time())
-        
+
+        with self.metrics.timer('scheduler.next_word'):
+            if schedule_index is not None:
+                if not schedule_index.is_current(vocabulary):
+                    schedule_index.rebuild(vocabulary)
+                top_words = schedule_index.top(self.scheduler_params.pick_from, current_time)
+            else:
+                top_words = self.rank_words(vocabulary, current_time)[:self.scheduler_params.pick_from]
+
+        # If we've had too many consecutive new/incorrect words, force a correct one
+        if consecutive_new_incorrect >= self.scheduler_params.force_correct_after:
+            correct_words = [i for i in top_words if vocabulary[i]['category'] == 'correct']
+            if correct_words:
+                return random.choice(correct_words)
+
+        # Otherwise, choose randomly from the top words
+        return random.choice(top_words)
+
+    def get_round_word_indices(self, vocabulary, count, schedule_index=None):
+        """Get the indices of the count highest-priority words, in random order"""
+        if not vocabulary:
+            return []
+
+        current_time = int(time.time())
+
+        with self.metrics.timer('scheduler.round'):
+            if schedule_index is not None:
+                if not schedule_index.is_current(vocabulary):
+                    schedule_index.rebuild(vocabulary)
+                indices = schedule_index.top(count, current_time)
+            else:
+                indices = self.rank_words(vocabulary, current_time)[:count]
+
+        random.shuffle(indices)
+        return indices
+
+    def rank_words(self, vocabulary, current_time):
+        """Return all word indices sorted by priority (highest to lowest)"""
+        params = self.scheduler_params
+        priorities = []
+
         for i, word in enumerate(vocabulary):
-            category = word.get('category', 'new')
-            times_asked = word.get('times_asked', 0)
-            last_asked = word.get('last_asked', 0)
-            time_since_last = current_time - last_asked
+            time_since_last = current_time - word.last_asked
 
             # Base priority score
-            if category == 'new':
-                priority = 100
-            elif category == 'incorrect':
-                priority = 80
-            else:  # correct
-                priority = 60
+            priority = params.base_priority(word.category)
 
             # Adjust priority based on various factors
-            priority -= times_asked * 5  # Reduce priority for frequently asked words
-            priority += time_since_last / 3600  # Increase priority for words not asked recently
-            
+            priority -= word.times_asked * params.times_asked_penalty  # Reduce priority for frequently asked words
+            priority += time_since_last / 3600 * params.hour_weight  # Increase priority for words not asked recently
+
             # Bonus for words that haven't been asked in a long time
-            if time_since_last > 86400:  # More than a day
-                priority += 20
-            
+            if time_since_last > params.stale_after:  # More than a day by default
+                priority += params.stale_bonus
+
             priorities.append((i, priority))
 
-        # Sort words by priority (highest to lowest)
         sorted_priorities = sorted(priorities, key=lambda x: x[1], reverse=True)
-        top_words = sorted_priorities[:5]
-
-        # If we've had too many consecutive new/incorrect words, force a correct one
-        if consecutive_new_incorrect >= 4:
-            correct_words = [i for i, _ in top_words if vocabulary[i]['category'] == 'correct']
-            if correct_words:
-                return random.choice(correct_words)
-
-        # Otherwise, choose randomly from the top 5
-        return random.choice([i for i, _ in top_words])
+        return [i for i, _ in sorted_priorities]
 
     def create_new_word_entry(self, word, part_of_speech, definition, example, gender=None):
         """Create a new vocabulary entry"""
-        entry = {
-            "word": word,
-            "part_of_speech": part_of_speech,
-            "definition": definition,
-            "example": example,
-            "previous_example": None,
-            "example_history": [],
-            "category": "new",
-            "times_asked": 0,
-            "last_asked": 0,
-            "last_example_refresh": 0
-        }
-        if gender:
-            entry["gender"] = gender
-        return entry
-
-    def update_word_entry(self, word_entry, word, part_of_speech, definition, example, gender=None):
-        """Update an existing vocabulary entry"""
-        # Preserve the history and tracking fields
-        history_fields = {
-            'times_asked': word_entry.get('times_asked', 0),
-            'last_asked': word_entry.get('last_asked', 0),
-            'category': word_entry.get('category', 'new'),
-            'previous_example': word_entry.get('previous_example', None),
-            'example_history': word_entry.get('example_history', []),
-            'last_example_refresh': word_entry.get('last_example_refresh', 0)
-        }
-        
-        # Update the main fields
-        word_entry.update({
-            'word': word,
-            'part_of_speech': part_of_speech,
-            'definition': definition,
-            'example': example,
-            **history_fields  # Preserve history fields
-        })
-        
-        # Handle gender field
-        if gender:
-            word_entry['gender'] = gender
-        elif 'gender' in word_entry:
-            del word_entry['gender']
-            
+        return WordEntry(word, part_of_speech, definition, example, gender=gender)
+
+    def update_word_entry(self, word_entry, word, part_of_speech, definition, example, gender=None, category=None):
+        """Update an existing vocabulary entry, keeping its history and tracking fields"""
+        word_entry.update(word=word, part_of_speech=part_of_speech, definition=definition,
+                          example=example, gender=gender or None)
+        if category:
+            word_entry.category = category
         return word_entry
 
+    def record_review(self, word_entry, verdict, latency=0.0):
+        """Log a graded answer to the review log; errors aren't answers and are skipped"""
+        if verdict.category not in ('correct', 'incorrect'):
+            return
+        try:
+            with self.metrics.timer('reviews.record'):
+                self.review_log.append(word_entry.id, verdict.category, latency, verdict.source)
+        except OSError as e:
+            print(f"Error logging review: {e}")
+
     def get_word_statistics(self, word_entry):
-        """Get statistics for a word entry"""
+        """Get statistics for a word entry, with its answer history totals from the review log"""
+        reviews = self.review_log.word_stats(word_entry.id)
         return {
-            'times_asked': word_entry.get('times_asked', 0),
+            'times_asked': word_entry.times_asked,
+            'reviews': reviews['reviews'],
+            'accuracy': reviews['accuracy'],
+            'streak': reviews['streak'],
+            'best_streak': reviews['best_streak'],
             'last_asked': time.strftime('%Y-%m-%d %H:%M:%S', 
-                                      time.localtime(word_entry.get('last_asked', 0))),
-            'category': word_entry.get('category', 'new'),
-            'example_count': len(word_entry.get('example_history', [])) + 1,
+                                      time.localtime(word_entry.last_asked)),
+            'category': word_entry.category,
+            'example_count': len(word_entry.example_history) + 1,
             'last_refresh': time.strftime('%Y-%m-%d %H:%M:%S', 
-                                        time.localtime(word_entry.get('last_example_refresh', 0)))
+                                        time.localtime(word_entry.last_example_refresh))
         }
\ No newline at end of file
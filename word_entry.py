@@ -0,0 +1,146 @@
+# word_entry.py
+
+import sys
+import uuid
+
+FIELDS = ('id', 'word', 'part_of_speech', 'definition', 'example', 'gender', 'category',
+          'times_asked', 'last_asked', 'previous_example', 'last_example_refresh', 'example_history',
+          'example_pool', 'rev')
+FIELD_SET = frozenset(FIELDS)
+INTERNED_FIELDS = frozenset(('part_of_speech', 'gender', 'category'))
+
+
+def intern_value(value):
+    """Share one string object for values that repeat across the whole deck"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class WordEntry:
+    """One vocabulary entry, stored in slots instead of a per-entry dict.
+
+    Part of speech, gender and category come from small fixed sets and are
+    interned. Hot paths read attributes directly (entry.times_asked); the dict
+    style access the rest of the app uses (entry['word'], entry.get(...)) still
+    works, and keys the app doesn't know about are kept in extra so they survive
+    a load/save round trip.
+    """
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, word, part_of_speech, definition, example, gender=None, id=None,
+                 category='new', times_asked=0, last_asked=0, previous_example=None,
+                 last_example_refresh=0, example_history=None, example_pool=None, rev=0, extra=None):
+        self.id = id or uuid.uuid4().hex
+        self.word = word
+        self.part_of_speech = intern_value(part_of_speech)
+        self.definition = definition
+        self.example = example
+        self.gender = intern_value(gender) or None
+        self.category = intern_value(category)
+        self.times_asked = times_asked
+        self.last_asked = last_asked
+        self.previous_example = previous_example
+        self.last_example_refresh = last_example_refresh
+        self.example_history = example_history if example_history is not None else []
+        self.example_pool = example_pool if example_pool is not None else []  # Pre-generated upcoming examples
+        self.rev = rev  # Bumped by storage on every write, to detect concurrent updates
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an entry from its JSON form, filling in fields older files lack"""
+        extra = {key: value for key, value in data.items() if key not in FIELD_SET}
+        return cls(
+            data.get('word', ''), data.get('part_of_speech', 'other'), data.get('definition', ''),
+            data.get('example', ''), gender=data.get('gender'), id=data.get('id'),
+            category=data.get('category', 'new'), times_asked=data.get('times_asked', 0),
+            last_asked=data.get('last_asked', 0), previous_example=data.get('previous_example'),
+            last_example_refresh=data.get('last_example_refresh', 0),
+            example_history=data.get('example_history'), example_pool=data.get('example_pool'),
+            rev=data.get('rev', 0), extra=extra
+        )
+
+    def to_dict(self):
+        """The JSON form: a plain dict, without a gender key for non-nouns"""
+        data = {field: getattr(self, field) for field in FIELDS}
+        if data['gender'] is None:
+            del data['gender']
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self):
+        entry = WordEntry.from_dict(self.to_dict())
+        entry.example_history = list(self.example_history)
+        entry.example_pool = list(self.example_pool)
+        return entry
+
+    # Dict style access
+
+    def __getitem__(self, key):
+        if key in FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None and key == 'gender' else value
+
+    def __setitem__(self, key, value):
+        if key in FIELD_SET:
+            setattr(self, key, intern_value(value) if key in INTERNED_FIELDS else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key == 'gender':
+            self.gender = None
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key == 'gender':
+            return self.gender is not None
+        return key in FIELD_SET or bool(self.extra and key in self.extra)
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def update(self, fields=(), **kwargs):
+        for key, value in dict(fields, **kwargs).items():
+            self[key] = value
+
+    def __eq__(self, other):
+        if isinstance(other, (WordEntry, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"WordEntry({self.to_dict()!r})"
+
+
+def json_default(value):
+    """json.dump default= hook that writes WordEntry objects in their dict form"""
+    if isinstance(value, WordEntry):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")